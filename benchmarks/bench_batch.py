@@ -0,0 +1,60 @@
+"""
+Ensemble benchmark: N small worlds stepped one by one vs in one BatchEnvironment.
+
+Runs the same seeds with the default population through individual
+Environments (optional, slow), individual VectorEnvironments and one
+BatchEnvironment, and reports world-ticks per second for each.
+
+Usage:
+    python benchmarks/bench_batch.py [--worlds 200] [--ticks 200] [--reference]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batch_engine import BatchEnvironment
+from environment import Environment
+from vector_engine import VectorEnvironment
+
+
+def time_individual(engine, seeds, ticks):
+    environments = [engine(seed=seed) for seed in seeds]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for environment in environments:
+            environment.update()
+    return time.perf_counter() - start
+
+
+def time_batch(seeds, ticks):
+    batch = BatchEnvironment(seeds)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.update()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare individually stepped worlds with a BatchEnvironment.")
+    parser.add_argument("--worlds", type=int, default=200, help="number of independent worlds")
+    parser.add_argument("--ticks", type=int, default=200, help="ticks per world")
+    parser.add_argument("--reference", action="store_true", help="also time individual reference Environments")
+    args = parser.parse_args(argv)
+    seeds = list(range(args.worlds))
+
+    results = []
+    if args.reference:
+        results.append(("Environment x N", time_individual(Environment, seeds, args.ticks)))
+    results.append(("VectorEnvironment x N", time_individual(VectorEnvironment, seeds, args.ticks)))
+    results.append(("BatchEnvironment", time_batch(seeds, args.ticks)))
+
+    print(f"{'engine':<24} {'seconds':>9} {'world-ticks/s':>14}")
+    for name, elapsed in results:
+        print(f"{name:<24} {elapsed:>9.2f} {args.worlds * args.ticks / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
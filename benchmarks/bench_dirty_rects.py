@@ -0,0 +1,76 @@
+"""
+Frame-time benchmark: full-window flip vs dirty-rectangle updates.
+
+Runs offscreen (SDL dummy video driver unless SDL_VIDEODRIVER is already set)
+and reports the mean draw+present time per frame for both rendering paths,
+with the simulation running and paused.
+
+Usage:
+    python benchmarks/bench_dirty_rects.py [--frames 300] [--seed 1] [--vectorized]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import pygame
+
+from cell import load_cell_image
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH, UI_PANEL_HEIGHT
+from environment import load_background_image
+from food import load_food_image
+from headless import create_environment
+
+
+def time_frames(environment, screen, frames, dirty, paused):
+    """Mean seconds per frame spent drawing and presenting (simulation updates are not timed)."""
+    ui_panel_rect = pygame.Rect(0, SCREEN_HEIGHT, SCREEN_WIDTH, UI_PANEL_HEIGHT)
+    sprite_rects = []
+    elapsed = 0.0
+    for _ in range(frames):
+        if not paused:
+            environment.update()
+        start = time.perf_counter()
+        if dirty:
+            sprite_rects, rects = environment.draw_dirty(screen, sprite_rects)
+            screen.fill((50, 50, 50), ui_panel_rect)
+            pygame.display.update(rects + [ui_panel_rect])
+        else:
+            environment.draw(screen)
+            screen.fill((50, 50, 50), ui_panel_rect)
+            pygame.display.flip()
+        elapsed += time.perf_counter() - start
+    return elapsed / frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare full flips with dirty-rectangle updates.")
+    parser.add_argument("--frames", type=int, default=300, help="frames per measurement")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the environment")
+    parser.add_argument("--vectorized", action="store_true", help="use the NumPy struct-of-arrays engine")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT + UI_PANEL_HEIGHT))
+    load_cell_image()
+    load_food_image()
+    load_background_image()
+
+    print(f"{'mode':<8} {'state':<8} {'ms/frame':>10}")
+    for paused in (False, True):
+        results = {}
+        for dirty in (False, True):
+            environment = create_environment(args.seed, args.vectorized)
+            results[dirty] = time_frames(environment, screen, args.frames, dirty, paused)
+            mode = "dirty" if dirty else "flip"
+            state = "paused" if paused else "running"
+            print(f"{mode:<8} {state:<8} {results[dirty] * 1000:>10.3f}")
+        print(f"dirty/flip ratio ({'paused' if paused else 'running'}): {results[True] / results[False]:.2f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
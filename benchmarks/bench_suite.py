@@ -0,0 +1,249 @@
+"""
+Benchmark suite: update/draw scaling curves with a JSON baseline and regression check.
+
+`run` measures, at a fixed seed and each case in a fresh process (so peak RSS
+belongs to that case alone):
+
+    update  Environment.update for every population x food count
+    draw    Environment.draw to an offscreen surface for every population
+
+Each case reports its rate (ticks or frames per second), ns per cell-tick
+(or cell-frame) and peak RSS, and the whole run is written to a JSON file.
+`compare` checks a new run against a baseline and exits with status 1 if any
+metric got worse by more than the threshold.
+
+Usage:
+    python benchmarks/bench_suite.py run --output baseline.json
+    python benchmarks/bench_suite.py run --output current.json --populations 10,1000 --no-draw
+    python benchmarks/bench_suite.py compare baseline.json current.json [--threshold 0.10]
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+try:
+    import resource
+except ImportError: # Not available on Windows; peak RSS is reported as None there
+    resource = None
+
+POPULATIONS = (10, 100, 1000, 10000, 50000)
+FOOD_COUNTS = (80, 500, 2000) # Food items on screen (INITIAL_FOOD_COUNT and FOOD_MAX_COUNT)
+DRAW_FOOD_COUNT = 80
+CLAN_COUNT = 5 # Divides every population above
+CELL_TICK_BUDGET = 200_000 # Cell-ticks measured per case; small populations get more ticks
+MIN_TICKS = 10
+MAX_TICKS = 2000
+WARMUP_TICKS = 3
+
+# Metric -> True if higher is better
+METRICS = {
+    "ticks_per_sec": True,
+    "frames_per_sec": True,
+    "ns_per_cell_tick": False,
+    "ns_per_cell_frame": False,
+    "peak_rss_kb": False,
+}
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == "darwin" else usage # Bytes on macOS, KiB elsewhere
+
+
+def steps_for(population, budget):
+    return max(MIN_TICKS, min(MAX_TICKS, budget // population))
+
+
+def case_name(kind, engine, population, food):
+    return f"{kind}/{engine}/cells={population}/food={food}"
+
+
+def create_case_environment(population, food, seed, vectorized):
+    from config import SimulationConfig
+    from headless import create_environment
+
+    config = SimulationConfig(INITIAL_CLAN_COUNT=CLAN_COUNT, CELLS_PER_CLAN=population // CLAN_COUNT,
+                              INITIAL_FOOD_COUNT=food, FOOD_MAX_COUNT=food)
+    return create_environment(seed, vectorized, config)
+
+
+def bench_update(population, food, seed, vectorized, budget):
+    """Time Environment.update. Executed in a fresh worker process."""
+    environment = create_case_environment(population, food, seed, vectorized)
+    for _ in range(WARMUP_TICKS):
+        environment.update()
+    ticks = steps_for(population, budget)
+    cell_ticks = 0
+    start = time.perf_counter_ns()
+    for _ in range(ticks):
+        cell_ticks += environment.cell_count
+        environment.update()
+    elapsed_ns = time.perf_counter_ns() - start
+    return {
+        "ticks": ticks,
+        "cell_ticks": cell_ticks,
+        "ticks_per_sec": ticks / (elapsed_ns / 1e9),
+        "ns_per_cell_tick": elapsed_ns / cell_ticks if cell_ticks else None,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def bench_draw(population, food, seed, vectorized, budget):
+    """Time Environment.draw onto an offscreen surface. Executed in a fresh worker process."""
+    import pygame
+
+    from cell import load_cell_image
+    from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+    from environment import load_background_image
+    from food import load_food_image
+
+    pygame.init()
+    pygame.display.set_mode((1, 1)) # Needed for convert_alpha(); frames go to the surface below
+    load_cell_image()
+    load_food_image()
+    load_background_image()
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    environment = create_case_environment(population, food, seed, vectorized)
+    for _ in range(WARMUP_TICKS):
+        environment.update()
+    environment.draw(surface) # Fills the sprite caches
+    frames = steps_for(population, budget)
+    start = time.perf_counter_ns()
+    for _ in range(frames):
+        environment.draw(surface)
+    elapsed_ns = time.perf_counter_ns() - start
+    cell_frames = environment.cell_count * frames
+    pygame.quit()
+    return {
+        "frames": frames,
+        "cell_frames": cell_frames,
+        "frames_per_sec": frames / (elapsed_ns / 1e9),
+        "ns_per_cell_frame": elapsed_ns / cell_frames if cell_frames else None,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def run_suite(populations, food_counts, seed, vectorized=False, draw=True, budget=CELL_TICK_BUDGET):
+    engine = "vector" if vectorized else "reference"
+    cases = [(case_name("update", engine, population, food), bench_update, population, food)
+             for population in populations for food in food_counts]
+    if draw:
+        cases += [(case_name("draw", engine, population, DRAW_FOOD_COUNT), bench_draw, population, DRAW_FOOD_COUNT)
+                  for population in populations]
+
+    results = {}
+    # One process per case, one case at a time: timings don't compete for cores and RSS isn't shared
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as executor:
+        for name, function, population, food in cases:
+            results[name] = executor.submit(function, population, food, seed, vectorized, budget).result()
+            print(f"{name:<40} {format_case(results[name])}")
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "budget": budget,
+        "results": results,
+    }
+
+
+def format_case(result):
+    parts = []
+    for metric in METRICS:
+        value = result.get(metric)
+        if value is not None:
+            parts.append(f"{metric}={value:,.1f}")
+    return " ".join(parts)
+
+
+def compare_results(baseline, current, threshold, rss_threshold=None):
+    """
+    Compare two suite runs case by case. Returns (rows, regressions), where each row is
+    (case, metric, baseline value, current value, relative change) and the change is
+    positive when the metric got worse. Cases missing from either run are skipped.
+    """
+    rss_threshold = threshold if rss_threshold is None else rss_threshold
+    rows = []
+    regressions = []
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = old.get(metric), new.get(metric)
+            if not before or after is None:
+                continue
+            change = (before - after) / before if higher_is_better else (after - before) / before
+            row = (name, metric, before, after, change)
+            rows.append(row)
+            if change > (rss_threshold if metric == "peak_rss_kb" else threshold):
+                regressions.append(row)
+    return rows, regressions
+
+
+def parse_int_list(text):
+    return [int(value) for value in text.split(",") if value]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark update/draw scaling and check for regressions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write a JSON result file")
+    run_parser.add_argument("--output", required=True, help="JSON file to write")
+    run_parser.add_argument("--seed", type=int, default=1, help="random seed for every case")
+    run_parser.add_argument("--populations", type=parse_int_list, default=list(POPULATIONS),
+                            help="comma-separated initial cell counts (multiples of %d)" % CLAN_COUNT)
+    run_parser.add_argument("--food", type=parse_int_list, default=list(FOOD_COUNTS),
+                            help="comma-separated food counts for the update cases")
+    run_parser.add_argument("--budget", type=int, default=CELL_TICK_BUDGET,
+                            help="cell-ticks (or cell-frames) to measure per case")
+    run_parser.add_argument("--vectorized", action="store_true", help="use the NumPy struct-of-arrays engine")
+    run_parser.add_argument("--no-draw", action="store_true", help="skip the draw cases")
+
+    compare_parser = commands.add_parser("compare", help="compare a run against a baseline")
+    compare_parser.add_argument("baseline", help="baseline JSON file")
+    compare_parser.add_argument("current", help="JSON file of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="flag a timing metric that got worse by more than this fraction")
+    compare_parser.add_argument("--rss-threshold", type=float, default=None,
+                                help="same for peak RSS (defaults to --threshold)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if any(population % CLAN_COUNT for population in args.populations):
+            parser.error(f"populations must be multiples of {CLAN_COUNT}")
+        suite = run_suite(args.populations, args.food, args.seed, args.vectorized, not args.no_draw, args.budget)
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressions = compare_results(baseline, current, args.threshold, args.rss_threshold)
+    print(f"{'case':<40} {'metric':<18} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, metric, before, after, change in rows:
+        flag = "  REGRESSION" if (name, metric, before, after, change) in regressions else ""
+        print(f"{name:<40} {metric:<18} {before:>14,.1f} {after:>14,.1f} {change:>+8.1%}{flag}")
+    print(f"{len(regressions)} regression(s) beyond the threshold")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+Batched multi-world engine for ensembles of small, independent simulations.
+
+BatchEnvironment steps N worlds in lock-step on one shared set of cell and
+food arrays with a world index column, so each phase of a tick is a single
+NumPy operation over every cell of every world instead of N small ones. Rows
+are kept grouped by world, in the same order a VectorEnvironment keeps them.
+
+Each world keeps its own random streams, clans and zones and draws from its
+streams in exactly the order VectorEnvironment.update does, so world i ends
+up in the same state as VectorEnvironment(seed=seeds[i]) stepped on its own.
+Only those per-world draws (a few calls per world per tick) remain Python
+loops over the worlds; the rules themselves are the per-cell kernels of
+vector_engine.py. Against the object-based Environment, whose cells update
+one after another, worlds agree only statistically (see the tests).
+"""
+import math
+from time import perf_counter_ns
+
+import numpy as np
+
+from clan import TRAIT_NAMES
+from config import DEFAULT_CONFIG
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from environment import create_zones
+from vector_engine import (
+    FIND_FOOD_CHUNK_SIZE,
+    MUTATION_TRAITS,
+    VectorEnvironment,
+    age_food,
+    apply_zone_damage,
+    feed_cells,
+    first_eaters,
+    move_cells,
+    offspring_positions,
+    roll_mutations,
+    select_parents,
+    surviving_cells,
+    target_offsets,
+)
+
+
+def _zone_table(zone_lists):
+    """(worlds, zones, 3) array of x, y, radius**2 per world, padded with radius**2 = -1 (never inside)."""
+    width = max((len(zones) for zones in zone_lists), default=0)
+    table = np.zeros((len(zone_lists), width, 3))
+    table[:, :, 2] = -1.0
+    for world, zones in enumerate(zone_lists):
+        for index, zone in enumerate(zones):
+            table[world, index] = (zone.x, zone.y, zone.radius * zone.radius)
+    return table
+
+
+class BatchEnvironment:
+    """N independent VectorEnvironment-rule worlds stepped together on shared arrays."""
+
+    def __init__(self, seeds, config=None):
+        self.config = config if config is not None else DEFAULT_CONFIG
+        cfg = self.config
+        self.seeds = list(seeds)
+        # Worlds start out exactly like individually created VectorEnvironments
+        worlds = [VectorEnvironment(seed=seed, config=self.config) for seed in self.seeds]
+        self.rngs = [world.rng for world in worlds]
+        self.py_rngs = [world.py_rng for world in worlds]
+        self.clans = [world.clans for world in worlds] # Per world, in creation order
+        self._all_clans = [clan for clans in self.clans for clan in clans]
+        self.clan_offsets = np.cumsum([0] + [len(clans) for clans in self.clans[:-1]]) # First global clan index per world
+        self.toxic_zones = [world.toxic_zones for world in worlds]
+        self.resource_zones = [world.resource_zones for world in worlds]
+        self._build_zone_tables()
+        self.environment_timer = 0
+        self.tick = 0
+        self.profiler = None # PhaseProfiler timing the update phases, only while profiling is on
+
+        # Cell arrays, grouped by world
+        world_ids = np.arange(len(worlds))
+        self.cell_world = np.repeat(world_ids, [world.cell_count for world in worlds])
+        self.cell_x = np.concatenate([world.cell_x for world in worlds])
+        self.cell_y = np.concatenate([world.cell_y for world in worlds])
+        self.cell_energy = np.concatenate([world.cell_energy for world in worlds])
+        self.cell_age = np.concatenate([world.cell_age for world in worlds])
+        self.cell_reproduction_timer = np.concatenate([world.cell_reproduction_timer for world in worlds])
+        self.cell_clan = np.concatenate([world.cell_clan + offset # Index into the flat list of every world's clans
+                                         for world, offset in zip(worlds, self.clan_offsets)])
+
+        # Food arrays, grouped by world
+        self.food_world = np.repeat(world_ids, [world.food_count for world in worlds])
+        self.food_x = np.concatenate([world.food_x for world in worlds])
+        self.food_y = np.concatenate([world.food_y for world in worlds])
+        self.food_age = np.concatenate([world.food_age for world in worlds])
+        self.food_type = np.concatenate([world.food_type for world in worlds])
+
+        self._food_type_energy = np.array([t["energy_value"] for t in cfg.FOOD_TYPES], dtype=float)
+        self._food_type_lifespan = np.array([t["lifespan"] for t in cfg.FOOD_TYPES], dtype=np.int64)
+
+    @property
+    def world_count(self):
+        return len(self.seeds)
+
+    @property
+    def cell_count(self):
+        return len(self.cell_x)
+
+    @property
+    def food_count(self):
+        return len(self.food_x)
+
+    def cell_counts(self):
+        """Living cells per world."""
+        return np.bincount(self.cell_world, minlength=self.world_count)
+
+    def food_counts(self):
+        """Food items per world."""
+        return np.bincount(self.food_world, minlength=self.world_count)
+
+    def world_state(self, world):
+        """Copies of one world's arrays, named like the VectorEnvironment attributes (clans as local indices)."""
+        cells = self.cell_world == world
+        food = self.food_world == world
+        return {
+            "cell_x": self.cell_x[cells],
+            "cell_y": self.cell_y[cells],
+            "cell_energy": self.cell_energy[cells],
+            "cell_age": self.cell_age[cells],
+            "cell_reproduction_timer": self.cell_reproduction_timer[cells],
+            "cell_clan": self.cell_clan[cells] - self.clan_offsets[world],
+            "food_x": self.food_x[food],
+            "food_y": self.food_y[food],
+            "food_age": self.food_age[food],
+            "food_type": self.food_type[food],
+        }
+
+    def clan_summaries(self, world):
+        """(clan, living cell count, mean traits) per clan of one world, see VectorEnvironment.clan_summaries."""
+        clans = self.clans[world]
+        local_clans = self.cell_clan[self.cell_world == world] - self.clan_offsets[world]
+        counts = np.bincount(local_clans, minlength=len(clans)).tolist()
+        return [(clan, count, clan.get_traits() if count else {name: 0 for name in TRAIT_NAMES})
+                for clan, count in zip(clans, counts)]
+
+    def trait_means(self, world):
+        """Mean trait values over one world's living cells (all 0 when extinct)."""
+        summaries = self.clan_summaries(world)
+        total = sum(count for _, count, _ in summaries)
+        if total == 0:
+            return {name: 0 for name in TRAIT_NAMES}
+        return {name: sum(count * means[name] for _, count, means in summaries) / total for name in TRAIT_NAMES}
+
+    def _build_zone_tables(self):
+        self._toxic_table = _zone_table(self.toxic_zones)
+        self._resource_table = _zone_table(self.resource_zones)
+
+    def _zone_counts(self, table):
+        """Number of zones of each cell's own world that contain the cell (squared distances, like ZoneRaster)."""
+        zones = table[self.cell_world]
+        dx = self.cell_x[:, None] - zones[:, :, 0]
+        dy = self.cell_y[:, None] - zones[:, :, 1]
+        return np.count_nonzero(dx * dx + dy * dy < zones[:, :, 2], axis=1)
+
+    def _clan_trait_arrays(self):
+        clans = self._all_clans
+        speed = np.array([clan.speed for clan in clans], dtype=float)
+        sense_radius = np.array([clan.sense_radius for clan in clans], dtype=float)
+        energy_efficiency = np.array([clan.energy_efficiency for clan in clans], dtype=float)
+        size = np.array([clan.size for clan in clans], dtype=float)
+        lifespan = np.array([clan.lifespan for clan in clans], dtype=float)
+        return speed, sense_radius, energy_efficiency, size, lifespan
+
+    def _find_food(self, sense_radius):
+        """Global index of the closest food of the cell's own world strictly inside its sense radius, or -1."""
+        cell_count = self.cell_count
+        targets = np.full(cell_count, -1, dtype=np.int64)
+        if cell_count == 0 or self.food_count == 0:
+            return targets
+        # Each world's food as one padded row; padding sits at infinity and is never in range
+        food_counts = self.food_counts()
+        food_starts = np.concatenate(([0], np.cumsum(food_counts)[:-1]))
+        local_index = np.arange(self.food_count) - food_starts[self.food_world]
+        padded_x = np.full((self.world_count, food_counts.max()), np.inf)
+        padded_y = np.full((self.world_count, food_counts.max()), np.inf)
+        padded_x[self.food_world, local_index] = self.food_x
+        padded_y[self.food_world, local_index] = self.food_y
+
+        for start in range(0, cell_count, FIND_FOOD_CHUNK_SIZE):
+            stop = min(start + FIND_FOOD_CHUNK_SIZE, cell_count)
+            worlds = self.cell_world[start:stop]
+            dx = self.cell_x[start:stop, None] - padded_x[worlds]
+            dy = self.cell_y[start:stop, None] - padded_y[worlds]
+            dist = np.sqrt(dx * dx + dy * dy)
+            dist[dist >= sense_radius[start:stop, None]] = np.inf
+            closest = np.argmin(dist, axis=1)
+            found = np.isfinite(dist[np.arange(stop - start), closest])
+            targets[start:stop] = np.where(found, food_starts[worlds] + closest, -1)
+        return targets
+
+    def update(self):
+        """Advance every world by one tick."""
+        cfg = self.config
+        profiler = self.profiler
+        if profiler is not None:
+            phase_start = perf_counter_ns()
+        self.tick += 1
+        self.environment_timer += 1
+        if self.environment_timer >= cfg.ENVIRONMENT_CHANGE_INTERVAL:
+            for world, py_rng in enumerate(self.py_rngs):
+                self.toxic_zones[world], self.resource_zones[world] = create_zones(cfg, py_rng)
+            self._build_zone_tables()
+            self.environment_timer = 0
+
+        cell_count = self.cell_count
+        speed, sense_radius, energy_efficiency, size, lifespan = (
+            trait[self.cell_clan] for trait in self._clan_trait_arrays())
+
+        # Toxic zone damage: one subtraction per covering zone, as in VectorEnvironment
+        if cell_count:
+            apply_zone_damage(self.cell_energy, self._zone_counts(self._toxic_table), cfg)
+        if profiler is not None:
+            phase_start = profiler.lap("zones", phase_start)
+
+        self.cell_age += 1
+
+        # Seek food, then move towards it (or wander randomly if none is in range)
+        targets = self._find_food(sense_radius)
+        dx, dy = target_offsets(self.cell_x, self.cell_y, self.food_x, self.food_y, targets)
+        # Every world draws its wander angles from its own stream, even when it has no cells
+        cells_per_world = self.cell_counts().tolist()
+        angle = np.concatenate([rng.uniform(0, 2 * math.pi, count) for rng, count in zip(self.rngs, cells_per_world)])
+        self.cell_x, self.cell_y = move_cells(self.cell_x, self.cell_y, self.cell_energy, targets, dx, dy, angle,
+                                              speed, energy_efficiency, size, cfg)
+
+        # Eat: the first cell (in array order) to reach a food item gets it. Targets never cross worlds.
+        eaters, eaten_food = first_eaters(self.cell_x, self.cell_y, self.food_x, self.food_y, targets, size)
+        feed_cells(self.cell_energy, eaters, self._food_type_energy[self.food_type[eaten_food]], cfg)
+        food_eaten = np.zeros(self.food_count, dtype=bool)
+        food_eaten[eaten_food] = True
+
+        # Death by starvation or old age
+        alive = surviving_cells(self.cell_energy, self.cell_age, lifespan)
+        self._compact_cells(alive)
+        size = size[alive]
+
+        # Reproduction
+        parents = select_parents(self.cell_energy, self.cell_age, self.cell_reproduction_timer, cfg)
+        if len(parents):
+            parent_world = self.cell_world[parents]
+            jitter_x = np.empty(len(parents))
+            jitter_y = np.empty(len(parents))
+            # Rows are grouped by world, so each world's parents form one contiguous run
+            births = np.bincount(parent_world, minlength=self.world_count)
+            start = 0
+            for world in np.flatnonzero(births).tolist():
+                stop = start + births[world]
+                rng = self.rngs[world]
+                jitter_x[start:stop] = rng.uniform(-1, 1, stop - start)
+                jitter_y[start:stop] = rng.uniform(-1, 1, stop - start)
+                self._mutate_clans(rng, self.cell_clan[parents[start:stop]])
+                start = stop
+            offspring_x, offspring_y = offspring_positions(self.cell_x, self.cell_y, parents, size, jitter_x, jitter_y)
+            self._add_cells(offspring_x, offspring_y, self.cell_clan[parents], self.cell_energy[parents], parent_world)
+        if profiler is not None:
+            phase_start = profiler.lap("cells", phase_start)
+
+        # Food decay (eaten food is removed at the same time)
+        keep_food = age_food(self.food_age, self.food_type, food_eaten, self._food_type_lifespan)
+        self._compact_food(keep_food)
+        if profiler is not None:
+            phase_start = profiler.lap("food", phase_start)
+
+        # Dynamic food spawning, boosted in worlds where any cell sits in a resource zone
+        boosted = np.zeros(self.world_count, dtype=bool)
+        if self.cell_count:
+            boosted[self.cell_world[self._zone_counts(self._resource_table) > 0]] = True
+        food_counts = self.food_counts().tolist()
+        spawned = []
+        for world, rng in enumerate(self.rngs):
+            food_spawn_multiplier = cfg.RESOURCE_ZONE_FOOD_BOOST if boosted[world] else 1
+            if food_counts[world] < cfg.FOOD_MAX_COUNT and rng.random() < cfg.FOOD_SPAWN_RATE_PER_FRAME * food_spawn_multiplier:
+                spawned.append(self._roll_food(world, rng))
+        if spawned:
+            self._add_food(*(np.array(column) for column in zip(*spawned)))
+        if profiler is not None:
+            profiler.lap("spawn", phase_start)
+
+    def _roll_food(self, world, rng):
+        """(world, x, y, type) of one new food item, drawn like VectorEnvironment.spawn_food."""
+        food_types = self.config.FOOD_TYPES
+        type_index = int(rng.integers(len(food_types)))
+        size = food_types[type_index]["size"]
+        x = rng.integers(0, SCREEN_WIDTH - size + 1)
+        y = rng.integers(0, SCREEN_HEIGHT - size + 1)
+        return world, float(x), float(y), type_index
+
+    def _mutate_clans(self, rng, parent_clans):
+        """Roll one world's mutations for its births and apply them in birth order, see VectorEnvironment."""
+        for birth, trait, amount in zip(*roll_mutations(rng, len(parent_clans), self.config)):
+            self._all_clans[parent_clans[birth]].apply_mutation(MUTATION_TRAITS[trait][0], float(amount))
+
+    def _add_cells(self, xs, ys, clan_indices, energies, worlds):
+        """Append newborn cells behind the existing cells of their world."""
+        count = len(xs)
+        world = np.concatenate((self.cell_world, worlds))
+        order = np.argsort(world, kind="stable")
+        self.cell_world = world[order]
+        self.cell_x = np.concatenate((self.cell_x, xs))[order]
+        self.cell_y = np.concatenate((self.cell_y, ys))[order]
+        self.cell_energy = np.concatenate((self.cell_energy, energies))[order]
+        self.cell_age = np.concatenate((self.cell_age, np.zeros(count, dtype=np.int64)))[order]
+        self.cell_reproduction_timer = np.concatenate(
+            (self.cell_reproduction_timer, np.zeros(count, dtype=np.int64)))[order]
+        self.cell_clan = np.concatenate((self.cell_clan, clan_indices))[order]
+
+    def _add_food(self, worlds, xs, ys, type_indices):
+        """Append new food behind the existing food of its world."""
+        world = np.concatenate((self.food_world, worlds))
+        order = np.argsort(world, kind="stable")
+        self.food_world = world[order]
+        self.food_x = np.concatenate((self.food_x, xs))[order]
+        self.food_y = np.concatenate((self.food_y, ys))[order]
+        self.food_age = np.concatenate((self.food_age, np.zeros(len(xs), dtype=np.int64)))[order]
+        self.food_type = np.concatenate((self.food_type, type_indices.astype(np.int64)))[order]
+
+    def _compact_cells(self, keep):
+        self.cell_world = self.cell_world[keep]
+        self.cell_x = self.cell_x[keep]
+        self.cell_y = self.cell_y[keep]
+        self.cell_energy = self.cell_energy[keep]
+        self.cell_age = self.cell_age[keep]
+        self.cell_reproduction_timer = self.cell_reproduction_timer[keep]
+        self.cell_clan = self.cell_clan[keep]
+
+    def _compact_food(self, keep):
+        self.food_world = self.food_world[keep]
+        self.food_x = self.food_x[keep]
+        self.food_y = self.food_y[keep]
+        self.food_age = self.food_age[keep]
+        self.food_type = self.food_type[keep]
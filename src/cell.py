@@ -1,49 +1,71 @@
 
 import math
 import os
-import random
 
 import pygame
 
 from clan import Clan  # Import the Clan class
-from constants import (
-    CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE,
-    CELL_ENERGY_MAX,
-    CELL_IDLE_ENERGY_DRAIN,
-    CELL_MIN_AGE_TO_REPRODUCE,
-    CELL_MUTATION_AMOUNT,
-    CELL_MUTATION_RATE,
-    CELL_REPRODUCTION_THRESHOLD,
-    CELL_SIZE_MIN,
-    INITIAL_REPRODUCTION_TIME,
-    SCREEN_HEIGHT,
-    SCREEN_WIDTH,
-)
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from sprite_cache import SpriteCache, build_tinted_sprite
 from utils import clamp, get_distance
 
-# Load cell image once (32x32 sprite)
+# Cell image (32x32 sprite), loaded once a display exists by load_cell_image()
 CELL_IMAGE_PATH = os.path.join("assets", "cell_basic.png")
-try:
-    ORIGINAL_CELL_IMAGE = pygame.image.load(CELL_IMAGE_PATH).convert_alpha()
-    print(f"Loaded cell sprite: {ORIGINAL_CELL_IMAGE.get_size()}")
-except pygame.error:
-    print(f"Warning: Could not load cell image at {CELL_IMAGE_PATH}. Falling back to drawing circles.")
-    ORIGINAL_CELL_IMAGE = None
-
-# Cache for scaled cell images by size to improve performance
-_cell_image_cache = {}
+ORIGINAL_CELL_IMAGE = None
+
+def load_cell_image():
+    """Load the cell sprite. Needs an initialized display for convert_alpha()."""
+    global ORIGINAL_CELL_IMAGE
+    try:
+        ORIGINAL_CELL_IMAGE = pygame.image.load(CELL_IMAGE_PATH).convert_alpha()
+        print(f"Loaded cell sprite: {ORIGINAL_CELL_IMAGE.get_size()}")
+    except (pygame.error, FileNotFoundError):
+        print(f"Warning: Could not load cell image at {CELL_IMAGE_PATH}. Falling back to drawing circles.")
+        ORIGINAL_CELL_IMAGE = None
+    clear_cell_image_cache()
+
+# Cache for scaled and tinted cell images, bounded by SPRITE_CACHE_MAX_BYTES
+_cell_image_cache = SpriteCache()
 
 def clear_cell_image_cache():
     """Clear the cell image cache to free memory if needed."""
-    global _cell_image_cache
     _cell_image_cache.clear()
 
+def cell_image_cache_stats():
+    """Size and hit/miss counters of the cell image cache."""
+    return _cell_image_cache.stats()
+
+def get_cell_image(size, clan):
+    """Return the tinted cell sprite for a size and clan, or None if no sprite is loaded."""
+    if not ORIGINAL_CELL_IMAGE:
+        return None
+    cache_key = (int(size), clan.id)
+    colored_image = _cell_image_cache.get(cache_key)
+    if colored_image is None:
+        colored_image = build_tinted_sprite(ORIGINAL_CELL_IMAGE, int(size), clan.color)
+        _cell_image_cache.put(cache_key, colored_image)
+    return colored_image
+
+def prewarm_cell_images(clans):
+    """Build the sprites for every size each clan's cells can reach, so none are built mid-frame."""
+    if not ORIGINAL_CELL_IMAGE:
+        return
+    for clan in clans:
+        for size in range(int(clan.config.CELL_SIZE_MIN), int(clan.config.CELL_SIZE_MAX) + 1):
+            if (size, clan.id) not in _cell_image_cache:
+                _cell_image_cache.put((size, clan.id), build_tinted_sprite(ORIGINAL_CELL_IMAGE, size, clan.color))
+
 class Cell:
-    def __init__(self, x, y, clan: Clan, energy=CELL_ENERGY_MAX):
+    __slots__ = ("x", "y", "clan", "config", "rng", "energy", "age", "reproduction_timer", "speed", "sense_radius",
+                 "energy_efficiency", "size", "lifespan", "trait_version", "counted", "target_food", "handle")
+
+    def __init__(self, x, y, clan: Clan, energy=None):
         self.x = x
         self.y = y
         self.clan = clan # Assign the cell to a clan
-        self.energy = energy
+        self.config = clan.config # Simulation rules are shared by the whole run
+        self.rng = clan.rng # So is the random stream
+        self.energy = energy if energy is not None else self.config.CELL_ENERGY_MAX
         self.age = 0
         self.reproduction_timer = 0 # Timer for initial reproduction
 
@@ -53,10 +75,14 @@ class Cell:
         self.energy_efficiency = self.clan.energy_efficiency
         self.size = self.clan.size
         self.lifespan = self.clan.lifespan
+        self.trait_version = self.clan.trait_version
+        self.counted = False # Included in the clan's running aggregates (see Clan.add_member)
 
         self.target_food = None
+        self.handle = None # Stable id assigned by the EntityStore holding this cell
 
     def move(self):
+        cfg = self.config
         movement_cost = 0
         if self.target_food:
             # Move towards target food
@@ -74,25 +100,30 @@ class Cell:
                 self.y += direction_y * move_amount
 
                 # Consume energy for movement, adjusted by efficiency and size
-                movement_cost = CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE * move_amount * self.energy_efficiency * (self.size / CELL_SIZE_MIN)
+                movement_cost = cfg.CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE * move_amount * self.energy_efficiency * (self.size / cfg.CELL_SIZE_MIN)
         else:
             # Random movement if no target
-            angle = random.uniform(0, 2 * math.pi)
+            angle = self.rng.uniform(0, 2 * math.pi)
             move_amount = self.speed / 2 # Slower random movement
             self.x += math.cos(angle) * move_amount
             self.y += math.sin(angle) * move_amount
-            movement_cost = CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE * move_amount * self.energy_efficiency * (self.size / CELL_SIZE_MIN)
+            movement_cost = cfg.CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE * move_amount * self.energy_efficiency * (self.size / cfg.CELL_SIZE_MIN)
 
         self.energy -= movement_cost
-        self.energy -= CELL_IDLE_ENERGY_DRAIN * (self.size / CELL_SIZE_MIN) # Idle energy drain adjusted by size
+        self.energy -= cfg.CELL_IDLE_ENERGY_DRAIN * (self.size / cfg.CELL_SIZE_MIN) # Idle energy drain adjusted by size
 
         # Keep cell within screen bounds
         self.x = clamp(self.x, 0, SCREEN_WIDTH - self.size)
         self.y = clamp(self.y, 0, SCREEN_HEIGHT - self.size)
 
-        self.energy = clamp(self.energy, 0, CELL_ENERGY_MAX)
+        self.energy = clamp(self.energy, 0, cfg.CELL_ENERGY_MAX)
+
+    def find_food(self, food_items, food_grid=None):
+        if food_grid is not None:
+            # Only look at the grid buckets overlapping the sense radius
+            self.target_food = food_grid.nearest(self.x, self.y, self.sense_radius)
+            return
 
-    def find_food(self, food_items):
         closest_food = None
         min_dist = float('inf')  # Initialize with a very large distance
 
@@ -103,11 +134,13 @@ class Cell:
                 closest_food = food
         self.target_food = closest_food
 
-    def eat(self, food_items):
+    def eat(self, food_items, food_grid=None):
         if self.target_food and get_distance((self.x, self.y), (self.target_food.x, self.target_food.y)) < self.size:
             self.energy += self.target_food.energy_value
-            self.energy = clamp(self.energy, 0, CELL_ENERGY_MAX)
+            self.energy = clamp(self.energy, 0, self.config.CELL_ENERGY_MAX)
             food_items.remove(self.target_food)
+            if food_grid is not None:
+                food_grid.remove(self.target_food)
             self.target_food = None
             return True
         return False
@@ -117,75 +150,68 @@ class Cell:
         Asexual reproduction: cell splits into two when conditions are met.
         Offspring inherits parent's clan with potential mutations applied at the clan level.
         """
+        cfg = self.config
+        rng = self.rng
         # Check for initial reproduction timer
-        if self.reproduction_timer < INITIAL_REPRODUCTION_TIME:
+        if self.reproduction_timer < cfg.INITIAL_REPRODUCTION_TIME:
             self.reproduction_timer += 1
             return None
 
         # Check if cell has enough energy and age to reproduce
-        if self.energy >= CELL_REPRODUCTION_THRESHOLD and self.age >= CELL_MIN_AGE_TO_REPRODUCE:
+        if self.energy >= cfg.CELL_REPRODUCTION_THRESHOLD and self.age >= cfg.CELL_MIN_AGE_TO_REPRODUCE:
             self.energy /= 2 # Split energy with offspring
             
             # Create offspring near parent
-            offspring_x = clamp(self.x + random.uniform(-self.size, self.size), 0, SCREEN_WIDTH - self.size)
-            offspring_y = clamp(self.y + random.uniform(-self.size, self.size), 0, SCREEN_HEIGHT - self.size)
+            offspring_x = clamp(self.x + rng.uniform(-self.size, self.size), 0, SCREEN_WIDTH - self.size)
+            offspring_y = clamp(self.y + rng.uniform(-self.size, self.size), 0, SCREEN_HEIGHT - self.size)
 
             # Apply mutations to clan traits
-            if random.random() < CELL_MUTATION_RATE:
-                self.clan.apply_mutation("speed", random.uniform(-CELL_MUTATION_AMOUNT, CELL_MUTATION_AMOUNT))
-            if random.random() < CELL_MUTATION_RATE:
-                self.clan.apply_mutation("sense_radius", random.uniform(-CELL_MUTATION_AMOUNT, CELL_MUTATION_AMOUNT))
-            if random.random() < CELL_MUTATION_RATE:
-                self.clan.apply_mutation("energy_efficiency", random.uniform(-CELL_MUTATION_AMOUNT, CELL_MUTATION_AMOUNT))
-            if random.random() < CELL_MUTATION_RATE:
-                self.clan.apply_mutation("size", random.uniform(-CELL_MUTATION_AMOUNT * 5, CELL_MUTATION_AMOUNT * 5))
-            if random.random() < CELL_MUTATION_RATE:
-                self.clan.apply_mutation("lifespan", random.uniform(-CELL_MUTATION_AMOUNT * 100, CELL_MUTATION_AMOUNT * 100))
+            if rng.random() < cfg.CELL_MUTATION_RATE:
+                self.clan.apply_mutation("speed", rng.uniform(-cfg.CELL_MUTATION_AMOUNT, cfg.CELL_MUTATION_AMOUNT))
+            if rng.random() < cfg.CELL_MUTATION_RATE:
+                self.clan.apply_mutation("sense_radius", rng.uniform(-cfg.CELL_MUTATION_AMOUNT, cfg.CELL_MUTATION_AMOUNT))
+            if rng.random() < cfg.CELL_MUTATION_RATE:
+                self.clan.apply_mutation("energy_efficiency", rng.uniform(-cfg.CELL_MUTATION_AMOUNT, cfg.CELL_MUTATION_AMOUNT))
+            if rng.random() < cfg.CELL_MUTATION_RATE:
+                self.clan.apply_mutation("size", rng.uniform(-cfg.CELL_MUTATION_AMOUNT * 5, cfg.CELL_MUTATION_AMOUNT * 5))
+            if rng.random() < cfg.CELL_MUTATION_RATE:
+                self.clan.apply_mutation("lifespan", rng.uniform(-cfg.CELL_MUTATION_AMOUNT * 100, cfg.CELL_MUTATION_AMOUNT * 100))
 
             # Offspring belongs to the same clan
             return Cell(offspring_x, offspring_y, self.clan, self.energy)
         return None
 
     def draw(self, screen):
-        if ORIGINAL_CELL_IMAGE:
-            # Create cache key based on size and clan color
-            cache_key = (int(self.size), self.clan.id)
-            
-            # Check if we have a cached version of this sprite
-            if cache_key not in _cell_image_cache:
-                # Scale the 32x32 sprite to match cell size (multiply by 2 for diameter)
-                target_size = max(int(self.size * 2), 8)  # Minimum 8 pixels
-                scaled_image = pygame.transform.smoothscale(ORIGINAL_CELL_IMAGE, (target_size, target_size))
-                
-                # Apply clan color tint
-                colored_image = scaled_image.copy()
-                colored_image.fill(self.clan.color + (0,), None, pygame.BLEND_RGBA_MULT)
-                
-                # Cache the result
-                _cell_image_cache[cache_key] = colored_image
-            
-            # Use cached image
-            colored_image = _cell_image_cache[cache_key]
+        """Draw the cell and return the screen area it covers."""
+        colored_image = get_cell_image(self.size, self.clan)
+        if colored_image is not None:
             image_rect = colored_image.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(colored_image, image_rect)
-        else:
-            # Fallback to circles if sprite not loaded
-            pygame.draw.circle(screen, self.clan.color, (int(self.x), int(self.y)), int(self.size))
+            return screen.blit(colored_image, image_rect)
+        # Fallback to circles if sprite not loaded
+        return pygame.draw.circle(screen, self.clan.color, (int(self.x), int(self.y)), int(self.size))
         # Optionally draw sense radius for debugging
         # pygame.draw.circle(screen, (50, 50, 50), (int(self.x), int(self.y)), int(self.sense_radius), 1)
 
-    def update(self, food_items):
+    def update(self, food_items, food_grid=None):
         self.age += 1
         # Update traits from clan (in case clan traits mutated)
-        self.speed = self.clan.speed
-        self.sense_radius = self.clan.sense_radius
-        self.energy_efficiency = self.clan.energy_efficiency
-        self.size = self.clan.size
-        self.lifespan = self.clan.lifespan
-
-        self.find_food(food_items)
+        clan = self.clan
+        if self.trait_version != clan.trait_version:
+            counted = self.counted
+            if counted:
+                clan.remove_member(self)
+            self.speed = clan.speed
+            self.sense_radius = clan.sense_radius
+            self.energy_efficiency = clan.energy_efficiency
+            self.size = clan.size
+            self.lifespan = clan.lifespan
+            self.trait_version = clan.trait_version
+            if counted:
+                clan.add_member(self)
+
+        self.find_food(food_items, food_grid)
         self.move()
-        self.eat(food_items)
+        self.eat(food_items, food_grid)
 
         # Die if out of energy or too old
         if self.energy <= 0 or self.age >= self.lifespan:
@@ -0,0 +1,173 @@
+"""
+Binary checkpoints of a full Environment.
+
+A checkpoint captures everything needed to resume a run bit-for-bit: cells,
+food, clans, zones, the tick and environment timers, Clan.next_id and the
+state of the environment's random stream. Cell targets are not stored because
+Cell.update recomputes them before they are used.
+
+Layout (little-endian, zlib-compressed after the 6-byte preamble):
+    magic b"MLCK", format version (u16)
+    header: tick, seed, environment_timer, Clan.next_id and section counts
+    config overrides as length-prefixed JSON
+    RNG state: version, 624 Mersenne Twister words + position, gauss_next
+    clans, cells, food, toxic zones, resource zones as fixed-size records
+"""
+import json
+import os
+import struct
+import zlib
+
+from cell import Cell
+from clan import Clan
+from config import SimulationConfig
+from environment import Environment, Zone
+from food import Food
+from constants import LIGHT_BLUE, PURPLE
+
+MAGIC = b"MLCK"
+FORMAT_VERSION = 1
+
+PREAMBLE = struct.Struct("<4sH")
+HEADER = struct.Struct("<QqIIIIIII") # tick, seed (signed, like any Python seed), timer, next clan id, clans, cells, food, toxic, resource
+LENGTH = struct.Struct("<I")
+RNG_STATE = struct.Struct("<I625I?d") # version, internal state, has gauss_next, gauss_next
+CLAN_RECORD = struct.Struct("<I3B5d") # id, color, speed, sense_radius, energy_efficiency, size, lifespan
+CELL_RECORD = struct.Struct("<3dqqI") # x, y, energy, age, reproduction_timer, clan index
+FOOD_RECORD = struct.Struct("<2d3Bqdqq") # x, y, color, size, energy_value, lifespan, age
+ZONE_RECORD = struct.Struct("<3d") # x, y, radius
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint file is not a valid checkpoint."""
+
+
+def _number(value):
+    """Restore integral values (e.g. unmutated lifespans) to int."""
+    return int(value) if float(value).is_integer() else value
+
+
+def dumps(environment):
+    """Serialize an Environment to checkpoint bytes."""
+    if not isinstance(environment, Environment):
+        raise TypeError("Checkpoints are only supported for Environment, not " + type(environment).__name__)
+
+    if not -2**63 <= environment.seed < 2**63:
+        raise ValueError(f"Seed {environment.seed} does not fit in a checkpoint (signed 64-bit)")
+    clan_index = {clan.id: index for index, clan in enumerate(environment.clans)}
+    parts = [HEADER.pack(environment.tick, environment.seed, environment.environment_timer, Clan.next_id,
+                         len(environment.clans), len(environment.cells), len(environment.food),
+                         len(environment.toxic_zones), len(environment.resource_zones))]
+
+    config_json = json.dumps(environment.config.overrides()).encode("utf-8")
+    parts.append(LENGTH.pack(len(config_json)))
+    parts.append(config_json)
+
+    rng_version, rng_internal, gauss_next = environment.rng.getstate()
+    parts.append(RNG_STATE.pack(rng_version, *rng_internal, gauss_next is not None, gauss_next or 0.0))
+
+    for clan in environment.clans:
+        parts.append(CLAN_RECORD.pack(clan.id, *clan.color, clan.speed, clan.sense_radius,
+                                      clan.energy_efficiency, clan.size, clan.lifespan))
+    for cell in environment.cells:
+        parts.append(CELL_RECORD.pack(cell.x, cell.y, cell.energy, cell.age, cell.reproduction_timer,
+                                      clan_index[cell.clan.id]))
+    for food in environment.food:
+        parts.append(FOOD_RECORD.pack(food.x, food.y, *food.color, food.size, food.energy_value,
+                                      food.lifespan, food.age))
+    for zone in environment.toxic_zones + environment.resource_zones:
+        parts.append(ZONE_RECORD.pack(zone.x, zone.y, zone.radius))
+
+    return PREAMBLE.pack(MAGIC, FORMAT_VERSION) + zlib.compress(b"".join(parts), 1)
+
+
+def loads(data):
+    """Rebuild an Environment from checkpoint bytes."""
+    magic, version = PREAMBLE.unpack_from(data)
+    if magic != MAGIC:
+        raise CheckpointError("Not a MicroLife checkpoint")
+    if version != FORMAT_VERSION:
+        raise CheckpointError(f"Unsupported checkpoint version {version}")
+    try:
+        body = zlib.decompress(data[PREAMBLE.size:])
+    except zlib.error as e:
+        raise CheckpointError(f"Corrupt checkpoint: {e}") from e
+
+    (tick, seed, environment_timer, next_clan_id, clan_count, cell_count, food_count,
+     toxic_count, resource_count) = HEADER.unpack_from(body)
+    offset = HEADER.size
+    (config_length,) = LENGTH.unpack_from(body, offset)
+    offset += LENGTH.size
+    overrides = json.loads(body[offset:offset + config_length].decode("utf-8"))
+    offset += config_length
+    if "FOOD_TYPES" in overrides:
+        for food_type in overrides["FOOD_TYPES"]:
+            food_type["color"] = tuple(food_type["color"])
+    config = SimulationConfig(**overrides)
+
+    rng_fields = RNG_STATE.unpack_from(body, offset)
+    offset += RNG_STATE.size
+
+    def records(record, count):
+        nonlocal offset
+        end = offset + record.size * count
+        if end > len(body):
+            raise CheckpointError("Truncated checkpoint")
+        values = list(record.iter_unpack(body[offset:end]))
+        offset = end
+        return values
+
+    environment = Environment(config=config, seed=seed)
+    environment.tick = tick
+    environment.environment_timer = environment_timer
+
+    environment.clans = []
+    for clan_id, r, g, b, speed, sense_radius, energy_efficiency, size, lifespan in records(CLAN_RECORD, clan_count):
+        clan = Clan(color=(r, g, b), config=config, rng=environment.rng)
+        clan.id = clan_id
+        clan.speed = speed
+        clan.sense_radius = sense_radius
+        clan.energy_efficiency = energy_efficiency
+        clan.size = size
+        clan.lifespan = _number(lifespan)
+        environment.clans.append(clan)
+    Clan.next_id = max(Clan.next_id, next_clan_id)
+
+    environment.clear_cells()
+    for x, y, energy, age, reproduction_timer, clan_index in records(CELL_RECORD, cell_count):
+        cell = Cell(x, y, environment.clans[clan_index], energy)
+        cell.age = age
+        cell.reproduction_timer = reproduction_timer
+        environment.add_cell(cell)
+
+    environment.food.clear()
+    environment.food_grid.clear()
+    for x, y, r, g, b, size, energy_value, lifespan, age in records(FOOD_RECORD, food_count):
+        food = Food(_number(x), _number(y), {"color": (r, g, b), "size": size,
+                                             "energy_value": _number(energy_value), "lifespan": lifespan})
+        food.age = age
+        environment.add_food(food)
+
+    environment.set_zones([Zone(_number(x), _number(y), _number(radius), PURPLE, "toxic")
+                           for x, y, radius in records(ZONE_RECORD, toxic_count)],
+                          [Zone(_number(x), _number(y), _number(radius), LIGHT_BLUE, "resource")
+                           for x, y, radius in records(ZONE_RECORD, resource_count)])
+
+    # Restore the random stream last, after building the objects above has drawn from it
+    environment.rng.setstate((rng_fields[0], tuple(rng_fields[1:626]), rng_fields[627] if rng_fields[626] else None))
+    return environment
+
+
+def save_checkpoint(environment, path):
+    """Write a checkpoint atomically, so an interruption never leaves a half-written file."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(dumps(environment))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -1,33 +1,41 @@
-
 import random
-from constants import (
-    CELL_SPEED_MIN, CELL_SPEED_MAX, CELL_SENSE_RADIUS_MIN, CELL_SENSE_RADIUS_MAX,
-    CELL_ENERGY_EFFICIENCY_MIN, CELL_ENERGY_EFFICIENCY_MAX, CELL_SIZE_MIN, CELL_SIZE_MAX,
-    CELL_MAX_LIFESPAN, CLAN_COLORS
-)
+from config import DEFAULT_CONFIG
+from constants import CLAN_COLORS
 from utils import clamp
 
+TRAIT_NAMES = ("speed", "sense_radius", "energy_efficiency", "size", "lifespan")
+
 class Clan:
     next_id = 0
 
-    def __init__(self, color=None):
+    def __init__(self, color=None, config=None, rng=None):
         self.id = Clan.next_id
         Clan.next_id += 1
-        self.color = color if color is not None else random.choice(CLAN_COLORS)
+        self.config = config if config is not None else DEFAULT_CONFIG
+        self.rng = rng if rng is not None else random # Random stream shared by the clan's cells
+        self.color = color if color is not None else self.rng.choice(CLAN_COLORS)
+        cfg = self.config
+        rng = self.rng
 
         # Shared traits for the clan
-        self.speed = random.uniform(CELL_SPEED_MIN, CELL_SPEED_MAX)
-        self.sense_radius = random.uniform(CELL_SENSE_RADIUS_MIN, CELL_SENSE_RADIUS_MAX)
-        self.energy_efficiency = random.uniform(CELL_ENERGY_EFFICIENCY_MIN, CELL_ENERGY_EFFICIENCY_MAX)
-        self.size = random.uniform(CELL_SIZE_MIN, CELL_SIZE_MAX)
-        self.lifespan = random.randint(CELL_MAX_LIFESPAN // 2, CELL_MAX_LIFESPAN)
+        self.speed = rng.uniform(cfg.CELL_SPEED_MIN, cfg.CELL_SPEED_MAX)
+        self.sense_radius = rng.uniform(cfg.CELL_SENSE_RADIUS_MIN, cfg.CELL_SENSE_RADIUS_MAX)
+        self.energy_efficiency = rng.uniform(cfg.CELL_ENERGY_EFFICIENCY_MIN, cfg.CELL_ENERGY_EFFICIENCY_MAX)
+        self.size = rng.uniform(cfg.CELL_SIZE_MIN, cfg.CELL_SIZE_MAX)
+        self.lifespan = rng.randint(cfg.CELL_MAX_LIFESPAN // 2, cfg.CELL_MAX_LIFESPAN)
 
         # Ensure initial traits are within bounds
-        self.speed = clamp(self.speed, CELL_SPEED_MIN, CELL_SPEED_MAX)
-        self.sense_radius = clamp(self.sense_radius, CELL_SENSE_RADIUS_MIN, CELL_SENSE_RADIUS_MAX)
-        self.energy_efficiency = clamp(self.energy_efficiency, CELL_ENERGY_EFFICIENCY_MIN, CELL_ENERGY_EFFICIENCY_MAX)
-        self.size = clamp(self.size, CELL_SIZE_MIN, CELL_SIZE_MAX)
-        self.lifespan = clamp(self.lifespan, CELL_MAX_LIFESPAN // 2, CELL_MAX_LIFESPAN)
+        self.speed = clamp(self.speed, cfg.CELL_SPEED_MIN, cfg.CELL_SPEED_MAX)
+        self.sense_radius = clamp(self.sense_radius, cfg.CELL_SENSE_RADIUS_MIN, cfg.CELL_SENSE_RADIUS_MAX)
+        self.energy_efficiency = clamp(self.energy_efficiency, cfg.CELL_ENERGY_EFFICIENCY_MIN, cfg.CELL_ENERGY_EFFICIENCY_MAX)
+        self.size = clamp(self.size, cfg.CELL_SIZE_MIN, cfg.CELL_SIZE_MAX)
+        self.lifespan = clamp(self.lifespan, cfg.CELL_MAX_LIFESPAN // 2, cfg.CELL_MAX_LIFESPAN)
+
+        # Running aggregates over the clan's living cells, kept up to date by the Environment
+        # (births and deaths) and by the cells themselves when they pick up mutated traits
+        self.member_count = 0
+        self.trait_sums = [0.0] * len(TRAIT_NAMES)
+        self.trait_version = 0 # Bumped by apply_mutation so cells know to refresh their trait copies
 
     def get_traits(self):
         return {
@@ -38,18 +46,50 @@ class Clan:
             "lifespan": self.lifespan
         }
 
+    def add_member(self, cell):
+        """Count a living cell (with its current trait values) in the clan aggregates."""
+        self.member_count += 1
+        sums = self.trait_sums
+        sums[0] += cell.speed
+        sums[1] += cell.sense_radius
+        sums[2] += cell.energy_efficiency
+        sums[3] += cell.size
+        sums[4] += cell.lifespan
+        cell.counted = True
+
+    def remove_member(self, cell):
+        """Remove a cell added with add_member() from the clan aggregates; no-op for a cell that is not counted."""
+        if not cell.counted:
+            return
+        cell.counted = False
+        self.member_count -= 1
+        if self.member_count == 0:
+            self.trait_sums = [0.0] * len(TRAIT_NAMES) # Drop accumulated rounding error
+            return
+        sums = self.trait_sums
+        sums[0] -= cell.speed
+        sums[1] -= cell.sense_radius
+        sums[2] -= cell.energy_efficiency
+        sums[3] -= cell.size
+        sums[4] -= cell.lifespan
+
+    def member_means(self):
+        """Mean trait values over the clan's living cells (all 0 for an extinct clan)."""
+        count = self.member_count
+        if count == 0:
+            return {name: 0 for name in TRAIT_NAMES}
+        return {name: total / count for name, total in zip(TRAIT_NAMES, self.trait_sums)}
+
     def apply_mutation(self, trait_name, mutation_amount):
+        self.trait_version += 1
+        cfg = self.config
         if trait_name == "speed":
-            self.speed = clamp(self.speed + mutation_amount, CELL_SPEED_MIN, CELL_SPEED_MAX)
+            self.speed = clamp(self.speed + mutation_amount, cfg.CELL_SPEED_MIN, cfg.CELL_SPEED_MAX)
         elif trait_name == "sense_radius":
-            self.sense_radius = clamp(self.sense_radius + mutation_amount, CELL_SENSE_RADIUS_MIN, CELL_SENSE_RADIUS_MAX)
+            self.sense_radius = clamp(self.sense_radius + mutation_amount, cfg.CELL_SENSE_RADIUS_MIN, cfg.CELL_SENSE_RADIUS_MAX)
         elif trait_name == "energy_efficiency":
-            self.energy_efficiency = clamp(self.energy_efficiency + mutation_amount, CELL_ENERGY_EFFICIENCY_MIN, CELL_ENERGY_EFFICIENCY_MAX)
+            self.energy_efficiency = clamp(self.energy_efficiency + mutation_amount, cfg.CELL_ENERGY_EFFICIENCY_MIN, cfg.CELL_ENERGY_EFFICIENCY_MAX)
         elif trait_name == "size":
-            self.size = clamp(self.size + mutation_amount, CELL_SIZE_MIN, CELL_SIZE_MAX)
+            self.size = clamp(self.size + mutation_amount, cfg.CELL_SIZE_MIN, cfg.CELL_SIZE_MAX)
         elif trait_name == "lifespan":
-            self.lifespan = clamp(self.lifespan + mutation_amount, CELL_MAX_LIFESPAN // 2, CELL_MAX_LIFESPAN)
-
-
-
-
+            self.lifespan = clamp(self.lifespan + mutation_amount, cfg.CELL_MAX_LIFESPAN // 2, cfg.CELL_MAX_LIFESPAN)
@@ -0,0 +1,73 @@
+import copy
+
+import constants
+
+# Simulation-rule constants that can be overridden per run. Display, color and
+# asset settings stay module-level in constants.py.
+CONFIG_FIELDS = (
+    "INITIAL_CLAN_COUNT",
+    "CELLS_PER_CLAN",
+    "CELL_SIZE_MIN",
+    "CELL_SIZE_MAX",
+    "CELL_ENERGY_MAX",
+    "CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE",
+    "CELL_IDLE_ENERGY_DRAIN",
+    "CELL_REPRODUCTION_THRESHOLD",
+    "CELL_MIN_AGE_TO_REPRODUCE",
+    "CELL_MAX_LIFESPAN",
+    "CELL_MUTATION_RATE",
+    "CELL_MUTATION_AMOUNT",
+    "CELL_SPEED_MIN",
+    "CELL_SPEED_MAX",
+    "CELL_SENSE_RADIUS_MIN",
+    "CELL_SENSE_RADIUS_MAX",
+    "CELL_ENERGY_EFFICIENCY_MIN",
+    "CELL_ENERGY_EFFICIENCY_MAX",
+    "INITIAL_REPRODUCTION_TIME",
+    "INITIAL_FOOD_COUNT",
+    "FOOD_TYPES",
+    "FOOD_SPAWN_RATE_PER_FRAME",
+    "FOOD_MAX_COUNT",
+    "TOXIC_ZONE_COUNT",
+    "TOXIC_ZONE_SIZE_MIN",
+    "TOXIC_ZONE_SIZE_MAX",
+    "TOXIC_ZONE_DAMAGE_PER_FRAME",
+    "RESOURCE_ZONE_COUNT",
+    "RESOURCE_ZONE_SIZE_MIN",
+    "RESOURCE_ZONE_SIZE_MAX",
+    "RESOURCE_ZONE_FOOD_BOOST",
+    "ENVIRONMENT_CHANGE_INTERVAL",
+)
+
+
+class SimulationConfig:
+    """
+    Per-run simulation parameters.
+
+    Every field defaults to the value of the same name in constants.py and can be
+    overridden by keyword, e.g. SimulationConfig(CELL_MUTATION_RATE=0.2). An
+    Environment reads its rules from its config instead of module globals, so
+    runs with different parameters can share one process.
+    """
+
+    def __init__(self, **overrides):
+        for name in CONFIG_FIELDS:
+            setattr(self, name, copy.deepcopy(getattr(constants, name)))
+        for name, value in overrides.items():
+            if name not in CONFIG_FIELDS:
+                raise ValueError(f"Unknown simulation parameter: {name}")
+            setattr(self, name, value)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in CONFIG_FIELDS}
+
+    def overrides(self):
+        """Fields that differ from the defaults in constants.py."""
+        return {name: value for name, value in self.to_dict().items() if value != getattr(constants, name)}
+
+    def __repr__(self):
+        items = ", ".join(f"{name}={value!r}" for name, value in self.overrides().items())
+        return f"SimulationConfig({items})"
+
+
+DEFAULT_CONFIG = SimulationConfig()
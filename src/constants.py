@@ -59,6 +59,8 @@ FOOD_TYPES = [
 ]
 FOOD_SPAWN_RATE_PER_FRAME = 0.10 # Doubled from 0.05 - food spawns twice as fast
 FOOD_MAX_COUNT = 150 # Increased from 100 to support larger populations
+FOOD_GRID_CELL_SIZE = 50 # Bucket size of the food spatial index (about the minimum sense radius)
+ZONE_RASTER_CELL_SIZE = 16 # Square size of the zone coverage raster used for zone membership
 
 # Environmental factors
 TOXIC_ZONE_COUNT = 1 # Reduced from 2 to make environment less hostile
@@ -72,7 +74,11 @@ RESOURCE_ZONE_FOOD_BOOST = 3 # Increased from 2 - more food in resource zones
 ENVIRONMENT_CHANGE_INTERVAL = 900 # Increased from 600 - zones change less frequently
 
 # Simulation parameters
-FPS = 60
+FPS = 60 # Target display rate
+TICK_RATE = 60 # Simulation ticks per second of real time at 1x speed
+SIMULATION_SPEEDS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0) # Speed steps for the up/down keys; above the top is MAX
+STEP_BUDGET_SECONDS = 0.010 # Time per frame for simulation steps before the rest are shed (a frame is ~16.7 ms)
+MAX_FRAME_SECONDS = 0.25 # Longer frames (window drags, breakpoints) only count this much toward due ticks
 
 # UI parameters
 FONT_SIZE = 20
@@ -83,3 +89,50 @@ UI_PANEL_HEIGHT = 100
 CELL_IMAGE_PATH = os.path.join("assets", "cell_basic.png")
 FOOD_IMAGE_PATH = os.path.join("assets", "food_basic.png")
 BACKGROUND_IMAGE_PATH = os.path.join("assets", "background_tile.png")
+
+# Sprite caches
+SPRITE_CACHE_MAX_BYTES = 4 * 1024 * 1024 # Memory cap per tinted-sprite cache; least recently used sprites are evicted
+
+# Statistics history
+STATS_HISTORY_CAPACITY = 4096 # Samples kept per resolution level
+STATS_DOWNSAMPLE_FACTOR = 16 # Samples folded into one min/mean/max bucket of the next level
+STATS_HISTORY_LEVELS = 4 # Level 3 buckets span 16**3 samples, about 77 hours at 60 samples/s in total
+
+# Stats export
+EXPORT_BATCH_SIZE = 1024 # Rows buffered before a batch is handed to the writer thread
+
+# Event log
+LOG_QUEUE_SIZE = 10000 # Events buffered for the writer thread
+LOG_QUEUE_POLICY = "drop" # When the queue is full: "drop" new events or "block" until there is room
+LOG_BATCH_SIZE = 256 # Events written per batch
+LOG_MAX_BYTES = 10 * 1024 * 1024 # Rotate the log file past this size
+LOG_BACKUP_COUNT = 5 # Rotated files kept (simulation_log_*.txt.1 ... .5)
+
+# Profiler
+PROFILER_WINDOW = 600 # Frames/ticks per phase kept for the rolling percentiles (10 s at 60 FPS)
+PROFILER_HUD_REFRESH = 30 # Frames between refreshes of the profiler table
+PROFILER_PANEL_HEIGHT = 70 # Strip added below the UI panel for the percentile table while profiling
+
+# Large-world mode
+TILE_EXCHANGE_CAPACITY = 65536 # Rows per tile and tick in the claim, migrant and mutation exchange buffers
+
+# Live viewer
+LIVE_VIEW_NAME = "microlife_live" # Default shared-memory block name for headless.py --publish and viewer.py
+LIVE_VIEW_CELL_CAPACITY = 200_000 # Cells per published frame; larger populations are counted but not all drawn
+LIVE_VIEW_FOOD_CAPACITY = 50_000
+LIVE_VIEW_ZONE_CAPACITY = 256
+LIVE_VIEW_CLAN_CAPACITY = 64
+LIVE_VIEW_IDLE_SECONDS = 1.0 # The simulation stops publishing when no viewer has checked in for this long
+LIVE_VIEW_FPS = 30 # Viewer frame rate
+
+# Telemetry
+TELEMETRY_HOST = "127.0.0.1" # Only served locally
+TELEMETRY_PORT = 8765
+TELEMETRY_CLIENT_QUEUE = 256 # Messages buffered per WebSocket subscriber; one further behind is resent a snapshot
+TELEMETRY_PENDING_MAX = 4096 # Samples waiting for the telemetry thread; older ones are skipped if it falls behind
+TELEMETRY_RATE_WINDOW = 1.0 # Seconds over which the reported tick rate is measured
+
+# Replay logs
+REPLAY_KEYFRAME_INTERVAL = 600 # Ticks between full snapshots in a replay log; a seek replays at most this many ticks
+REPLAY_COMPRESSION_LEVEL = 1 # zlib level of the log stream; higher levels save little for much more time per tick
+REPLAY_SEEK_TICKS = 600 # Ticks skipped by the left/right keys in replay.py
@@ -0,0 +1,104 @@
+"""
+Dense entity container with stable handles and O(1) removal.
+
+Environment keeps its cells and food in EntityStores instead of plain lists.
+Items live in one dense list, so iterating stays as fast as a list, and each
+item carries the integer handle it was given on insertion. A handle never
+changes while the item is stored, so it can be held on to (e.g. by the UI)
+across ticks, and removing an item is a swap with the last element instead of
+a list.remove() scan and shift.
+
+Removal while the store is being iterated goes through tombstones instead:
+tombstone() marks an item dead, it disappears from iteration and len()
+immediately, and compact() swap-removes all marked items once the iteration
+is over.
+"""
+
+
+class EntityStore:
+    """List-like container of items with a writable `handle` attribute."""
+
+    def __init__(self, items=()):
+        self._items = [] # Dense storage; order changes on removal
+        self._index = {} # handle -> position in self._items
+        self._tombstones = set() # Handles marked for removal by compact()
+        self._next_handle = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """Store an item and return its handle."""
+        handle = self._next_handle
+        self._next_handle += 1
+        item.handle = handle
+        self._index[handle] = len(self._items)
+        self._items.append(item)
+        return handle
+
+    append = add # Drop-in for code written against plain lists
+
+    def get(self, handle):
+        """Return the live item with this handle, or None."""
+        index = self._index.get(handle)
+        if index is None or handle in self._tombstones:
+            return None
+        return self._items[index]
+
+    def remove(self, item):
+        """Remove an item in O(1) by moving the last item into its slot. Raises ValueError if absent."""
+        handle = getattr(item, "handle", None)
+        index = self._index.get(handle)
+        if index is None or self._items[index] is not item:
+            raise ValueError("item is not in the store")
+        del self._index[handle]
+        self._tombstones.discard(handle)
+        last = self._items.pop()
+        if last is not item:
+            self._items[index] = last
+            self._index[last.handle] = index
+        item.handle = None
+
+    def tombstone(self, item):
+        """Mark an item for removal without disturbing positions of an ongoing iteration."""
+        if item.handle not in self._index:
+            raise ValueError("item is not in the store")
+        self._tombstones.add(item.handle)
+
+    def compact(self):
+        """Swap-remove every tombstoned item."""
+        if not self._tombstones:
+            return
+        positions = sorted((self._index[handle] for handle in self._tombstones), reverse=True)
+        self._tombstones = set()
+        # Highest position first: the item swapped into each hole is then always a live one,
+        # and the resulting order depends only on the positions, not on handle values
+        for position in positions:
+            self.remove(self._items[position])
+
+    def clear(self):
+        for item in self._items:
+            item.handle = None
+        self._items.clear()
+        self._index.clear()
+        self._tombstones.clear()
+
+    def __len__(self):
+        return len(self._items) - len(self._tombstones)
+
+    def __iter__(self):
+        if not self._tombstones:
+            return iter(self._items)
+        tombstones = self._tombstones
+        return (item for item in self._items if item.handle not in tombstones)
+
+    def __contains__(self, item):
+        handle = getattr(item, "handle", None)
+        index = self._index.get(handle)
+        return index is not None and self._items[index] is item and handle not in self._tombstones
+
+    def __getitem__(self, position):
+        """Item at a dense position (positions, unlike handles, change when items are removed)."""
+        return self._items[position]
+
+    def __repr__(self):
+        return f"EntityStore({len(self)} items)"
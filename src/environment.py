@@ -2,24 +2,29 @@
 import pygame
 import random
 import os
-from cell import Cell
-from food import Food, spawn_food_item
-from clan import Clan # Import the Clan class
+from time import perf_counter_ns
+from cell import Cell, get_cell_image
+from food import Food, get_food_image, spawn_food_item
+from clan import TRAIT_NAMES, Clan # Import the Clan class
+from config import DEFAULT_CONFIG
 from constants import (
-    INITIAL_CELL_COUNT, INITIAL_FOOD_COUNT, FOOD_SPAWN_RATE_PER_FRAME, FOOD_MAX_COUNT,
-    SCREEN_WIDTH, SCREEN_HEIGHT, TOXIC_ZONE_COUNT, TOXIC_ZONE_SIZE_MIN, TOXIC_ZONE_SIZE_MAX,
-    TOXIC_ZONE_DAMAGE_PER_FRAME, RESOURCE_ZONE_COUNT, RESOURCE_ZONE_SIZE_MIN, RESOURCE_ZONE_SIZE_MAX,
-    RESOURCE_ZONE_FOOD_BOOST, ENVIRONMENT_CHANGE_INTERVAL, PURPLE, LIGHT_BLUE, BACKGROUND_IMAGE_PATH,
-    INITIAL_CLAN_COUNT, CELLS_PER_CLAN, CLAN_COLORS
+    SCREEN_WIDTH, SCREEN_HEIGHT, PURPLE, LIGHT_BLUE, BACKGROUND_IMAGE_PATH, CLAN_COLORS
 )
-from utils import get_distance
+from entity_store import EntityStore
+from render import draw_sprite_layer, erase_rects
+from spatial import SpatialGrid, ZoneRaster
 
-# Load background image once
-try:
-    ORIGINAL_BACKGROUND_IMAGE = pygame.image.load(BACKGROUND_IMAGE_PATH).convert()
-except pygame.error:
-    print(f"Warning: Could not load background image at {BACKGROUND_IMAGE_PATH}. Background will be black.")
-    ORIGINAL_BACKGROUND_IMAGE = None
+# Background image, loaded once a display exists by load_background_image()
+ORIGINAL_BACKGROUND_IMAGE = None
+
+def load_background_image():
+    """Load the background tile. Needs an initialized display for convert()."""
+    global ORIGINAL_BACKGROUND_IMAGE
+    try:
+        ORIGINAL_BACKGROUND_IMAGE = pygame.image.load(BACKGROUND_IMAGE_PATH).convert()
+    except (pygame.error, FileNotFoundError):
+        print(f"Warning: Could not load background image at {BACKGROUND_IMAGE_PATH}. Background will be black.")
+        ORIGINAL_BACKGROUND_IMAGE = None
 
 class Zone:
     def __init__(self, x, y, radius, color, type):
@@ -32,113 +37,252 @@ class Zone:
     def draw(self, screen):
         pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(self.radius), 2) # Draw outline
 
+def create_zones(config=DEFAULT_CONFIG, rng=random, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    """
+    Randomly place a fresh set of toxic and resource zones. Zone counts are per
+    screen-sized area, so a larger world gets proportionally more zones.
+    """
+    area_scale = (width * height) / (SCREEN_WIDTH * SCREEN_HEIGHT)
+    toxic_zones = []
+    resource_zones = []
+    for _ in range(round(config.TOXIC_ZONE_COUNT * area_scale)):
+        x = rng.randint(0, width)
+        y = rng.randint(0, height)
+        radius = rng.randint(config.TOXIC_ZONE_SIZE_MIN, config.TOXIC_ZONE_SIZE_MAX)
+        toxic_zones.append(Zone(x, y, radius, PURPLE, "toxic"))
+    for _ in range(round(config.RESOURCE_ZONE_COUNT * area_scale)):
+        x = rng.randint(0, width)
+        y = rng.randint(0, height)
+        radius = rng.randint(config.RESOURCE_ZONE_SIZE_MIN, config.RESOURCE_ZONE_SIZE_MAX)
+        resource_zones.append(Zone(x, y, radius, LIGHT_BLUE, "resource"))
+    return toxic_zones, resource_zones
+
+def build_static_layer(toxic_zones, resource_zones):
+    """
+    Pre-composite everything that does not change between frames: the tiled
+    background and the zone outlines. Rebuilt only when the zones change.
+    """
+    layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if pygame.display.get_surface() is not None:
+        layer = layer.convert() # Match the display format for fast blits
+    if ORIGINAL_BACKGROUND_IMAGE:
+        # Tile the background image across the layer
+        bg_width, bg_height = ORIGINAL_BACKGROUND_IMAGE.get_size()
+        for x in range(0, SCREEN_WIDTH, bg_width):
+            for y in range(0, SCREEN_HEIGHT, bg_height):
+                layer.blit(ORIGINAL_BACKGROUND_IMAGE, (x, y))
+    else:
+        layer.fill((0, 0, 0)) # Fallback to black background
+
+    for zone in toxic_zones:
+        zone.draw(layer)
+    for zone in resource_zones:
+        zone.draw(layer)
+    return layer
+
 class Environment:
-    def __init__(self):
-        self.cells = []
-        self.food = []
+    def __init__(self, config=None, seed=None):
+        self.config = config if config is not None else DEFAULT_CONFIG
+        # Every random draw in the run comes from this stream, so a seed fully determines the run
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.cells = EntityStore()
+        self.food = EntityStore()
+        self.food_grid = SpatialGrid() # Spatial index over self.food for Cell.find_food
         self.clans = [] # List to hold Clan objects
         self.toxic_zones = []
         self.resource_zones = []
+        self.toxic_raster = ZoneRaster([]) # Zone coverage, rebuilt by set_zones() whenever the zones change
+        self.resource_raster = ZoneRaster([])
         self.environment_timer = 0
+        self.tick = 0 # Total number of updates since the run started
+        self.static_layer = None # Background + zone outlines, built lazily by draw()
+        self.profiler = None # PhaseProfiler timing the update phases, only while profiling is on
+        self.recorder = None # ReplayRecorder writing this run's events, only while recording
         self.initialize_clans()
         self.initialize_population()
         self.initialize_zones()
 
     def initialize_clans(self):
-        for i in range(INITIAL_CLAN_COUNT):
-            self.clans.append(Clan(color=CLAN_COLORS[i % len(CLAN_COLORS)])) # Assign distinct colors
+        for i in range(self.config.INITIAL_CLAN_COUNT):
+            self.clans.append(Clan(color=CLAN_COLORS[i % len(CLAN_COLORS)], config=self.config, rng=self.rng)) # Assign distinct colors
 
     def initialize_population(self):
         # Spawn cells based on clans
         for clan in self.clans:
             # Determine a central spawning point for the clan
-            center_x = random.randint(0, SCREEN_WIDTH - 1)
-            center_y = random.randint(0, SCREEN_HEIGHT - 1)
-            for _ in range(CELLS_PER_CLAN):
+            center_x = self.rng.randint(0, SCREEN_WIDTH - 1)
+            center_y = self.rng.randint(0, SCREEN_HEIGHT - 1)
+            for _ in range(self.config.CELLS_PER_CLAN):
                 # Spawn cells clustered around the center point
-                x = center_x + random.uniform(-20, 20)
-                y = center_y + random.uniform(-20, 20)
+                x = center_x + self.rng.uniform(-20, 20)
+                y = center_y + self.rng.uniform(-20, 20)
                 x = max(0, min(x, SCREEN_WIDTH - 1))
                 y = max(0, min(y, SCREEN_HEIGHT - 1))
-                self.cells.append(Cell(x, y, clan))
+                self.add_cell(Cell(x, y, clan))
 
         # Spawn initial food
-        for _ in range(INITIAL_FOOD_COUNT):
-            self.food.append(spawn_food_item())
+        for _ in range(self.config.INITIAL_FOOD_COUNT):
+            self.spawn_food()
+
+    def add_cell(self, cell):
+        """Add a cell to the environment and its clan's running aggregates."""
+        self.cells.add(cell)
+        cell.clan.add_member(cell)
+
+    def clear_cells(self):
+        """Remove every cell, taking each out of its clan's running aggregates."""
+        for cell in self.cells:
+            cell.clan.remove_member(cell)
+        self.cells.clear()
+
+    @property
+    def cell_count(self):
+        return len(self.cells)
+
+    @property
+    def food_count(self):
+        return len(self.food)
+
+    def clan_summaries(self):
+        """(clan, living cell count, mean traits) per clan, in clan order. O(clans)."""
+        return [(clan, clan.member_count, clan.member_means()) for clan in self.clans]
+
+    def trait_means(self):
+        """Mean trait values over all living cells (all 0 when extinct). O(clans)."""
+        total = sum(clan.member_count for clan in self.clans)
+        if total == 0:
+            return {name: 0 for name in TRAIT_NAMES}
+        return {name: sum(clan.trait_sums[index] for clan in self.clans) / total
+                for index, name in enumerate(TRAIT_NAMES)}
+
+    def add_food(self, food_item):
+        """Add a food item to the environment and its spatial index."""
+        self.food.append(food_item)
+        self.food_grid.insert(food_item)
+        if self.recorder is not None:
+            self.recorder.food_spawned(food_item)
+
+    def spawn_food(self, x=None, y=None):
+        """Spawn one food item of a random type, at (x, y) or a random position, from the run's RNG."""
+        self.add_food(spawn_food_item(x, y, config=self.config, rng=self.rng))
 
     def initialize_zones(self):
-        self.toxic_zones = []
-        self.resource_zones = []
-        for _ in range(TOXIC_ZONE_COUNT):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            radius = random.randint(TOXIC_ZONE_SIZE_MIN, TOXIC_ZONE_SIZE_MAX)
-            self.toxic_zones.append(Zone(x, y, radius, PURPLE, "toxic"))
-        for _ in range(RESOURCE_ZONE_COUNT):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            radius = random.randint(RESOURCE_ZONE_SIZE_MIN, RESOURCE_ZONE_SIZE_MAX)
-            self.resource_zones.append(Zone(x, y, radius, LIGHT_BLUE, "resource"))
+        self.set_zones(*create_zones(self.config, self.rng))
+
+    def set_zones(self, toxic_zones, resource_zones):
+        """Replace the zones and rebuild everything derived from them."""
+        self.toxic_zones = toxic_zones
+        self.resource_zones = resource_zones
+        self.toxic_raster = ZoneRaster(toxic_zones)
+        self.resource_raster = ZoneRaster(resource_zones)
+        self.static_layer = None # Zones moved, redraw the static layer on the next frame
+        if self.recorder is not None:
+            self.recorder.zones_changed(toxic_zones, resource_zones)
 
     def update(self):
+        cfg = self.config
+        profiler = self.profiler
+        if profiler is not None:
+            phase_start = perf_counter_ns()
+        self.tick += 1
         self.environment_timer += 1
-        if self.environment_timer >= ENVIRONMENT_CHANGE_INTERVAL:
+        if self.environment_timer >= cfg.ENVIRONMENT_CHANGE_INTERVAL:
             self.initialize_zones() # Re-initialize zones to simulate dynamic changes
             self.environment_timer = 0
 
-        # Update cells
-        new_cells = []
-        for cell in self.cells:
-            # Apply environmental effects to cells
-            for zone in self.toxic_zones:
-                if get_distance((cell.x, cell.y), (zone.x, zone.y)) < zone.radius:
-                    cell.energy -= TOXIC_ZONE_DAMAGE_PER_FRAME
+        # Apply environmental effects to cells. Each cell only moves during its own update,
+        # so damaging every cell up front is the same as damaging each one just before it updates.
+        # One raster lookup per cell, however many toxic zones there are.
+        cells = self.cells
+        if self.toxic_zones:
+            zone_count = self.toxic_raster.count
+            damage = cfg.TOXIC_ZONE_DAMAGE_PER_FRAME
+            for cell in cells:
+                for _ in range(zone_count(cell.x, cell.y)): # Once per zone, as overlapping zones stack
+                    cell.energy -= damage
+        if profiler is not None:
+            phase_start = profiler.lap("zones", phase_start)
 
-            if cell.update(self.food):
-                new_cells.append(cell)
+        # Update cells. Offspring are appended behind the current cells and first update next
+        # tick; dead cells are tombstoned so positions stay put until the loop is done.
+        # While recording, the cells eat through a stand-in for self.food that logs each meal.
+        recorder = self.recorder
+        food_items = self.food if recorder is None else recorder.meal_recorder
+        for index in range(len(cells)):
+            cell = cells[index]
+            if recorder is not None:
+                food_items.cell = cell
+            if cell.update(food_items, self.food_grid):
                 # Check for reproduction
                 offspring = cell.reproduce()
                 if offspring:
-                    new_cells.append(offspring)
-        self.cells = new_cells
+                    self.add_cell(offspring)
+                    if recorder is not None:
+                        recorder.born(offspring, cell)
+            else:
+                if recorder is not None:
+                    recorder.died(cell)
+                cells.tombstone(cell)
+                cell.clan.remove_member(cell)
+        cells.compact()
+        if profiler is not None:
+            phase_start = profiler.lap("cells", phase_start)
 
         # Update food and handle decay
-        new_food = []
-        for food_item in self.food:
-            if food_item.update(): # Check if food has decayed
-                new_food.append(food_item)
-        self.food = new_food
+        food = self.food
+        for food_item in food:
+            if not food_item.update(): # Check if food has decayed
+                if recorder is not None:
+                    recorder.food_decayed(food_item)
+                food.tombstone(food_item)
+                self.food_grid.remove(food_item)
+        food.compact()
+        if profiler is not None:
+            phase_start = profiler.lap("food", phase_start)
 
         # Dynamic food spawning, adjusted by resource zones
         food_spawn_multiplier = 1
-        for zone in self.resource_zones:
-            # If a cell is in a resource zone, food spawns faster around it
-            # For simplicity, we\"ll just boost overall spawn rate if any cell is in a resource zone
-            # A more complex approach would be to spawn food *within* the zone
-            if any(get_distance((cell.x, cell.y), (zone.x, zone.y)) < zone.radius for cell in self.cells):
-                food_spawn_multiplier = RESOURCE_ZONE_FOOD_BOOST
-                break
+        # If a cell is in a resource zone, food spawns faster around it
+        # For simplicity, we\"ll just boost overall spawn rate if any cell is in a resource zone
+        # A more complex approach would be to spawn food *within* the zone
+        if self.resource_zones:
+            in_resource_zone = self.resource_raster.contains
+            if any(in_resource_zone(cell.x, cell.y) for cell in cells):
+                food_spawn_multiplier = cfg.RESOURCE_ZONE_FOOD_BOOST
 
-        if len(self.food) < FOOD_MAX_COUNT and random.random() < FOOD_SPAWN_RATE_PER_FRAME * food_spawn_multiplier:
-            self.food.append(spawn_food_item())
+        if len(self.food) < cfg.FOOD_MAX_COUNT and self.rng.random() < cfg.FOOD_SPAWN_RATE_PER_FRAME * food_spawn_multiplier:
+            self.spawn_food()
+        if profiler is not None:
+            profiler.lap("spawn", phase_start)
+        if recorder is not None:
+            recorder.end_tick()
 
     def draw(self, screen):
-        if ORIGINAL_BACKGROUND_IMAGE:
-            # Tile the background image across the screen
-            bg_width, bg_height = ORIGINAL_BACKGROUND_IMAGE.get_size()
-            for x in range(0, SCREEN_WIDTH, bg_width):
-                for y in range(0, SCREEN_HEIGHT, bg_height):
-                    screen.blit(ORIGINAL_BACKGROUND_IMAGE, (x, y))
-        else:
-            screen.fill((0, 0, 0)) # Fallback to black background
-
-        for zone in self.toxic_zones:
-            zone.draw(screen)
-        for zone in self.resource_zones:
-            zone.draw(screen)
-        for food_item in self.food:
-            food_item.draw(screen)
-        for cell in self.cells:
-            cell.draw(screen)
+        """Draw the full simulation area. Returns the rects covered by food and cell sprites."""
+        if self.static_layer is None:
+            self.static_layer = build_static_layer(self.toxic_zones, self.resource_zones)
+        screen.blit(self.static_layer, (0, 0))
+        return self._draw_entities(screen)
+
+    def draw_dirty(self, screen, previous_rects):
+        """
+        Redraw only the areas that changed since the last frame: erase the sprites
+        drawn at `previous_rects` from the static layer, then draw every sprite again.
+        Returns (sprite_rects, dirty_rects) where dirty_rects must be pushed to the display.
+        """
+        if self.static_layer is None: # Zones changed (or first frame): everything is dirty
+            return self.draw(screen), [pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)]
+        erase_rects(screen, self.static_layer, previous_rects)
+        sprite_rects = self._draw_entities(screen)
+        return sprite_rects, previous_rects + sprite_rects
+
+    def _draw_entities(self, screen):
+        """Draw food, then cells on top, with one batched blit per layer."""
+        rects = draw_sprite_layer(screen, ((get_food_image(food_item.size, food_item.color), food_item.x, food_item.y,
+                                            food_item.color, food_item.size) for food_item in self.food))
+        rects.extend(draw_sprite_layer(screen, ((get_cell_image(cell.size, cell.clan), cell.x, cell.y,
+                                                 cell.clan.color, cell.size) for cell in self.cells)))
+        return rects
 
 
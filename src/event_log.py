@@ -0,0 +1,140 @@
+"""
+Buffered, asynchronous event log.
+
+EventLogger.log() only appends a structured record (wall time, tick, event
+type, payload) to a bounded queue; a writer thread formats the records and
+writes them to the log file in batches. When the queue is full, the "drop"
+policy discards new records (and counts them) so the simulation never waits
+on disk I/O, while "block" makes log() wait for room. The file is rotated
+once it grows past a size limit: log.txt -> log.txt.1 -> log.txt.2 ...
+
+If formatting or writing fails, the writer thread keeps the first error, keeps
+draining (and discarding) the queue so nothing waits on it forever, and
+log(), flush() and close() raise it on the simulation thread.
+"""
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+
+from constants import LOG_BACKUP_COUNT, LOG_BATCH_SIZE, LOG_MAX_BYTES, LOG_QUEUE_POLICY, LOG_QUEUE_SIZE
+
+QUEUE_POLICIES = ("drop", "block")
+
+
+def format_record(record):
+    """One log line for a (wall time, tick, event type, payload) record."""
+    wall_time, tick, event_type, payload = record
+    timestamp = datetime.datetime.fromtimestamp(wall_time).strftime("%H:%M:%S")
+    if not isinstance(payload, str):
+        payload = json.dumps(payload)
+    if tick is None:
+        return f"[{timestamp}] [{event_type}] {payload}\n"
+    return f"[{timestamp}] [tick {tick}] [{event_type}] {payload}\n"
+
+
+class EventLogger:
+    """Structured event log written by a background thread."""
+
+    def __init__(self, path, max_queue=LOG_QUEUE_SIZE, policy=LOG_QUEUE_POLICY, max_bytes=LOG_MAX_BYTES,
+                 backup_count=LOG_BACKUP_COUNT, batch_size=LOG_BATCH_SIZE):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy {policy!r}, expected one of {QUEUE_POLICIES}")
+        self.path = path
+        self.policy = policy
+        self.max_bytes = max_bytes # Rotate once the file grows past this (0 disables rotation)
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.dropped = 0 # Records discarded because the queue was full ("drop" policy)
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = open(path, "a")
+        self._closed = False
+        self._error = None # First exception raised in the writer thread
+        self._thread = threading.Thread(target=self._write_loop, name="event-log", daemon=True)
+        self._thread.start()
+
+    def log(self, event_type, payload, tick=None):
+        """Queue one event. `payload` is a message string or a JSON-serializable dict."""
+        if self._closed:
+            raise ValueError("log() on a closed EventLogger")
+        self._raise_error()
+        record = (time.time(), tick, event_type, payload)
+        if self.policy == "block":
+            self._queue.put(record)
+        else:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+    def flush(self):
+        """Block until every queued record has been written and flushed to the file."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Write everything still queued, then stop the writer thread and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        # Always enqueued, even with the "drop" policy; retried while the writer makes room
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._file.close()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("Event log writer failed") from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is already queued, up to a batch, without waiting
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            records = [record for record in batch if record is not None]
+            try:
+                if records and self._error is None: # After a failure, records are only drained
+                    self._file.write("".join(format_record(record) for record in records))
+                    self._file.flush()
+                    self.written += len(records)
+                    if self.max_bytes and self._file.tell() >= self.max_bytes:
+                        self._rotate()
+            except Exception as e: # Surfaced to the simulation thread by log()/flush()/close()
+                self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self._file = open(self.path, "w")
+        else:
+            self._file = open(self.path, "w") # No backups: start over
@@ -0,0 +1,176 @@
+"""
+Streaming export of per-tick statistics.
+
+StatsExporter collects one row per recorded tick (global stats plus per-clan
+aggregates) into a NumPy batch buffer on the simulation thread. Full batches
+are handed to a background writer thread, which appends them to:
+
+    stats.csv             human-readable, one line per tick
+    stats_000000.npy      one float64 chunk per batch, shape (rows, columns)
+    stats_000000.parquet  one file per exporter session, only when pyarrow is installed
+    columns.json          column names, in chunk column order
+
+Analysis jobs can memory-map the .npy chunks with load_chunks()/load_stats()
+instead of parsing text.
+"""
+import glob
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from clan import TRAIT_NAMES
+from constants import EXPORT_BATCH_SIZE
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError: # Parquet output is optional
+    pyarrow = None
+
+COLUMNS_FILE = "columns.json"
+CSV_FILE = "stats.csv"
+PARQUET_PATTERN = "stats_{:06d}.parquet" # Numbered by the session's first chunk
+CHUNK_PATTERN = "stats_{:06d}.npy"
+
+
+def stats_columns(environment):
+    """Column names of the rows produced by stats_row() for this environment."""
+    columns = ["tick", "cell_count", "food_count"] + [f"avg_{name}" for name in TRAIT_NAMES]
+    for index in range(len(environment.clans)): # By position, so runs with the same clan count line up
+        columns.append(f"clan_{index}_count")
+        columns.extend(f"clan_{index}_{name}" for name in TRAIT_NAMES)
+    return columns
+
+
+def stats_row(environment):
+    """Current global stats and per-clan aggregates as a flat list of numbers. O(clans)."""
+    trait_means = environment.trait_means()
+    row = [environment.tick, environment.cell_count, environment.food_count]
+    row.extend(trait_means[name] for name in TRAIT_NAMES)
+    for _, count, means in environment.clan_summaries():
+        row.append(count)
+        row.extend(means[name] for name in TRAIT_NAMES)
+    return row
+
+
+class StatsExporter:
+    """Append stats rows to CSV, .npy chunks and (optionally) Parquet from a background thread."""
+
+    def __init__(self, directory, columns, batch_size=EXPORT_BATCH_SIZE, parquet=None):
+        self.directory = directory
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.parquet = pyarrow is not None if parquet is None else parquet
+        if self.parquet and pyarrow is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        os.makedirs(directory, exist_ok=True)
+
+        columns_path = os.path.join(directory, COLUMNS_FILE)
+        if os.path.exists(columns_path):
+            with open(columns_path) as f:
+                if json.load(f) != self.columns:
+                    raise ValueError(f"{directory} already holds an export with different columns")
+        else:
+            with open(columns_path, "w") as f:
+                json.dump(self.columns, f)
+        self._chunk_index = len(glob.glob(os.path.join(directory, CHUNK_PATTERN.replace("{:06d}", "*"))))
+
+        self._buffer = np.empty((batch_size, len(self.columns)))
+        self._rows = 0
+        self.rows_recorded = 0
+        self._queue = queue.Queue()
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._write_loop, name="stats-exporter", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def for_environment(cls, directory, environment, **kwargs):
+        return cls(directory, stats_columns(environment), **kwargs)
+
+    def record(self, row):
+        """Buffer one row; hands a full batch to the writer thread."""
+        self._buffer[self._rows] = row
+        self._rows += 1
+        self.rows_recorded += 1
+        if self._rows == self.batch_size:
+            self.flush()
+
+    def record_environment(self, environment):
+        self.record(stats_row(environment))
+
+    def flush(self):
+        """Hand the rows buffered so far to the writer thread (without waiting for the write)."""
+        if self._error is not None:
+            raise RuntimeError("Stats export failed") from self._error
+        if self._rows:
+            self._queue.put(self._buffer[:self._rows])
+            self._buffer = np.empty((self.batch_size, len(self.columns)))
+            self._rows = 0
+
+    def close(self):
+        """Flush the remaining rows, wait until everything is on disk and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("Stats export failed") from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_loop(self):
+        csv_path = os.path.join(self.directory, CSV_FILE)
+        write_header = not os.path.exists(csv_path)
+        parquet_writer = None
+        try:
+            with open(csv_path, "a") as csv_file:
+                if write_header:
+                    csv_file.write(",".join(self.columns) + "\n")
+                while True:
+                    batch = self._queue.get()
+                    if batch is None:
+                        break
+                    np.savetxt(csv_file, batch, delimiter=",", fmt="%.10g")
+                    csv_file.flush()
+                    if self.parquet:
+                        table = pyarrow.table({name: batch[:, i] for i, name in enumerate(self.columns)})
+                        if parquet_writer is None:
+                            parquet_path = os.path.join(self.directory, PARQUET_PATTERN.format(self._chunk_index))
+                            parquet_writer = pyarrow.parquet.ParquetWriter(parquet_path, table.schema)
+                        parquet_writer.write_table(table)
+                    np.save(os.path.join(self.directory, CHUNK_PATTERN.format(self._chunk_index)), batch)
+                    self._chunk_index += 1
+        except Exception as e: # Surfaced to the simulation thread by flush()/close()
+            self._error = e
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+
+
+def load_columns(directory):
+    with open(os.path.join(directory, COLUMNS_FILE)) as f:
+        return json.load(f)
+
+
+def load_chunks(directory):
+    """Memory-mapped (rows, columns) arrays of every exported chunk, in write order."""
+    paths = sorted(glob.glob(os.path.join(directory, CHUNK_PATTERN.replace("{:06d}", "*"))))
+    return [np.load(path, mmap_mode="r") for path in paths]
+
+
+def load_stats(directory):
+    """All exported rows as a dict of column name -> 1-D array."""
+    columns = load_columns(directory)
+    chunks = load_chunks(directory)
+    data = np.concatenate(chunks) if chunks else np.empty((0, len(columns)))
+    return {name: data[:, i] for i, name in enumerate(columns)}
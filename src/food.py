@@ -3,25 +3,58 @@ import random
 
 import pygame
 
-from constants import FOOD_IMAGE_PATH, FOOD_TYPES, SCREEN_HEIGHT, SCREEN_WIDTH
+from config import DEFAULT_CONFIG
+from constants import FOOD_IMAGE_PATH, SCREEN_HEIGHT, SCREEN_WIDTH
+from sprite_cache import SpriteCache, build_tinted_sprite
 
-# Load food image once (32x32 sprite)
-try:
-    ORIGINAL_FOOD_IMAGE = pygame.image.load(FOOD_IMAGE_PATH).convert_alpha()
-    print(f"Loaded food sprite: {ORIGINAL_FOOD_IMAGE.get_size()}")
-except pygame.error:
-    print(f"Warning: Could not load food image at {FOOD_IMAGE_PATH}. Falling back to drawing circles.")
-    ORIGINAL_FOOD_IMAGE = None
+# Food image (32x32 sprite), loaded once a display exists by load_food_image()
+ORIGINAL_FOOD_IMAGE = None
 
-# Cache for scaled food images by size and color to improve performance
-_food_image_cache = {}
+def load_food_image():
+    """Load the food sprite. Needs an initialized display for convert_alpha()."""
+    global ORIGINAL_FOOD_IMAGE
+    try:
+        ORIGINAL_FOOD_IMAGE = pygame.image.load(FOOD_IMAGE_PATH).convert_alpha()
+        print(f"Loaded food sprite: {ORIGINAL_FOOD_IMAGE.get_size()}")
+    except (pygame.error, FileNotFoundError):
+        print(f"Warning: Could not load food image at {FOOD_IMAGE_PATH}. Falling back to drawing circles.")
+        ORIGINAL_FOOD_IMAGE = None
+    clear_food_image_cache()
+
+# Cache for scaled and tinted food images, bounded by SPRITE_CACHE_MAX_BYTES
+_food_image_cache = SpriteCache()
 
 def clear_food_image_cache():
     """Clear the food image cache to free memory if needed."""
-    global _food_image_cache
     _food_image_cache.clear()
 
+def food_image_cache_stats():
+    """Size and hit/miss counters of the food image cache."""
+    return _food_image_cache.stats()
+
+def get_food_image(size, color):
+    """Return the tinted food sprite for a size and color, or None if no sprite is loaded."""
+    if not ORIGINAL_FOOD_IMAGE:
+        return None
+    cache_key = (size, color)
+    colored_image = _food_image_cache.get(cache_key)
+    if colored_image is None:
+        colored_image = build_tinted_sprite(ORIGINAL_FOOD_IMAGE, size, color)
+        _food_image_cache.put(cache_key, colored_image)
+    return colored_image
+
+def prewarm_food_images(food_types):
+    """Build the sprite of every food type up front, so none are built mid-frame."""
+    if not ORIGINAL_FOOD_IMAGE:
+        return
+    for food_type in food_types:
+        cache_key = (food_type["size"], food_type["color"])
+        if cache_key not in _food_image_cache:
+            _food_image_cache.put(cache_key, build_tinted_sprite(ORIGINAL_FOOD_IMAGE, *cache_key))
+
 class Food:
+    __slots__ = ("x", "y", "color", "size", "energy_value", "lifespan", "age", "handle")
+
     def __init__(self, x, y, food_type_data):
         self.x = x
         self.y = y
@@ -30,32 +63,16 @@ class Food:
         self.energy_value = food_type_data["energy_value"]
         self.lifespan = food_type_data["lifespan"]
         self.age = 0
+        self.handle = None # Stable id assigned by the EntityStore holding this food item
 
     def draw(self, screen):
-        if ORIGINAL_FOOD_IMAGE:
-            # Create cache key based on size and color
-            cache_key = (self.size, self.color)
-            
-            # Check if we have a cached version of this sprite
-            if cache_key not in _food_image_cache:
-                # Scale the 32x32 sprite to match food size (multiply by 2 for diameter)
-                target_size = max(self.size * 2, 8)  # Minimum 8 pixels
-                scaled_image = pygame.transform.smoothscale(ORIGINAL_FOOD_IMAGE, (target_size, target_size))
-                
-                # Apply color tint to food
-                colored_image = scaled_image.copy()
-                colored_image.fill(self.color + (0,), None, pygame.BLEND_RGBA_MULT)
-                
-                # Cache the result
-                _food_image_cache[cache_key] = colored_image
-            
-            # Use cached image
-            colored_image = _food_image_cache[cache_key]
+        """Draw the food item and return the screen area it covers."""
+        colored_image = get_food_image(self.size, self.color)
+        if colored_image is not None:
             image_rect = colored_image.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(colored_image, image_rect)
-        else:
-            # Fallback to circles if sprite not loaded
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
+            return screen.blit(colored_image, image_rect)
+        # Fallback to circles if sprite not loaded
+        return pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
 
     def update(self):
         self.age += 1
@@ -63,10 +80,10 @@ class Food:
             return False # Indicate decay
         return True # Indicate alive
 
-def spawn_food_item(x=None, y=None):
-    food_type_data = random.choice(FOOD_TYPES)
+def spawn_food_item(x=None, y=None, config=DEFAULT_CONFIG, rng=random):
+    food_type_data = rng.choice(config.FOOD_TYPES)
     if x is None:
-        x = random.randint(0, SCREEN_WIDTH - food_type_data["size"])
+        x = rng.randint(0, SCREEN_WIDTH - food_type_data["size"])
     if y is None:
-        y = random.randint(0, SCREEN_HEIGHT - food_type_data["size"])
+        y = rng.randint(0, SCREEN_HEIGHT - food_type_data["size"])
     return Food(x, y, food_type_data)
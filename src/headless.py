@@ -0,0 +1,168 @@
+"""
+Headless entry point: runs the simulation as fast as the CPU allows, with no
+display, no sprite loading, no drawing and no frame-rate cap.
+
+Usage:
+    python headless.py --ticks 100000 --seed 42 [--vectorized]
+    python headless.py --ticks 1000000 --checkpoint run.ckpt --checkpoint-every 10000
+    python headless.py --ticks 500000 --resume run.ckpt --checkpoint run.ckpt --checkpoint-every 10000
+    python headless.py --ticks 100000 --seed 42 --export stats/run42
+    python headless.py --ticks 1000 --world 40000x40000 --tiles 4x4 --cells 1000000
+    python headless.py --ticks 10000000 --publish   # watch it with: python viewer.py
+    python headless.py --ticks 10000000 --telemetry 8765   # curl http://127.0.0.1:8765/metrics
+    python headless.py --ticks 100000 --seed 42 --record run.mlr   # play it back with: python replay.py run.mlr
+"""
+import argparse
+import time
+
+from checkpoint import load_checkpoint, save_checkpoint
+from config import DEFAULT_CONFIG
+from environment import Environment
+from constants import LIVE_VIEW_NAME, TELEMETRY_PORT
+from exporter import StatsExporter
+from live_view import LiveFrameBuffer
+from replay_log import ReplayRecorder
+from telemetry import TelemetryServer, telemetry_sample
+from tiled_world import TiledWorld
+from vector_engine import VectorEnvironment
+
+
+def create_environment(seed=None, vectorized=False, config=None):
+    if vectorized:
+        return VectorEnvironment(seed=seed, config=config)
+    return Environment(config=config, seed=seed)
+
+
+def run_headless(environment, ticks, checkpoint_path=None, checkpoint_every=0, exporter=None, live_view=None,
+                 telemetry=None):
+    """
+    Advance the environment `ticks` times in a tight loop and return the elapsed seconds.
+    With a checkpoint path and interval, the full state is saved every `checkpoint_every` ticks.
+    With a StatsExporter, a stats row is recorded after every tick.
+    With a LiveFrameBuffer, every tick is published for viewer.py while one is attached.
+    With a TelemetryServer, a telemetry sample is published after every tick.
+    """
+    update = environment.update
+    start = time.perf_counter()
+    if ((checkpoint_path and checkpoint_every > 0) or exporter is not None or live_view is not None
+            or telemetry is not None):
+        for _ in range(ticks):
+            update()
+            if exporter is not None:
+                exporter.record_environment(environment)
+            if live_view is not None:
+                live_view.publish(environment)
+            if telemetry is not None:
+                telemetry.publish(telemetry_sample(environment))
+            if checkpoint_path and checkpoint_every > 0 and environment.tick % checkpoint_every == 0:
+                save_checkpoint(environment, checkpoint_path)
+    else:
+        for _ in range(ticks):
+            update()
+    return time.perf_counter() - start
+
+
+def parse_size(text):
+    """'WxH' -> (W, H)."""
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"sizes must be positive, got {text!r}")
+    return width, height
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the MicroLife simulation without a display.")
+    parser.add_argument("--ticks", type=int, default=10000, help="number of simulation ticks to run")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the run")
+    parser.add_argument("--vectorized", action="store_true", help="use the NumPy struct-of-arrays engine")
+    parser.add_argument("--checkpoint", default=None, help="file to write checkpoints to")
+    parser.add_argument("--checkpoint-every", type=int, default=0, help="checkpoint interval in ticks")
+    parser.add_argument("--resume", default=None, help="checkpoint file to resume from")
+    parser.add_argument("--export", default=None, metavar="DIR",
+                        help="stream per-tick stats (CSV + .npy chunks) to DIR, appending to earlier exports")
+    parser.add_argument("--publish", nargs="?", const=LIVE_VIEW_NAME, default=None, metavar="NAME",
+                        help=f"publish every tick to shared memory for viewer.py (default name {LIVE_VIEW_NAME})")
+    parser.add_argument("--telemetry", type=int, nargs="?", const=TELEMETRY_PORT, default=None, metavar="PORT",
+                        help=f"serve live metrics on http://127.0.0.1:PORT (default port {TELEMETRY_PORT})")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="write a replay log of the run to PATH (play it back with replay.py)")
+    parser.add_argument("--world", type=parse_size, default=None, metavar="WxH",
+                        help="run a large world of this size split into tiles stepped by worker processes")
+    parser.add_argument("--tiles", type=parse_size, default=None, metavar="CxR",
+                        help="tile columns and rows for --world, one worker process per tile (default 2x2)")
+    parser.add_argument("--cells", type=int, default=None, help="initial cell count for --world")
+    args = parser.parse_args(argv)
+    if args.world and (args.checkpoint or args.resume or args.export or args.publish or args.telemetry is not None
+                       or args.record):
+        parser.error("--world cannot be combined with checkpoints, --export, --publish, --telemetry or --record")
+    if args.world and args.vectorized:
+        parser.error("--world cannot be combined with --vectorized; tiled worlds have their own array engine")
+    if args.cells is not None and not args.world:
+        parser.error("--cells requires --world")
+    if args.tiles is not None and not args.world:
+        parser.error("--tiles requires --world")
+    if args.vectorized and (args.checkpoint or args.resume):
+        parser.error("checkpoints are only supported for the reference engine")
+    if args.vectorized and args.record:
+        parser.error("replay logs are only recorded from the reference engine")
+    if args.resume and args.seed is not None:
+        parser.error("--seed cannot be combined with --resume; the checkpoint carries its own RNG state")
+    return args
+
+
+def run_tiled(args):
+    width, height = args.world
+    columns, rows = args.tiles if args.tiles is not None else (2, 2)
+    cells = args.cells if args.cells is not None else DEFAULT_CONFIG.INITIAL_CLAN_COUNT * DEFAULT_CONFIG.CELLS_PER_CLAN
+    with TiledWorld(width, height, columns, rows, cells, seed=args.seed) as world:
+        start = time.perf_counter()
+        world.step(args.ticks)
+        elapsed = time.perf_counter() - start
+        ticks_per_second = args.ticks / elapsed if elapsed > 0 else float("inf")
+        print(f"Seed: {world.seed}")
+        print(f"Ran {args.ticks} ticks of a {width}x{height} world on {len(world.grid)} tiles "
+              f"in {elapsed:.2f}s ({ticks_per_second:.1f} ticks/sec)")
+        print(f"Final population: {world.cell_count} cells, {world.food_count} food")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.world:
+        run_tiled(args)
+        return
+    if args.resume:
+        environment = load_checkpoint(args.resume)
+        print(f"Resumed from {args.resume} at tick {environment.tick}")
+    else:
+        environment = create_environment(args.seed, args.vectorized)
+    exporter = StatsExporter.for_environment(args.export, environment) if args.export else None
+    live_view = LiveFrameBuffer.create(args.publish) if args.publish else None
+    telemetry = TelemetryServer(port=args.telemetry).start() if args.telemetry is not None else None
+    recorder = ReplayRecorder(args.record, environment) if args.record else None # Hooks into environment.update
+    try:
+        elapsed = run_headless(environment, args.ticks, args.checkpoint, args.checkpoint_every, exporter, live_view,
+                               telemetry)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if telemetry is not None:
+            telemetry.close()
+        if exporter is not None:
+            exporter.close()
+        if live_view is not None:
+            live_view.publish(environment, force=True) # Final state for any viewer that is still open
+            live_view.close()
+    if args.checkpoint:
+        save_checkpoint(environment, args.checkpoint)
+
+    ticks_per_second = args.ticks / elapsed if elapsed > 0 else float("inf")
+    print(f"Seed: {environment.seed}")
+    print(f"Ran {args.ticks} ticks in {elapsed:.2f}s ({ticks_per_second:.1f} ticks/sec)")
+    print(f"Final population: {len(environment.cells)} cells, {len(environment.food)} food")
+
+
+if __name__ == "__main__":
+    main()
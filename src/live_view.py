@@ -0,0 +1,238 @@
+"""
+Shared-memory frame buffer between a running simulation and a live viewer.
+
+The simulation process owns one shared-memory block holding a header and two
+frame slots. Each tick, publish() copies entity positions, sizes and colors,
+the zones and the UI panel stats into the slot that is not currently the
+latest, then marks it as the latest. The viewer copies out the latest slot at
+its own frame rate. Neither side ever waits for the other:
+
+    - every slot has a sequence number that is odd while it is being written;
+      a reader that sees it odd, or changed after copying, just tries again
+    - the viewer stamps a heartbeat into the header, and publish() does nothing
+      but compare timestamps while no viewer has checked in for
+      LIVE_VIEW_IDLE_SECONDS, so an unwatched run pays almost nothing
+
+Populations beyond the buffer capacity are still counted in the stats, but only
+the first `cell_capacity` cells (and `food_capacity` food items) are drawn.
+"""
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from clan import TRAIT_NAMES
+from constants import (
+    LIVE_VIEW_CELL_CAPACITY,
+    LIVE_VIEW_CLAN_CAPACITY,
+    LIVE_VIEW_FOOD_CAPACITY,
+    LIVE_VIEW_IDLE_SECONDS,
+    LIVE_VIEW_ZONE_CAPACITY,
+)
+from vector_engine import VectorEnvironment
+
+MAGIC = 0x4D4C4956 # "MLIV"
+
+# Header fields (float64)
+HEADER_SIZE = 8
+H_MAGIC, H_PUBLISHED, H_CLOSED, H_HEARTBEAT, H_CELLS, H_FOOD, H_ZONES, H_CLANS = range(HEADER_SIZE)
+# Slot metadata fields (float64)
+META_SIZE = 8
+M_SEQUENCE, M_TICK, M_TIME, M_CELLS, M_FOOD, M_ZONES, M_CLANS = range(7)
+
+CELL_COLUMNS = 4 # x, y, size, clan row
+FOOD_COLUMNS = 6 # x, y, size, r, g, b
+ZONE_COLUMNS = 4 # x, y, radius, 1 for resource zones (0 for toxic)
+CLAN_COLUMNS = 10 # id, living cells, r, g, b, mean speed, sense radius, energy efficiency, size, lifespan
+AVERAGE_COLUMNS = 3 # mean speed, sense radius, energy efficiency over all cells
+
+READ_ATTEMPTS = 4
+
+_created_names = set() # Blocks created by this process, which its resource tracker should keep tracking
+
+LiveFrame = namedtuple("LiveFrame", "tick time cell_count food_count averages clans zones cells food")
+LiveFrame.__doc__ = """A copy of one published frame. Counts are the full population; `cells` may be truncated."""
+
+
+def _slot_layout(cell_capacity, food_capacity, zone_capacity, clan_capacity):
+    """[(name, dtype, shape)] of one slot, in memory order."""
+    return [
+        ("meta", np.float64, (META_SIZE,)),
+        ("averages", np.float64, (AVERAGE_COLUMNS,)),
+        ("clans", np.float64, (clan_capacity, CLAN_COLUMNS)),
+        ("zones", np.float64, (zone_capacity, ZONE_COLUMNS)),
+        ("cells", np.float32, (cell_capacity, CELL_COLUMNS)),
+        ("food", np.float32, (food_capacity, FOOD_COLUMNS)),
+    ]
+
+
+def _layout_size(layout):
+    return sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in layout)
+
+
+class LiveFrameBuffer:
+    """The shared header and double-buffered frame slots. Use create() or attach()."""
+
+    def __init__(self, block, owner):
+        self._block = block
+        self.owner = owner # The publishing side unlinks the block on close
+        self.name = block.name
+        self.header = np.ndarray((HEADER_SIZE,), dtype=np.float64, buffer=block.buf)
+        capacities = [int(value) for value in self.header[H_CELLS:H_CLANS + 1]]
+        self.cell_capacity, self.food_capacity, self.zone_capacity, self.clan_capacity = capacities
+        layout = _slot_layout(*capacities)
+        offset = self.header.nbytes
+        self.slots = []
+        for _ in range(2):
+            slot = {}
+            for name, dtype, shape in layout:
+                slot[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+                offset += slot[name].nbytes
+            self.slots.append(slot)
+
+    @classmethod
+    def create(cls, name, cell_capacity=LIVE_VIEW_CELL_CAPACITY, food_capacity=LIVE_VIEW_FOOD_CAPACITY,
+               zone_capacity=LIVE_VIEW_ZONE_CAPACITY, clan_capacity=LIVE_VIEW_CLAN_CAPACITY):
+        """Create the named block for a simulation to publish into (FileExistsError if the name is taken)."""
+        size = HEADER_SIZE * 8 + 2 * _layout_size(_slot_layout(cell_capacity, food_capacity, zone_capacity,
+                                                                clan_capacity))
+        block = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created_names.add(block._name)
+        header = np.ndarray((HEADER_SIZE,), dtype=np.float64, buffer=block.buf)
+        header[:] = 0
+        header[H_CELLS:H_CLANS + 1] = (cell_capacity, food_capacity, zone_capacity, clan_capacity)
+        header[H_MAGIC] = MAGIC # Written last: the block is valid from here on
+        return cls(block, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a block created by a running simulation (FileNotFoundError if there is none)."""
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError: # Before Python 3.13 attaching always registers with the resource tracker,
+            block = shared_memory.SharedMemory(name=name) # which would unlink the block when the viewer exits
+            if block._name not in _created_names:
+                resource_tracker.unregister(block._name, "shared_memory")
+        if block.size < HEADER_SIZE * 8 or np.ndarray((1,), dtype=np.float64, buffer=block.buf)[0] != MAGIC:
+            block.close()
+            raise ValueError(f"Shared memory {name!r} is not a live view buffer")
+        return cls(block, owner=False)
+
+    @property
+    def closed(self):
+        """True once the simulation has finished; the last frame stays readable."""
+        return bool(self.header[H_CLOSED])
+
+    def viewer_attached(self, now=None):
+        now = time.time() if now is None else now
+        return now - self.header[H_HEARTBEAT] <= LIVE_VIEW_IDLE_SECONDS
+
+    def heartbeat(self):
+        """Called by the viewer every frame to keep the simulation publishing."""
+        self.header[H_HEARTBEAT] = time.time()
+
+    def publish(self, environment, force=False):
+        """
+        Write the environment's current state as the latest frame. Skipped (returns
+        False) while no viewer is attached, unless `force` is set.
+        """
+        now = time.time()
+        if not force and not self.viewer_attached(now):
+            return False
+        published = int(self.header[H_PUBLISHED])
+        slot = self.slots[(published + 1) % 2] # The slot readers are not looking at
+        meta = slot["meta"]
+        meta[M_SEQUENCE] += 1 # Odd: being written
+        cells, food = entity_arrays(environment)
+        cell_rows = min(len(cells), self.cell_capacity)
+        food_rows = min(len(food), self.food_capacity)
+        slot["cells"][:cell_rows] = cells[:cell_rows]
+        slot["food"][:food_rows] = food[:food_rows]
+
+        zones = [(zone.x, zone.y, zone.radius, 0) for zone in environment.toxic_zones]
+        zones += [(zone.x, zone.y, zone.radius, 1) for zone in environment.resource_zones]
+        zones = zones[:self.zone_capacity]
+        if zones:
+            slot["zones"][:len(zones)] = zones
+
+        clans = [(clan.id, count) + tuple(clan.color) + tuple(means[name] for name in TRAIT_NAMES)
+                 for clan, count, means in environment.clan_summaries()][:self.clan_capacity]
+        if clans:
+            slot["clans"][:len(clans)] = clans
+        averages = environment.trait_means()
+        slot["averages"][:] = (averages["speed"], averages["sense_radius"], averages["energy_efficiency"])
+
+        meta[M_TICK] = environment.tick
+        meta[M_TIME] = now
+        meta[M_CELLS] = environment.cell_count
+        meta[M_FOOD] = environment.food_count
+        meta[M_ZONES] = len(zones)
+        meta[M_CLANS] = len(clans)
+        meta[M_SEQUENCE] += 1 # Even: complete
+        self.header[H_PUBLISHED] = published + 1
+        return True
+
+    def read(self):
+        """Copy of the latest complete frame, or None if there is none yet (or the writer kept overtaking us)."""
+        for _ in range(READ_ATTEMPTS):
+            published = int(self.header[H_PUBLISHED])
+            if published == 0:
+                return None
+            slot = self.slots[published % 2]
+            sequence = slot["meta"][M_SEQUENCE]
+            if sequence % 2:
+                continue
+            meta = slot["meta"].copy()
+            cell_rows = min(int(meta[M_CELLS]), self.cell_capacity)
+            food_rows = min(int(meta[M_FOOD]), self.food_capacity)
+            frame = LiveFrame(
+                tick=int(meta[M_TICK]), time=meta[M_TIME], cell_count=int(meta[M_CELLS]),
+                food_count=int(meta[M_FOOD]), averages=slot["averages"].copy(),
+                clans=slot["clans"][:int(meta[M_CLANS])].copy(), zones=slot["zones"][:int(meta[M_ZONES])].copy(),
+                cells=slot["cells"][:cell_rows].copy(), food=slot["food"][:food_rows].copy())
+            if slot["meta"][M_SEQUENCE] == sequence:
+                return frame
+        return None
+
+    def close(self):
+        """Detach. The simulation side also marks the run as finished and removes the block's name."""
+        if self._block is None:
+            return
+        if self.owner:
+            self.header[H_CLOSED] = 1
+        self.header = None
+        self.slots = []
+        self._block.close()
+        if self.owner:
+            self._block.unlink()
+            _created_names.discard(self._block._name)
+        self._block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def entity_arrays(environment):
+    """
+    (cells, food) rows for a frame: cells as x, y, size, clan row (the clan's index
+    in environment.clans) and food as x, y, size, r, g, b.
+    """
+    if isinstance(environment, VectorEnvironment):
+        clan_sizes = np.array([clan.size for clan in environment.clans], dtype=float)
+        cells = np.column_stack((environment.cell_x, environment.cell_y, clan_sizes[environment.cell_clan],
+                                 environment.cell_clan))
+        food_types = environment.config.FOOD_TYPES
+        type_rows = np.array([(food_type["size"],) + tuple(food_type["color"]) for food_type in food_types], dtype=float)
+        food = np.column_stack((environment.food_x, environment.food_y, type_rows[environment.food_type]))
+        return cells, food
+
+    clan_rows = {clan.id: row for row, clan in enumerate(environment.clans)}
+    cells = np.array([(cell.x, cell.y, cell.size, clan_rows[cell.clan.id]) for cell in environment.cells],
+                     dtype=float).reshape(-1, CELL_COLUMNS)
+    food = np.array([(food_item.x, food_item.y, food_item.size) + tuple(food_item.color)
+                     for food_item in environment.food], dtype=float).reshape(-1, FOOD_COLUMNS)
+    return cells, food
@@ -1,10 +1,38 @@
+import argparse
 
 import pygame
+from constants import TELEMETRY_PORT
 from simulation import Simulation
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MicroLife Evolution Simulator")
+    parser.add_argument("--seed", type=int, default=None, help="random seed to reproduce a run exactly")
+    parser.add_argument("--vectorized", action="store_true", help="use the NumPy struct-of-arrays engine")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="update only the screen regions that changed instead of the whole window")
+    parser.add_argument("--export", default=None, metavar="DIR",
+                        help="stream per-tick stats (CSV + .npy chunks) to a run directory under DIR")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each frame phase (toggle in-game with F3); percentiles are saved as JSON on exit")
+    parser.add_argument("--profile-output", default=None, metavar="PATH",
+                        help="where to write the profile JSON (default: logs/profile_<timestamp>.json)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="simulation speed multiplier, fractions allowed (change in-game with up/down)")
+    parser.add_argument("--max-speed", action="store_true",
+                        help="run as many ticks as fit in each frame (toggle in-game with M)")
+    parser.add_argument("--telemetry", type=int, nargs="?", const=TELEMETRY_PORT, default=None, metavar="PORT",
+                        help=f"serve live metrics on http://127.0.0.1:PORT (default port {TELEMETRY_PORT})")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="write a replay log of the run to PATH (play it back with replay.py)")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if args.record and args.vectorized:
+        parser.error("replay logs are only recorded from the reference engine")
+
     pygame.init()
-    sim = Simulation()
+    sim = Simulation(vectorized=args.vectorized, seed=args.seed, dirty_rects=args.dirty_rects,
+                     export_dir=args.export, profile=args.profile, profile_output=args.profile_output,
+                     speed=None if args.max_speed else args.speed, telemetry_port=args.telemetry,
+                     record_path=args.record)
     sim.run()
-
-
@@ -0,0 +1,62 @@
+"""
+Lightweight per-phase frame profiler.
+
+Code being measured takes a perf_counter_ns() timestamp when a phase starts
+and calls lap(phase, start) when it ends; lap() returns the end timestamp so
+consecutive phases can be chained. Instrumented code keeps the profiler in a
+variable that is None while profiling is off, so the disabled cost is one
+`is not None` check per phase.
+
+The last `window` durations of each phase are kept for rolling p50/p95/p99.
+"""
+import json
+from collections import deque
+from time import perf_counter_ns
+
+import numpy as np
+
+from constants import PROFILER_WINDOW
+
+PERCENTILES = (50, 95, 99)
+
+
+class PhaseProfiler:
+    def __init__(self, window=PROFILER_WINDOW):
+        self.window = window
+        self._samples = {} # phase -> deque of durations in ns, in first-seen phase order
+
+    def lap(self, phase, start_ns):
+        """Record the time since `start_ns` for `phase` and return the current timestamp."""
+        now = perf_counter_ns()
+        self.record(phase, now - start_ns)
+        return now
+
+    def record(self, phase, duration_ns):
+        samples = self._samples.get(phase)
+        if samples is None:
+            samples = self._samples[phase] = deque(maxlen=self.window)
+        samples.append(duration_ns)
+
+    def reset(self):
+        self._samples.clear()
+
+    @property
+    def phases(self):
+        return list(self._samples)
+
+    def summary(self):
+        """{phase: {"samples", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}} over the rolling window."""
+        result = {}
+        for phase, samples in self._samples.items():
+            if not samples:
+                continue
+            durations_ms = np.fromiter(samples, dtype=float, count=len(samples)) / 1e6
+            stats = {"samples": len(durations_ms), "mean_ms": float(durations_ms.mean())}
+            for percentile, value in zip(PERCENTILES, np.percentile(durations_ms, PERCENTILES)):
+                stats[f"p{percentile}_ms"] = float(value)
+            result[phase] = stats
+        return result
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"window": self.window, "phases": self.summary()}, f, indent=2)
@@ -0,0 +1,35 @@
+"""
+Batched sprite drawing.
+
+Drawing entities one `screen.blit` at a time costs a Python call, a cache
+lookup and a Rect per entity. These helpers gather (image, position) pairs for
+a whole layer and hand them to a single `Surface.blits` call.
+"""
+import pygame
+
+
+def draw_sprite_layer(screen, sprites):
+    """
+    Draw one layer of centered sprites and return the rects they cover.
+
+    `sprites` yields (image, x, y, color, radius) tuples. Entries without an
+    image (sprites not loaded) fall back to a filled circle of `color`.
+    """
+    blit_sequence = []
+    rects = []
+    for image, x, y, color, radius in sprites:
+        if image is None:
+            rects.append(pygame.draw.circle(screen, color, (int(x), int(y)), int(radius)))
+        else:
+            width, height = image.get_size()
+            # Same placement as image.get_rect(center=(int(x), int(y)))
+            blit_sequence.append((image, (int(x) - width // 2, int(y) - height // 2)))
+    if blit_sequence:
+        rects.extend(screen.blits(blit_sequence))
+    return rects
+
+
+def erase_rects(screen, background, rects):
+    """Restore `rects` on the screen from the same areas of `background`, in one batched call."""
+    if rects:
+        screen.blits([(background, rect, rect) for rect in rects], False)
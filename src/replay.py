@@ -0,0 +1,135 @@
+"""
+Replay mode: plays back a log written with --record without running the
+physics (see replay_log.py), drawn like the live viewer.
+
+Seeking starts from the nearest keyframe, so jumping anywhere in a long run is
+as quick as jumping near its start. Playback runs on the same fixed timestep
+as the simulation window: 1x shows TICK_RATE ticks per second, MAX as many as
+fit in each frame.
+
+Usage:
+    python headless.py --ticks 100000 --seed 42 --record run.mlr
+    python replay.py run.mlr
+    python replay.py run.mlr --start 50000 --speed 4
+
+Keys: P pauses, up/down change the speed, M toggles MAX, left/right jump
+REPLAY_SEEK_TICKS back or forward, Home/End go to the first or last tick.
+"""
+import argparse
+import os
+from time import perf_counter
+
+import numpy as np
+import pygame
+
+from clan import TRAIT_NAMES
+from constants import LIVE_VIEW_FPS, REPLAY_SEEK_TICKS
+from live_view import LiveFrame
+from replay_log import ReplayLog
+from timestep import FixedTimestep, next_speed
+from viewer import LiveViewer
+
+
+def replay_frame(state):
+    """The LiveFrame of a ReplayState. Clan means are the clan traits, as in the vectorized engine."""
+    clans = state.clans
+    counts = state.clan_counts()
+    traits = np.column_stack([clans[name] for name in TRAIT_NAMES])
+    clan_rows = np.column_stack((clans["id"], counts, clans["color"], traits)).astype(float)
+    rows = np.searchsorted(clans["id"], state.cells["clan"])
+    cells = np.column_stack((state.cells["x"], state.cells["y"], clans["size"][rows], rows)).astype(float)
+    food = np.column_stack((state.food["x"], state.food["y"], state.food["size"], state.food["color"])).astype(float)
+    zones = np.column_stack((state.zones["x"], state.zones["y"], state.zones["radius"],
+                             state.zones["kind"])).astype(float)
+    total = counts.sum()
+    averages = traits[:, :3].T @ counts / total if total else np.zeros(3)
+    return LiveFrame(tick=state.tick, time=0.0, cell_count=len(state.cells), food_count=len(state.food),
+                     averages=averages, clans=clan_rows, zones=zones, cells=cells, food=food)
+
+
+class ReplayViewer(LiveViewer):
+    def __init__(self, log, start=None, speed=1.0, fps=LIVE_VIEW_FPS):
+        super().__init__(os.path.basename(log.path), fps)
+        pygame.display.set_caption(f"MicroLife Replay - {self.name}")
+        self.log = log
+        self.timestep = FixedTimestep(speed=speed)
+        self.paused = False
+        self._dirty = False # A tick was stepped since the frame was last built
+        self.frame = replay_frame(log.seek(log.first_tick if start is None else start))
+
+    def seek(self, tick):
+        self.frame = replay_frame(self.log.seek(tick))
+        self.timestep.reset()
+
+    def _step(self):
+        if self.log.step() is None:
+            self.paused = True # End of the log
+        self._dirty = True
+
+    def handle_input(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        tick = self.log.state.tick
+        if event.key == pygame.K_p:
+            self.paused = not self.paused
+        elif event.key == pygame.K_UP:
+            self.timestep.speed = next_speed(self.timestep.speed, 1)
+        elif event.key == pygame.K_DOWN:
+            self.timestep.speed = next_speed(self.timestep.speed, -1)
+        elif event.key == pygame.K_m:
+            self.timestep.speed = None if self.timestep.speed is not None else 1.0
+        elif event.key == pygame.K_LEFT:
+            self.seek(tick - REPLAY_SEEK_TICKS)
+        elif event.key == pygame.K_RIGHT:
+            self.seek(tick + REPLAY_SEEK_TICKS)
+        elif event.key == pygame.K_HOME:
+            self.seek(self.log.first_tick)
+        elif event.key == pygame.K_END:
+            self.seek(self.log.last_tick)
+
+    def run(self):
+        running = True
+        last_frame = perf_counter()
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                self.handle_input(event)
+
+            now = perf_counter()
+            elapsed, last_frame = now - last_frame, now
+            if self.paused:
+                self.timestep.reset()
+            else:
+                self._dirty = False
+                self.timestep.advance(elapsed, self._step)
+                if self._dirty: # Only build a frame for the last of the ticks run
+                    self.frame = replay_frame(self.log.state)
+            self.draw_frame(self.frame)
+            pygame.display.flip()
+            self.clock.tick(self.fps)
+
+    def status_text(self, frame):
+        state = "PAUSED" if self.paused else ("MAX" if self.timestep.speed is None else f"{self.timestep.speed:g}x")
+        return f"REPLAY {state} tick {frame.tick}/{self.log.last_tick}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play back a MicroLife replay log written with --record.")
+    parser.add_argument("path", help="replay log to play")
+    parser.add_argument("--start", type=int, default=None, help="tick to start at (default: the first in the log)")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier (change with up/down)")
+    parser.add_argument("--fps", type=int, default=LIVE_VIEW_FPS, help="viewer frame rate")
+    args = parser.parse_args(argv)
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    pygame.init()
+    try:
+        with ReplayLog(args.path) as log:
+            ReplayViewer(log, args.start, args.speed, args.fps).run()
+    finally:
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
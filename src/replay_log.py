@@ -0,0 +1,398 @@
+"""
+Binary event log of a run, and replay of it without the physics.
+
+A ReplayRecorder attached to an Environment (as environment.recorder) writes
+down what happened in every tick: births, deaths, meals, food spawns and decay,
+clan mutations, zone reshuffles, and where every living cell ended up. Every
+`keyframe_interval` ticks it also writes a keyframe, a full snapshot of the
+cells, food, clans and zones. A ReplayLog reads the file back: seek(tick)
+starts from the last keyframe at or before the tick and applies at most one
+interval of tick records, so a seek costs the same at the end of a long run as
+at its start; step() then plays forward one tick at a time.
+
+File layout (little-endian):
+    header   MAGIC, u32 length, JSON metadata (seed, keyframe interval, config)
+    records  c kind, u32 tick, u32 length, payload
+               KEYFRAME: a snapshot; starts a new zlib stream
+               TICK:     one tick's events; continues the stream of the last keyframe
+    index    u32 count, (u32 tick, u64 offset) per keyframe, u32 last tick,
+             u64 index offset, INDEX_MAGIC; written by close()
+
+A keyframe and the ticks after it share one zlib stream, flushed at the end of
+every record, so consecutive ticks compress against each other and a log cut
+short by a crash still reads up to its last whole record (the index is then
+rebuilt by scanning the record headers).
+
+Cell positions are stored as whole pixels, which is what the sprites are drawn
+at. Energies are exact at keyframes, births and meals and held in
+between. Cells and food are listed by handle, which an EntityStore never
+reuses, so new entities always sort last.
+"""
+import json
+import struct
+import zlib
+from bisect import bisect_right
+
+import numpy as np
+
+from clan import TRAIT_NAMES
+from constants import REPLAY_COMPRESSION_LEVEL, REPLAY_KEYFRAME_INTERVAL
+
+MAGIC = b"MLREPLAY"
+INDEX_MAGIC = b"MLRINDEX"
+VERSION = 1
+KEYFRAME, TICK = b"K", b"T"
+RECORD = struct.Struct("<cII") # kind, tick, payload length
+FOOTER = struct.Struct("<IQ") # last tick, index offset
+KEYFRAME_HEADER = struct.Struct("<4I") # clans, zones, cells, food
+TICK_HEADER = struct.Struct("<B8I") # zones changed; zones, mutations, births, deaths, meals, spawns, decays, positions
+
+STARVED, OLD_AGE = 0, 1 # Death causes
+
+INDEX_ENTRY = np.dtype([("tick", "<u4"), ("offset", "<u8")])
+ZONE = np.dtype([("x", "<f4"), ("y", "<f4"), ("radius", "<f4"), ("kind", "u1")]) # kind 0 is toxic, 1 resource
+CLAN = np.dtype([("id", "<u4"), ("color", "u1", 3)] + [(name, "<f8") for name in TRAIT_NAMES])
+CELL = np.dtype([("id", "<u4"), ("clan", "<u4"), ("x", "<f4"), ("y", "<f4"), ("energy", "<f4"), ("born", "<i4")])
+FOOD = np.dtype([("id", "<u4"), ("x", "<f4"), ("y", "<f4"), ("size", "<u2"), ("color", "u1", 3), ("spawned", "<i4")])
+BIRTH = np.dtype([("id", "<u4"), ("parent", "<u4"), ("clan", "<u4"), ("x", "<f4"), ("y", "<f4"), ("energy", "<f4")])
+DEATH = np.dtype([("id", "<u4"), ("cause", "u1")])
+MEAL = np.dtype([("cell", "<u4"), ("food", "<u4"), ("energy", "<f4")])
+DECAY = np.dtype([("id", "<u4")])
+POSITION = np.dtype([("x", "<u2"), ("y", "<u2")])
+TICK_SECTIONS = (("zones", ZONE), ("mutations", CLAN), ("births", BIRTH), ("deaths", DEATH), ("meals", MEAL),
+                 ("spawns", FOOD), ("decays", DECAY), ("positions", POSITION))
+
+
+def _clan_row(clan):
+    return (clan.id, clan.color) + tuple(getattr(clan, name) for name in TRAIT_NAMES)
+
+
+def _zone_rows(toxic_zones, resource_zones):
+    return np.array([(zone.x, zone.y, zone.radius, 0) for zone in toxic_zones] +
+                    [(zone.x, zone.y, zone.radius, 1) for zone in resource_zones], dtype=ZONE)
+
+
+def _by_id(rows, key="id"):
+    return rows[np.argsort(rows[key], kind="stable")]
+
+
+def _sections(payload, offset, dtypes_and_counts):
+    """Read consecutive arrays out of a payload; returns writable copies."""
+    arrays = []
+    for dtype, count in dtypes_and_counts:
+        arrays.append(np.frombuffer(payload, dtype, count, offset).copy())
+        offset += count * dtype.itemsize
+    return arrays
+
+
+class _MealRecorder:
+    """Stands in for environment.food during the cell updates, to see which cell eats what."""
+    __slots__ = ("recorder", "cell")
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.cell = None # Cell being updated
+
+    def remove(self, food_item):
+        cell = self.cell
+        self.recorder.meals.append((cell.handle, food_item.handle, cell.energy))
+        self.recorder.environment.food.remove(food_item)
+
+    def __iter__(self):
+        return iter(self.recorder.environment.food)
+
+    def __len__(self):
+        return len(self.recorder.environment.food)
+
+
+class ReplayRecorder:
+    """Writes an Environment's events to a replay log; attaches itself as environment.recorder."""
+
+    def __init__(self, path, environment, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.path = path
+        self.environment = environment
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = [] # (tick, file offset)
+        self.last_tick = environment.tick
+        self.meal_recorder = _MealRecorder(self)
+        self._clan_versions = {} # clan id -> trait_version last written, to spot mutations
+        self._compressor = None
+        self._clear()
+        metadata = json.dumps({"version": VERSION, "seed": environment.seed, "keyframe_interval": keyframe_interval,
+                               "config": environment.config.overrides()}).encode("utf-8")
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + struct.pack("<I", len(metadata)) + metadata)
+        self._write_keyframe()
+        environment.recorder = self
+
+    def _clear(self):
+        self.zones = None # ZONE rows if the zones were reshuffled this tick
+        self.mutations = {} # clan id -> CLAN row; the clan's traits after its last mutation this tick
+        self.births = []
+        self.deaths = []
+        self.meals = []
+        self.spawns = []
+        self.decays = []
+
+    # Hooks called by Environment
+
+    def zones_changed(self, toxic_zones, resource_zones):
+        self.zones = _zone_rows(toxic_zones, resource_zones)
+
+    def born(self, offspring, parent):
+        clan = offspring.clan
+        if self._clan_versions.get(clan.id) != clan.trait_version: # Mutations only happen when a cell reproduces
+            self._clan_versions[clan.id] = clan.trait_version
+            self.mutations[clan.id] = _clan_row(clan)
+        self.births.append((offspring.handle, parent.handle, clan.id, offspring.x, offspring.y, offspring.energy))
+
+    def died(self, cell):
+        self.deaths.append((cell.handle, STARVED if cell.energy <= 0 else OLD_AGE))
+
+    def food_spawned(self, food_item):
+        self.spawns.append((food_item.handle, food_item.x, food_item.y, food_item.size, food_item.color,
+                            self.environment.tick - food_item.age))
+
+    def food_decayed(self, food_item):
+        self.decays.append((food_item.handle,))
+
+    def end_tick(self):
+        """Write the tick that just finished, and a keyframe if one is due."""
+        environment = self.environment
+        rows = np.array([(cell.handle, cell.x, cell.y) for cell in environment.cells], dtype=float).reshape(-1, 3)
+        rows = rows[np.argsort(rows[:, 0], kind="stable")]
+        positions = np.empty(len(rows), dtype=POSITION)
+        positions["x"] = rows[:, 1] # Truncated to whole pixels, as int() does when drawing
+        positions["y"] = rows[:, 2]
+        zones = self.zones if self.zones is not None else np.empty(0, dtype=ZONE)
+        sections = [zones, np.array(list(self.mutations.values()), dtype=CLAN), np.array(self.births, dtype=BIRTH),
+                    np.array(self.deaths, dtype=DEATH), np.array(self.meals, dtype=MEAL),
+                    np.array(self.spawns, dtype=FOOD), np.array(self.decays, dtype=DECAY), positions]
+        header = TICK_HEADER.pack(self.zones is not None, *(len(section) for section in sections))
+        self._write(TICK, environment.tick, header + b"".join(section.tobytes() for section in sections))
+        self.last_tick = environment.tick
+        self._clear()
+        if environment.tick % self.keyframe_interval == 0:
+            self._write_keyframe()
+
+    # Writing
+
+    def _write(self, kind, tick, payload):
+        data = self._compressor.compress(payload) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.file.write(RECORD.pack(kind, tick, len(data)) + data)
+
+    def _write_keyframe(self):
+        environment = self.environment
+        tick = environment.tick
+        clans = np.array([_clan_row(clan) for clan in environment.clans], dtype=CLAN)
+        self._clan_versions = {clan.id: clan.trait_version for clan in environment.clans}
+        zones = _zone_rows(environment.toxic_zones, environment.resource_zones)
+        cells = _by_id(np.array([(cell.handle, cell.clan.id, int(cell.x), int(cell.y), cell.energy, tick - cell.age)
+                                 for cell in environment.cells], dtype=CELL))
+        food = _by_id(np.array([(food_item.handle, food_item.x, food_item.y, food_item.size, food_item.color,
+                                 tick - food_item.age) for food_item in environment.food], dtype=FOOD))
+        payload = KEYFRAME_HEADER.pack(len(clans), len(zones), len(cells), len(food))
+        payload += clans.tobytes() + zones.tobytes() + cells.tobytes() + food.tobytes()
+        self._compressor = zlib.compressobj(REPLAY_COMPRESSION_LEVEL)
+        self.keyframes.append((tick, self.file.tell()))
+        self._write(KEYFRAME, tick, payload)
+
+    def close(self):
+        """Write the keyframe index and close the file. Events after the last finished tick are dropped."""
+        if self.file is None:
+            return
+        if self.environment.recorder is self:
+            self.environment.recorder = None
+        index_offset = self.file.tell()
+        index = np.array(self.keyframes, dtype=INDEX_ENTRY)
+        self.file.write(struct.pack("<I", len(index)) + index.tobytes() + FOOTER.pack(self.last_tick, index_offset)
+                        + INDEX_MAGIC)
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayState:
+    """
+    The world at one tick as far as the log knows it: CLAN, ZONE, CELL and FOOD
+    rows (cells and food sorted by id), plus the events of the tick that led here
+    in `events` (empty right after a keyframe).
+    """
+
+    def __init__(self, tick, clans, zones, cells, food):
+        self.tick = tick
+        self.clans = clans
+        self.zones = zones
+        self.cells = cells
+        self.food = food
+        self.events = {}
+
+    @classmethod
+    def from_keyframe(cls, tick, payload):
+        counts = KEYFRAME_HEADER.unpack_from(payload)
+        clans, zones, cells, food = _sections(payload, KEYFRAME_HEADER.size, zip((CLAN, ZONE, CELL, FOOD), counts))
+        return cls(tick, clans, zones, cells, food)
+
+    def apply_tick(self, tick, payload):
+        """Advance to `tick` by applying that tick's events."""
+        zones_changed, *counts = TICK_HEADER.unpack_from(payload)
+        events = dict(zip((name for name, _ in TICK_SECTIONS),
+                          _sections(payload, TICK_HEADER.size, zip((dtype for _, dtype in TICK_SECTIONS), counts))))
+        if zones_changed:
+            self.zones = events["zones"]
+        mutations = events["mutations"]
+        if len(mutations):
+            rows = np.searchsorted(self.clans["id"], mutations["id"]) # Clans are created, and listed, in id order
+            self.clans[rows] = mutations
+
+        cells = self.cells
+        meals = events["meals"]
+        cells["energy"][np.searchsorted(cells["id"], meals["cell"])] = meals["energy"]
+        births = events["births"]
+        if len(births):
+            newborn = np.zeros(len(births), dtype=CELL)
+            for field in ("id", "clan", "x", "y", "energy"):
+                newborn[field] = births[field]
+            newborn["born"] = tick
+            cells = np.concatenate((cells, newborn))
+        deaths = events["deaths"]
+        if len(deaths):
+            cells = cells[~np.isin(cells["id"], deaths["id"])]
+        positions = events["positions"]
+        if len(positions) != len(cells):
+            raise ValueError(f"tick {tick}: {len(positions)} positions for {len(cells)} cells")
+        cells["x"] = positions["x"]
+        cells["y"] = positions["y"]
+        self.cells = cells
+
+        food = self.food
+        if len(events["spawns"]):
+            food = np.concatenate((food, events["spawns"]))
+        removed = np.concatenate((meals["food"], events["decays"]["id"]))
+        if len(removed):
+            food = food[~np.isin(food["id"], removed)]
+        self.food = food
+
+        del events["positions"]
+        events["zones_changed"] = bool(zones_changed)
+        self.events = events
+        self.tick = tick
+
+    def clan_counts(self):
+        """Living cells per clan, in clan order."""
+        rows = np.searchsorted(self.clans["id"], self.cells["clan"])
+        return np.bincount(rows, minlength=len(self.clans))
+
+
+class ReplayLog:
+    """Reads a log written by ReplayRecorder. seek() to a tick, then step() forward."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            if self.file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a MicroLife replay log")
+            (length,) = struct.unpack("<I", self.file.read(4))
+            self.metadata = json.loads(self.file.read(length))
+            if self.metadata["version"] != VERSION:
+                raise ValueError(f"unsupported replay log version {self.metadata['version']}")
+            self.keyframe_interval = self.metadata["keyframe_interval"]
+            self._records_start = self.file.tell()
+            self._read_index()
+            if not self.keyframe_ticks:
+                raise ValueError(f"{path} holds no keyframe")
+        except Exception:
+            self.file.close()
+            raise
+        self.first_tick = self.keyframe_ticks[0]
+        self.state = None
+        self._decompressor = None
+        self._next_offset = None
+
+    def _read_index(self):
+        file = self.file
+        size = file.seek(0, 2)
+        tail = len(INDEX_MAGIC) + FOOTER.size
+        if size - self._records_start >= tail:
+            file.seek(size - tail)
+            footer = file.read(tail)
+            if footer.endswith(INDEX_MAGIC):
+                self.last_tick, index_offset = FOOTER.unpack_from(footer)
+                file.seek(index_offset)
+                (count,) = struct.unpack("<I", file.read(4))
+                index = np.frombuffer(file.read(count * INDEX_ENTRY.itemsize), dtype=INDEX_ENTRY)
+                self.keyframe_ticks = index["tick"].tolist()
+                self._keyframe_offsets = index["offset"].tolist()
+                self._end_offset = index_offset
+                return
+        # No index (the run did not close its recorder): scan the record headers
+        self.keyframe_ticks, self._keyframe_offsets = [], []
+        self.last_tick = None
+        offset = self._records_start
+        file.seek(offset)
+        while True:
+            header = file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            kind, tick, length = RECORD.unpack(header)
+            if offset + RECORD.size + length > size: # Cut off mid-record
+                break
+            if kind == KEYFRAME:
+                self.keyframe_ticks.append(tick)
+                self._keyframe_offsets.append(offset)
+            self.last_tick = tick
+            offset += RECORD.size + length
+            file.seek(offset)
+        self._end_offset = offset
+
+    def _apply_next(self):
+        """Read the next record into self.state; False at the end of the log."""
+        if self._next_offset >= self._end_offset:
+            return False
+        self.file.seek(self._next_offset)
+        kind, tick, length = RECORD.unpack(self.file.read(RECORD.size))
+        data = self.file.read(length)
+        self._next_offset += RECORD.size + length
+        if kind == KEYFRAME:
+            self._decompressor = zlib.decompressobj()
+            self.state = ReplayState.from_keyframe(tick, self._decompressor.decompress(data))
+        else:
+            self.state.apply_tick(tick, self._decompressor.decompress(data))
+        return True
+
+    def seek(self, tick):
+        """Go to `tick` (clamped to the ticks in the log) and return its ReplayState."""
+        tick = min(max(tick, self.first_tick), self.last_tick)
+        position = bisect_right(self.keyframe_ticks, tick) - 1
+        self._next_offset = self._keyframe_offsets[position]
+        self._apply_next()
+        while self.state.tick < tick and self._apply_next():
+            pass
+        return self.state
+
+    def step(self):
+        """Advance one tick and return the new ReplayState, or None at the end of the log."""
+        if self.state is None:
+            return self.seek(self.first_tick)
+        tick = self.state.tick
+        while self.state.tick == tick: # Skips the keyframe written right after its tick's record
+            if not self._apply_next():
+                return None
+        return self.state
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,55 +1,192 @@
 
 import datetime
 import os
+from time import perf_counter, perf_counter_ns
 
 import pygame
 
 from constants import (
     FONT_SIZE,
     FPS,
+    PROFILER_HUD_REFRESH,
+    PROFILER_PANEL_HEIGHT,
     SCREEN_HEIGHT,
     SCREEN_WIDTH,
     TEXT_COLOR,
     UI_PANEL_HEIGHT,
 )
-from environment import Environment
-from food import spawn_food_item
+from cell import cell_image_cache_stats, load_cell_image, prewarm_cell_images
+from environment import Environment, load_background_image
+from food import food_image_cache_stats, load_food_image, prewarm_food_images
+from event_log import EventLogger
+from profiler import PhaseProfiler
+from replay_log import ReplayRecorder
+from exporter import StatsExporter
+from stats_history import StatsHistory
+from telemetry import TelemetryServer, telemetry_sample
+from timestep import FixedTimestep, next_speed
+from vector_engine import VectorEnvironment
+
+STATS_COLUMNS = ("cell_count", "food_count", "avg_speed", "avg_sense_radius", "avg_energy_efficiency")
+
+
+def draw_ui_panel(screen, font, cell_count, food_count, status_text, averages, clan_rows, selected_text=None,
+                  reset_button=True):
+    """
+    Draw the stats panel below the simulation area. `averages` is (speed, sense
+    radius, energy efficiency) and `clan_rows` holds (clan id, living cells,
+    color, trait means) per clan. Shared by Simulation and the live viewer.
+    """
+    # Draw UI panel background
+    pygame.draw.rect(screen, (50, 50, 50), (0, SCREEN_HEIGHT, SCREEN_WIDTH, UI_PANEL_HEIGHT))
+
+    # Display population count
+    cell_count_text = font.render(f"Cells: {cell_count}", True, TEXT_COLOR)
+    screen.blit(cell_count_text, (10, SCREEN_HEIGHT + 10))
+
+    food_count_text = font.render(f"Food: {food_count}", True, TEXT_COLOR)
+    screen.blit(food_count_text, (10, SCREEN_HEIGHT + 30))
+
+    # Display simulation status
+    status_render = font.render(status_text, True, TEXT_COLOR)
+    screen.blit(status_render, (SCREEN_WIDTH - status_render.get_width() - 10, SCREEN_HEIGHT + 10))
+
+    # Display average traits
+    avg_speed, avg_sense, avg_efficiency = averages
+    avg_traits_text = font.render(f"Avg Speed: {avg_speed:.2f} | Avg Sense: {avg_sense:.2f} | Avg Eff: {avg_efficiency:.2f}", True, TEXT_COLOR)
+    screen.blit(avg_traits_text, (10, SCREEN_HEIGHT + 50))
+
+    # Display selected cell info
+    if selected_text:
+        screen.blit(font.render(selected_text, True, TEXT_COLOR), (10, SCREEN_HEIGHT + 70))
+
+    # Display clan information
+    clan_info_y_start = SCREEN_HEIGHT + 10
+    for i, (clan_id, clan_count, color, means) in enumerate(clan_rows):
+        clan_text = font.render(f"Clan {clan_id} ({clan_count}): Spd:{means['speed']:.1f} Sen:{means['sense_radius']:.1f} Eff:{means['energy_efficiency']:.1f} Size:{means['size']:.1f} Life:{means['lifespan']:.0f}", True, color)
+        screen.blit(clan_text, (SCREEN_WIDTH // 2, clan_info_y_start + i * 20))
+
+    if not reset_button:
+        return
+    # Draw reset button
+    reset_button_width = 80
+    reset_button_height = 30
+    reset_button_x = SCREEN_WIDTH - reset_button_width - 10
+    reset_button_y = SCREEN_HEIGHT + UI_PANEL_HEIGHT - reset_button_height - 10
+    pygame.draw.rect(screen, (100, 100, 100), (reset_button_x, reset_button_y, reset_button_width, reset_button_height))
+    reset_text = font.render("Reset", True, TEXT_COLOR)
+    screen.blit(reset_text, (reset_button_x + (reset_button_width - reset_text.get_width()) // 2, reset_button_y + (reset_button_height - reset_text.get_height()) // 2))
 
 
 class Simulation:
-    def __init__(self):
-        self.environment = Environment()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT + UI_PANEL_HEIGHT))
+    def __init__(self, vectorized=False, config=None, seed=None, dirty_rects=False, export_dir=None,
+                 profile=False, profile_output=None, speed=1.0, telemetry_port=None, record_path=None):
+        self.vectorized = vectorized # Use the NumPy struct-of-arrays engine instead of Cell/Food objects
+        self.dirty_rects = dirty_rects # Push only changed screen regions instead of flipping the whole window
+        self.config = config # Per-run simulation parameters (None uses constants.py)
+        self.seed = seed # Fixed seed to replay a run exactly; None picks a fresh seed per run
+        self.export_dir = export_dir # Per-tick stats are streamed to a run directory under this, if set
+        self.environment = self._create_environment()
+        self.exporter = self._create_exporter()
+        # Event log for replay.py; covers the first run only, a reset stops it
+        self.recorder = ReplayRecorder(record_path, self.environment) if record_path else None
+        # Live metrics over HTTP/WebSocket, served from a background thread
+        self.telemetry = TelemetryServer(port=telemetry_port).start() if telemetry_port is not None else None
+        # Per-phase timings, collected only while profiling is on (CLI flag or F3)
+        self.profiler = PhaseProfiler()
+        self.profiling = profile
+        self.profile_output = profile_output # JSON written on exit; defaults to logs/profile_<timestamp>.json
+        self._profiler_hud = None # Rendered percentile table, refreshed every PROFILER_HUD_REFRESH frames
+        self._profiler_hud_frames = 0
+        self._apply_profiling()
+        self._set_display_mode()
         pygame.display.set_caption("MicroLife Evolution Simulator")
+        # Sprites are converted to the display format, so load them after set_mode
+        load_cell_image()
+        load_food_image()
+        load_background_image()
+        self._prewarm_sprites()
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, FONT_SIZE)
+        self.ui_panel_rect = pygame.Rect(0, SCREEN_HEIGHT, SCREEN_WIDTH, UI_PANEL_HEIGHT)
+        self.profiler_panel_rect = pygame.Rect(0, SCREEN_HEIGHT + UI_PANEL_HEIGHT, SCREEN_WIDTH, PROFILER_PANEL_HEIGHT)
+        self._sprite_rects = [] # Sprite areas drawn last frame, erased on the next dirty-rect frame
 
         self.paused = False
-        self.simulation_speed = 1.0 # Multiplier for simulation speed
+        self.initial_speed = speed # Restored on reset; None = as fast as possible
+        self.timestep = FixedTimestep(speed=speed) # Converts real time into simulation ticks
         self.selected_cell = None
 
         # Statistics and Logging
         self.simulation_time = 0
-        self.stats_history = {
-            "time": [],
-            "cell_count": [],
-            "food_count": [],
-            "avg_speed": [],
-            "avg_sense_radius": [],
-            "avg_energy_efficiency": []
-        }
-        self.log_file = self._setup_log_file()
+        self.stats_history = StatsHistory(STATS_COLUMNS)
+        self.event_log = self._setup_log_file()
+        self._log_event("SYSTEM", f"Simulation started with seed {self.environment.seed}")
+        if self.recorder is not None:
+            self._log_event("SYSTEM", f"Recording replay log to {self.recorder.path}")
+
+    def _create_environment(self):
+        if self.vectorized:
+            return VectorEnvironment(seed=self.seed, config=self.config)
+        return Environment(config=self.config, seed=self.seed)
+
+    def _set_display_mode(self):
+        """Open the window, with the profiler strip below the UI panel while profiling."""
+        height = SCREEN_HEIGHT + UI_PANEL_HEIGHT + (PROFILER_PANEL_HEIGHT if self.profiling else 0)
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, height))
+
+    def _apply_profiling(self):
+        self.environment.profiler = self.profiler if self.profiling else None
+
+    def _dump_profile(self):
+        if not self.profiler.phases:
+            return
+        path = self.profile_output
+        if path is None:
+            os.makedirs("logs", exist_ok=True)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join("logs", f"profile_{timestamp}.json")
+        self.profiler.dump_json(path)
+        self._log_event("SYSTEM", f"Profile written to {path}")
+
+    def _create_exporter(self):
+        if self.export_dir is None:
+            return None
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_dir = os.path.join(self.export_dir, f"run_{timestamp}_seed{self.environment.seed}")
+        return StatsExporter.for_environment(run_dir, self.environment)
+
+    def _close_exporter(self):
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+    def _prewarm_sprites(self):
+        """Build every clan and food sprite before the first frame instead of on first use."""
+        prewarm_cell_images(self.environment.clans)
+        prewarm_food_images(self.environment.config.FOOD_TYPES)
+
+    def _log_cache_stats(self):
+        for name, stats in (("cell", cell_image_cache_stats()), ("food", food_image_cache_stats())):
+            self._log_event("PERF", f"{name} sprite cache: {stats['entries']} sprites, {stats['bytes_used']} bytes, "
+                                    f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
 
     def _setup_log_file(self):
         log_dir = "logs"
         os.makedirs(log_dir, exist_ok=True)
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         log_path = os.path.join(log_dir, f"simulation_log_{timestamp}.txt")
-        return open(log_path, "w")
+        return EventLogger(log_path)
 
     def _log_event(self, event_type, message):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.log_file.write(f"[{timestamp}] [{event_type}] {message}\n")
+        """Queue an event for the log writer thread; formatting and I/O happen off the main loop."""
+        self.event_log.log(event_type, message, self.environment.tick)
+
+    def _close_event_log(self):
+        """Write out every queued event (noting any that were dropped) and close the log."""
+        if self.event_log.dropped:
+            self._log_event("SYSTEM", f"{self.event_log.dropped} log events dropped because the queue was full")
+        self.event_log.close()
 
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -57,11 +194,21 @@ class Simulation:
                 self.paused = not self.paused
                 self._log_event("CONTROL", f"Simulation {'paused' if self.paused else 'resumed'}")
             elif event.key == pygame.K_UP:
-                self.simulation_speed = min(4.0, self.simulation_speed + 0.5)
-                self._log_event("CONTROL", f"Simulation speed increased to {self.simulation_speed:.1f}x")
+                self.change_speed(1)
+                self._log_event("CONTROL", f"Simulation speed increased to {self.speed_label()}")
             elif event.key == pygame.K_DOWN:
-                self.simulation_speed = max(0.5, self.simulation_speed - 0.5)
-                self._log_event("CONTROL", f"Simulation speed decreased to {self.simulation_speed:.1f}x")
+                self.change_speed(-1)
+                self._log_event("CONTROL", f"Simulation speed decreased to {self.speed_label()}")
+            elif event.key == pygame.K_m:
+                self.timestep.speed = None if self.timestep.speed is not None else 1.0
+                self._log_event("CONTROL", f"Simulation speed set to {self.speed_label()}")
+            elif event.key == pygame.K_F3:
+                self.profiling = not self.profiling
+                self._profiler_hud = None
+                self._apply_profiling()
+                self._set_display_mode()
+                self.environment.static_layer = None # The resized window starts blank: redraw all of it
+                self._log_event("CONTROL", f"Profiling {'enabled' if self.profiling else 'disabled'}")
         elif event.type == pygame.MOUSEBUTTONDOWN:
             mouse_x, mouse_y = event.pos
             if mouse_y >= SCREEN_HEIGHT:  # Click in UI panel
@@ -88,128 +235,179 @@ class Simulation:
                     # else: # If not paused, no action for left click in simulation area
                     #     pass
                 elif event.button == 3: # Right click to spawn food
-                    new_food = spawn_food_item(mouse_x, mouse_y)
-                    self.environment.food.append(new_food)
+                    self.environment.spawn_food(mouse_x, mouse_y) # Same RNG stream as the run
                     self._log_event("USER_ACTION", f"New food spawned at ({mouse_x}, {mouse_y})")
 
+    @property
+    def selected_cell(self):
+        """
+        The selected cell while it is alive, else None. A reference-engine cell is
+        looked up by its handle, which the EntityStore clears when the cell dies.
+        """
+        handle = self._selected_handle
+        if handle is None:
+            return self._selected_cell
+        cell = self.environment.cells.get(handle)
+        if cell is None: # Died since it was selected
+            self.selected_cell = None
+        return cell
+
+    @selected_cell.setter
+    def selected_cell(self, cell):
+        self._selected_cell = cell
+        self._selected_handle = getattr(cell, "handle", None) # Vectorized CellViews are snapshots without one
+
+    def change_speed(self, direction):
+        """Move one step up (1) or down (-1) SIMULATION_SPEEDS; one step above the top is MAX."""
+        self.timestep.speed = next_speed(self.timestep.speed, direction)
+
+    def speed_label(self):
+        return "MAX" if self.timestep.speed is None else f"{self.timestep.speed:g}x"
+
+    def _step(self):
+        self.environment.update()
+        if self.exporter is not None:
+            self.exporter.record_environment(self.environment)
+        if self.telemetry is not None:
+            self.telemetry.publish(telemetry_sample(self.environment))
+
     def _collect_stats(self):
         self.simulation_time += 1
-        self.stats_history["time"].append(self.simulation_time)
-        self.stats_history["cell_count"].append(len(self.environment.cells))
-        self.stats_history["food_count"].append(len(self.environment.food))
-
-        if self.environment.cells:
-            avg_speed = sum(c.speed for c in self.environment.cells) / len(self.environment.cells)
-            avg_sense = sum(c.sense_radius for c in self.environment.cells) / len(self.environment.cells)
-            avg_efficiency = sum(c.energy_efficiency for c in self.environment.cells) / len(self.environment.cells)
-        else:
-            avg_speed = 0
-            avg_sense = 0
-            avg_efficiency = 0
-
-        self.stats_history["avg_speed"].append(avg_speed)
-        self.stats_history["avg_sense_radius"].append(avg_sense)
-        self.stats_history["avg_energy_efficiency"].append(avg_efficiency)
+        # Running per-clan aggregates, O(clans) instead of a pass over every cell
+        trait_means = self.environment.trait_means()
+        self.stats_history.append(self.simulation_time,
+                                  cell_count=self.environment.cell_count,
+                                  food_count=self.environment.food_count,
+                                  avg_speed=trait_means["speed"],
+                                  avg_sense_radius=trait_means["sense_radius"],
+                                  avg_energy_efficiency=trait_means["energy_efficiency"])
 
     def draw_ui(self):
-        # Draw UI panel background
-        pygame.draw.rect(self.screen, (50, 50, 50), (0, SCREEN_HEIGHT, SCREEN_WIDTH, UI_PANEL_HEIGHT))
-
-        # Display population count
-        cell_count_text = self.font.render(f"Cells: {len(self.environment.cells)}", True, TEXT_COLOR)
-        self.screen.blit(cell_count_text, (10, SCREEN_HEIGHT + 10))
-
-        food_count_text = self.font.render(f"Food: {len(self.environment.food)}", True, TEXT_COLOR)
-        self.screen.blit(food_count_text, (10, SCREEN_HEIGHT + 30))
-
-        # Display simulation status
-        status_text = "PAUSED" if self.paused else f"Speed: {self.simulation_speed:.1f}x"
-        status_render = self.font.render(status_text, True, TEXT_COLOR)
-        self.screen.blit(status_render, (SCREEN_WIDTH - status_render.get_width() - 10, SCREEN_HEIGHT + 10))
-
-        # Display average traits
-        avg_speed = self.stats_history["avg_speed"][-1] if self.stats_history["avg_speed"] else 0
-        avg_sense = self.stats_history["avg_sense_radius"][-1] if self.stats_history["avg_sense_radius"] else 0
-        avg_efficiency = self.stats_history["avg_energy_efficiency"][-1] if self.stats_history["avg_energy_efficiency"] else 0
-
-        avg_traits_text = self.font.render(f"Avg Speed: {avg_speed:.2f} | Avg Sense: {avg_sense:.2f} | Avg Eff: {avg_efficiency:.2f}", True, TEXT_COLOR)
-        self.screen.blit(avg_traits_text, (10, SCREEN_HEIGHT + 50))
-
-        # Display selected cell info
-        if self.selected_cell:
-            selected_info = self.font.render(f"Selected Cell: Clan {self.selected_cell.clan.id} E:{self.selected_cell.energy:.1f} S:{self.selected_cell.speed:.1f} R:{self.selected_cell.sense_radius:.1f} Eff:{self.selected_cell.energy_efficiency:.1f} Age:{self.selected_cell.age}", True, TEXT_COLOR)
-            self.screen.blit(selected_info, (10, SCREEN_HEIGHT + 70))
-
-        # Display clan information
-        clan_info_y_start = SCREEN_HEIGHT + 10
-        for i, clan in enumerate(self.environment.clans):
-            clan_cells = [cell for cell in self.environment.cells if cell.clan.id == clan.id]
-            clan_count = len(clan_cells)
-            if clan_count > 0:
-                clan_avg_speed = sum(c.speed for c in clan_cells) / clan_count
-                clan_avg_sense = sum(c.sense_radius for c in clan_cells) / clan_count
-                clan_avg_efficiency = sum(c.energy_efficiency for c in clan_cells) / clan_count
-                clan_avg_size = sum(c.size for c in clan_cells) / clan_count
-                clan_avg_lifespan = sum(c.lifespan for c in clan_cells) / clan_count
-            else:
-                clan_avg_speed = 0
-                clan_avg_sense = 0
-                clan_avg_efficiency = 0
-                clan_avg_size = 0
-                clan_avg_lifespan = 0
-
-            clan_text = self.font.render(f"Clan {clan.id} ({clan_count}): Spd:{clan_avg_speed:.1f} Sen:{clan_avg_sense:.1f} Eff:{clan_avg_efficiency:.1f} Size:{clan_avg_size:.1f} Life:{clan_avg_lifespan:.0f}", True, clan.color)
-            self.screen.blit(clan_text, (SCREEN_WIDTH // 2, clan_info_y_start + i * 20))
-
-        # Draw reset button
-        reset_button_width = 80
-        reset_button_height = 30
-        reset_button_x = SCREEN_WIDTH - reset_button_width - 10
-        reset_button_y = SCREEN_HEIGHT + UI_PANEL_HEIGHT - reset_button_height - 10
-        pygame.draw.rect(self.screen, (100, 100, 100), (reset_button_x, reset_button_y, reset_button_width, reset_button_height))
-        reset_text = self.font.render("Reset", True, TEXT_COLOR)
-        self.screen.blit(reset_text, (reset_button_x + (reset_button_width - reset_text.get_width()) // 2, reset_button_y + (reset_button_height - reset_text.get_height()) // 2))
+        status_text = "PAUSED" if self.paused else f"Speed: {self.speed_label()}"
+        averages = tuple(self.stats_history.latest(name)
+                         for name in ("avg_speed", "avg_sense_radius", "avg_energy_efficiency"))
+        selected_text = None
+        selected_cell = self.selected_cell
+        if selected_cell:
+            selected_text = f"Selected Cell: Clan {selected_cell.clan.id} E:{selected_cell.energy:.1f} S:{selected_cell.speed:.1f} R:{selected_cell.sense_radius:.1f} Eff:{selected_cell.energy_efficiency:.1f} Age:{selected_cell.age}"
+        clan_rows = [(clan.id, clan_count, clan.color, means)
+                     for clan, clan_count, means in self.environment.clan_summaries()]
+        draw_ui_panel(self.screen, self.font, self.environment.cell_count, self.environment.food_count,
+                      status_text, averages, clan_rows, selected_text)
 
     def reset(self):
         """Reset the simulation to initial state."""
-        self.environment = Environment()
+        self._log_cache_stats() # Final counters of the run being replaced
+        self._close_exporter()
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+        self.environment = self._create_environment()
+        self.exporter = self._create_exporter()
+        self._apply_profiling()
         self.paused = False
-        self.simulation_speed = 1.0
+        self.timestep = FixedTimestep(speed=self.initial_speed)
         self.selected_cell = None
+        self._sprite_rects = []
         self.simulation_time = 0
-        self.stats_history = {
-            "time": [],
-            "cell_count": [],
-            "food_count": [],
-            "avg_speed": [],
-            "avg_sense_radius": [],
-            "avg_energy_efficiency": []
-        }
+        self.stats_history = StatsHistory(STATS_COLUMNS)
+        self._prewarm_sprites()
         # Close old log file and create new one
-        self.log_file.close()
-        self.log_file = self._setup_log_file()
-        self._log_event("SYSTEM", "Simulation reset")
+        self._close_event_log()
+        self.event_log = self._setup_log_file()
+        self._log_event("SYSTEM", f"Simulation reset with seed {self.environment.seed}")
+        if recorder is not None:
+            self._log_event("SYSTEM", f"Replay log {recorder.path} ended at tick {recorder.last_tick}")
+
+    def draw_frame(self, profiler=None):
+        """Draw the simulation area and UI panel and push them to the display."""
+        if profiler is not None:
+            phase_start = perf_counter_ns()
+        if self.dirty_rects:
+            self._sprite_rects, dirty = self.environment.draw_dirty(self.screen, self._sprite_rects)
+        else:
+            self.environment.draw(self.screen) # Covers the whole simulation area, no clear needed
+        if profiler is not None:
+            phase_start = profiler.lap("draw", phase_start)
+
+        self.draw_ui()
+        if profiler is not None:
+            self.draw_profiler_panel()
+            if self.dirty_rects:
+                dirty.append(self.profiler_panel_rect)
+            phase_start = profiler.lap("ui", phase_start)
+
+        if self.dirty_rects:
+            # The panel text changes every frame, so the panel is always part of the update
+            pygame.display.update(dirty + [self.ui_panel_rect])
+        else:
+            pygame.display.flip()
+        if profiler is not None:
+            profiler.lap("present", phase_start)
+
+    def draw_profiler_panel(self):
+        """Draw rolling p50/p95/p99 phase times in the strip below the UI panel."""
+        if self._profiler_hud is None or self._profiler_hud_frames >= PROFILER_HUD_REFRESH:
+            self._profiler_hud = self._render_profiler_hud()
+            self._profiler_hud_frames = 0
+        self._profiler_hud_frames += 1
+        pygame.draw.rect(self.screen, (35, 35, 35), self.profiler_panel_rect)
+        if self._profiler_hud is not None:
+            self.screen.blit(self._profiler_hud, (10, self.profiler_panel_rect.y + 5))
+
+    def _render_profiler_hud(self):
+        """The percentile table, one column per phase so it fits the strip's height."""
+        summary = self.profiler.summary()
+        if not summary:
+            return None
+        columns = [["ms", "p50", "p95", "p99"]]
+        columns += [[phase] + [f"{stats[key]:.2f}" for key in ("p50_ms", "p95_ms", "p99_ms")]
+                    for phase, stats in summary.items()]
+        rendered = [[self.font.render(text, True, TEXT_COLOR) for text in column] for column in columns]
+        column_width = max(text.get_width() for column in rendered for text in column) + 12
+        line_height = self.font.get_linesize()
+        hud = pygame.Surface((min(column_width * len(rendered), SCREEN_WIDTH - 20), line_height * 4), pygame.SRCALPHA)
+        for i, column in enumerate(rendered):
+            for j, text in enumerate(column):
+                hud.blit(text, (i * column_width, j * line_height))
+        return hud
 
     def run(self):
         running = True
+        last_frame = perf_counter()
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                     self._log_event("SYSTEM", "Simulation quit by user")
+                    self._log_cache_stats()
                 self.handle_input(event)
 
+            now = perf_counter()
+            elapsed, last_frame = now - last_frame, now
+            profiler = self.profiler if self.profiling else None
+            if profiler is not None:
+                frame_start = perf_counter_ns()
             if not self.paused:
                 self._collect_stats()
-                for _ in range(int(self.simulation_speed)):
-                    self.environment.update()
-
-            self.screen.fill((0, 0, 0))  # Clear simulation area
-            self.environment.draw(self.screen)
-            self.draw_ui()
+                self.timestep.advance(elapsed, self._step)
+            else:
+                self.timestep.reset()
+            if profiler is not None:
+                profiler.lap("update", frame_start)
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.draw_frame(profiler)
+            if profiler is not None:
+                profiler.lap("frame", frame_start) # Work per frame, excluding the frame-rate wait
+            self.clock.tick(FPS) # Caps the display rate; ticks per frame follow from the timestep
 
-        self.log_file.close()
+        if self.timestep.ticks_shed:
+            self._log_event("SYSTEM", f"{self.timestep.ticks_shed} ticks shed to hold the display rate")
+        self._dump_profile()
+        self._close_exporter()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        self._close_event_log()
         pygame.quit()
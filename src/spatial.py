@@ -0,0 +1,246 @@
+import math
+
+import numpy as np
+
+from constants import FOOD_GRID_CELL_SIZE, SCREEN_HEIGHT, SCREEN_WIDTH, ZONE_RASTER_CELL_SIZE
+
+
+class SpatialGrid:
+    """
+    Uniform-grid spatial index for static point items (e.g. food).
+    Items are bucketed by the grid square containing their (x, y) position,
+    so a radius query only has to look at the buckets overlapping the radius.
+    """
+
+    def __init__(self, cell_size=FOOD_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.buckets = {}
+        self.count = 0
+
+    def _key(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, item):
+        self.buckets.setdefault(self._key(item.x, item.y), []).append(item)
+        self.count += 1
+
+    def remove(self, item):
+        """Remove an item from the grid. Items that were never indexed are ignored."""
+        key = self._key(item.x, item.y)
+        bucket = self.buckets.get(key)
+        if not bucket:
+            return False
+        try:
+            bucket.remove(item)
+        except ValueError:
+            return False
+        if not bucket:
+            del self.buckets[key]
+        self.count -= 1
+        return True
+
+    def clear(self):
+        self.buckets.clear()
+        self.count = 0
+
+    def rebuild(self, items):
+        self.clear()
+        for item in items:
+            self.insert(item)
+
+    def __len__(self):
+        return self.count
+
+    def query_radius(self, x, y, radius):
+        """Yield every item in the buckets overlapping the square around (x, y)."""
+        size = self.cell_size
+        min_gx = int((x - radius) // size)
+        max_gx = int((x + radius) // size)
+        min_gy = int((y - radius) // size)
+        max_gy = int((y + radius) // size)
+        buckets = self.buckets
+        for gx in range(min_gx, max_gx + 1):
+            for gy in range(min_gy, max_gy + 1):
+                bucket = buckets.get((gx, gy))
+                if bucket:
+                    yield from bucket
+
+    def nearest(self, x, y, radius):
+        """Return the closest item strictly within radius of (x, y), or None."""
+        closest = None
+        min_dist = float('inf')
+        for item in self.query_radius(x, y, radius):
+            dist = math.sqrt((x - item.x)**2 + (y - item.y)**2)
+            if dist < radius and dist < min_dist:
+                min_dist = dist
+                closest = item
+        return closest
+
+
+class ZoneRaster:
+    """
+    Coarse raster of circular zone coverage for point-in-zone counts.
+
+    Built once per zone layout. Every raster square records how many zones cover
+    it completely and which zones only overlap it partially; a point is tested
+    (with squared distances) against the partial zones of its square only, so a
+    lookup costs about the same for three zones or three hundred. The raster
+    spans width x height from (left, top); points outside it fall back to
+    testing every zone. Counts are exact: a point is in a zone when its squared
+    distance to the centre is below radius**2.
+    """
+
+    def __init__(self, zones, cell_size=ZONE_RASTER_CELL_SIZE, width=SCREEN_WIDTH, height=SCREEN_HEIGHT,
+                 left=0, top=0):
+        self.cell_size = cell_size
+        self.left = left
+        self.top = top
+        self.columns = int(width // cell_size) + 1 # +1 so points on the far edge are still covered
+        self.rows = int(height // cell_size) + 1
+        self.zones = [(zone.x, zone.y, zone.radius * zone.radius) for zone in zones]
+        squares = self.columns * self.rows
+        self.full = [0] * squares # Zones covering the whole square
+        partial = [[] for _ in range(squares)] # (x, y, radius**2) of zones covering part of it
+        for zone in zones:
+            self._rasterize(zone, partial)
+        self.partial = [tuple(entries) for entries in partial]
+        self._arrays = None # NumPy form of the raster, built on the first batched query
+
+    def _rasterize(self, zone, partial):
+        size = self.cell_size
+        radius_squared = zone.radius * zone.radius
+        first_column = max(0, int((zone.x - zone.radius - self.left) // size))
+        last_column = min(self.columns - 1, int((zone.x + zone.radius - self.left) // size))
+        first_row = max(0, int((zone.y - zone.radius - self.top) // size))
+        last_row = min(self.rows - 1, int((zone.y + zone.radius - self.top) // size))
+        for row in range(first_row, last_row + 1):
+            top, bottom = self.top + row * size, self.top + (row + 1) * size
+            near_y = min(max(zone.y, top), bottom) - zone.y
+            far_y = max(abs(top - zone.y), abs(bottom - zone.y))
+            for column in range(first_column, last_column + 1):
+                left, right = self.left + column * size, self.left + (column + 1) * size
+                near_x = min(max(zone.x, left), right) - zone.x
+                if near_x * near_x + near_y * near_y >= radius_squared:
+                    continue # No point of the square is inside
+                far_x = max(abs(left - zone.x), abs(right - zone.x))
+                index = row * self.columns + column
+                if far_x * far_x + far_y * far_y < radius_squared:
+                    self.full[index] += 1
+                else:
+                    partial[index].append((zone.x, zone.y, radius_squared))
+
+    def _square(self, x, y):
+        column = int((x - self.left) // self.cell_size)
+        row = int((y - self.top) // self.cell_size)
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return row * self.columns + column
+        return None
+
+    def count(self, x, y):
+        """Number of zones containing the point (x, y)."""
+        index = self._square(x, y)
+        if index is None:
+            count, zones = 0, self.zones
+        else:
+            count, zones = self.full[index], self.partial[index]
+        for zone_x, zone_y, radius_squared in zones:
+            dx = x - zone_x
+            dy = y - zone_y
+            if dx * dx + dy * dy < radius_squared:
+                count += 1
+        return count
+
+    def contains(self, x, y):
+        """True if any zone contains the point (x, y)."""
+        index = self._square(x, y)
+        if index is None:
+            zones = self.zones
+        elif self.full[index]:
+            return True
+        else:
+            zones = self.partial[index]
+        for zone_x, zone_y, radius_squared in zones:
+            dx = x - zone_x
+            dy = y - zone_y
+            if dx * dx + dy * dy < radius_squared:
+                return True
+        return False
+
+    def counts(self, xs, ys):
+        """count() for arrays of points, as an int array."""
+        if self._arrays is None:
+            self._arrays = self._build_arrays()
+        full, partial_x, partial_y, partial_r2, all_zones = self._arrays
+        columns = np.floor_divide(xs - self.left, self.cell_size).astype(np.intp)
+        rows = np.floor_divide(ys - self.top, self.cell_size).astype(np.intp)
+        inside = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+        index = np.where(inside, rows * self.columns + columns, 0)
+        counts = full[index]
+        if partial_x.shape[1]:
+            dx = xs[:, None] - partial_x[index]
+            dy = ys[:, None] - partial_y[index]
+            counts += np.count_nonzero(dx * dx + dy * dy < partial_r2[index], axis=1)
+        if not inside.all(): # Off-raster points: exact test against every zone
+            outside = np.flatnonzero(~inside)
+            dx = xs[outside, None] - all_zones[:, 0]
+            dy = ys[outside, None] - all_zones[:, 1]
+            counts[outside] = np.count_nonzero(dx * dx + dy * dy < all_zones[:, 2], axis=1)
+        return counts
+
+    def _build_arrays(self):
+        width = max((len(entries) for entries in self.partial), default=0)
+        # Padding entries have radius**2 = -1, which no squared distance is below
+        padded = np.zeros((len(self.partial), width, 3))
+        padded[:, :, 2] = -1.0
+        for index, entries in enumerate(self.partial):
+            if entries:
+                padded[index, :len(entries)] = entries
+        all_zones = np.array(self.zones, dtype=float).reshape(-1, 3)
+        return (np.array(self.full, dtype=np.intp), padded[:, :, 0].copy(), padded[:, :, 1].copy(),
+                padded[:, :, 2].copy(), all_zones)
+
+
+def nearest_within(xs, ys, radii, item_xs, item_ys, bucket_size):
+    """
+    Index of the closest item strictly within radii[i] of each point (xs[i], ys[i]),
+    or -1, as a vectorized grid search. Items are bucketed into squares of
+    `bucket_size` (which must be at least the largest radius), so each point only
+    looks at the 3x3 squares around it. Ties go to the lowest item index, as with
+    argmin over all items.
+    """
+    targets = np.full(len(xs), -1, dtype=np.int64)
+    if not len(xs) or not len(item_xs):
+        return targets
+    origin_x = min(xs.min(), item_xs.min())
+    origin_y = min(ys.min(), item_ys.min())
+    # +1 so the squares around every point have non-negative coordinates
+    item_columns = np.floor_divide(item_xs - origin_x, bucket_size).astype(np.int64) + 1
+    item_rows = np.floor_divide(item_ys - origin_y, bucket_size).astype(np.int64) + 1
+    point_columns = np.floor_divide(xs - origin_x, bucket_size).astype(np.int64) + 1
+    point_rows = np.floor_divide(ys - origin_y, bucket_size).astype(np.int64) + 1
+    width = int(max(item_columns.max(), point_columns.max())) + 2
+    height = int(max(item_rows.max(), point_rows.max())) + 2
+    keys = item_rows * width + item_columns
+    order = np.argsort(keys, kind="stable")
+    # first[key] is where square `key`'s items start in `order`, first[key + 1] where they end
+    first = np.zeros(width * height + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=width * height), out=first[1:])
+
+    best = np.full(len(xs), np.inf)
+    for row_offset in (-1, 0, 1):
+        for column_offset in (-1, 0, 1):
+            square = (point_rows + row_offset) * width + point_columns + column_offset
+            starts = first[square]
+            spans = first[square + 1] - starts
+            for offset in range(int(spans.max())):
+                points = np.flatnonzero(spans > offset)
+                candidates = order[starts[points] + offset]
+                dx = xs[points] - item_xs[candidates]
+                dy = ys[points] - item_ys[candidates]
+                dist = np.sqrt(dx * dx + dy * dy)
+                current = best[points]
+                closer = (dist < radii[points]) & (
+                    (dist < current) | ((dist == current) & (candidates < targets[points])))
+                best[points[closer]] = dist[closer]
+                targets[points[closer]] = candidates[closer]
+    return targets
@@ -0,0 +1,90 @@
+"""
+Bounded caches for scaled and tinted sprites.
+
+Cells and food draw a copy of their base sprite scaled to their size and tinted
+with their color. Building one costs a smoothscale and a blend fill, so results
+are cached, but the set of keys grows over a long run (new clans, mutated
+sizes). SpriteCache caps the pixel memory it holds and evicts the least
+recently used sprites beyond that.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from constants import SPRITE_CACHE_MAX_BYTES
+
+
+def surface_bytes(surface):
+    """Approximate pixel memory of a surface."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def build_tinted_sprite(original, size, color):
+    """Scale a 32x32 base sprite to a radius of `size` (minimum 8 pixels across) and tint it with `color`."""
+    target_size = max(int(size * 2), 8)
+    scaled_image = pygame.transform.smoothscale(original, (target_size, target_size))
+    colored_image = scaled_image.copy()
+    colored_image.fill(tuple(color) + (0,), None, pygame.BLEND_RGBA_MULT)
+    return colored_image
+
+
+class SpriteCache:
+    """LRU cache of surfaces with a memory cap and hit/miss counters."""
+
+    def __init__(self, max_bytes=SPRITE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> surface, least recently used first
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Return the cached surface for `key` (marking it recently used), or None on a miss."""
+        surface = self._entries.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return surface
+
+    def put(self, key, surface):
+        """Cache a surface, evicting least recently used entries while over the memory cap."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes_used -= surface_bytes(old)
+        self._entries[key] = surface
+        self.bytes_used += surface_bytes(surface)
+        while self.bytes_used > self.max_bytes and len(self._entries) > 1: # Always keep the newest sprite
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= surface_bytes(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached sprite. Counters are kept; see reset_stats()."""
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
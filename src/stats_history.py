@@ -0,0 +1,193 @@
+"""
+Fixed-capacity, multi-resolution statistics history.
+
+Each column is stored in NumPy ring buffers. Level 0 keeps the most recent
+`capacity` samples at full resolution. Every `factor` samples of a level are
+folded into one min/mean/max bucket of the next level, so level k holds
+`capacity` buckets of factor**k samples each. Memory stays constant however
+long the run goes, while old history remains available in coarser form.
+
+Queries return only the requested time window; a window that does not wrap
+around the end of a ring buffer is returned as views without copying. Coarse
+windows end with the bucket still being filled, merged from the pending
+buckets of every finer level, so they reach the latest sample like level 0.
+"""
+import numpy as np
+
+from constants import STATS_DOWNSAMPLE_FACTOR, STATS_HISTORY_CAPACITY, STATS_HISTORY_LEVELS
+
+
+class _Ring:
+    """Ring buffer of parallel float64 arrays ordered by the "time" array."""
+
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.arrays = {name: np.zeros(capacity) for name in ("time",) + tuple(fields)}
+        self.start = 0 # Physical index of the oldest entry
+        self.size = 0
+
+    def append(self, values):
+        index = (self.start + self.size) % self.capacity
+        for name, value in values.items():
+            self.arrays[name][index] = value
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def last(self, name):
+        return self.arrays[name][(self.start + self.size - 1) % self.capacity]
+
+    def oldest_time(self):
+        return self.arrays["time"][self.start] if self.size else None
+
+    def _segments(self):
+        """Physical (begin, end) ranges holding the entries, oldest first."""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return [(self.start, end)]
+        return [(self.start, self.capacity), (0, end - self.capacity)]
+
+    def window(self, start, end):
+        """Entries with start <= time <= end (None = unbounded), as arrays keyed by field name."""
+        parts = []
+        times = self.arrays["time"]
+        for begin, stop in self._segments():
+            segment = times[begin:stop]
+            lo = begin + (np.searchsorted(segment, start, "left") if start is not None else 0)
+            hi = begin + (np.searchsorted(segment, end, "right") if end is not None else len(segment))
+            if lo < hi:
+                parts.append((lo, hi))
+        if len(parts) == 1:
+            lo, hi = parts[0]
+            return {name: array[lo:hi] for name, array in self.arrays.items()} # Views, no copy
+        return {name: np.concatenate([array[lo:hi] for lo, hi in parts]) if parts else array[:0]
+                for name, array in self.arrays.items()}
+
+
+class StatsHistory:
+    """Time series of named statistics with bounded memory and min/mean/max downsampling."""
+
+    def __init__(self, columns, capacity=STATS_HISTORY_CAPACITY, factor=STATS_DOWNSAMPLE_FACTOR,
+                 levels=STATS_HISTORY_LEVELS):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self.factor = factor
+        bucket_fields = tuple(f"{column}{suffix}" for column in self.columns for suffix in ("_min", "", "_max"))
+        self._levels = [_Ring(capacity, self.columns)] + [_Ring(capacity, bucket_fields) for _ in range(levels - 1)]
+        self._pending = [None] * levels # Partially filled bucket feeding each level above 0
+        self.total_samples = 0
+
+    def __len__(self):
+        """Number of full-resolution samples currently retained."""
+        return self._levels[0].size
+
+    @property
+    def levels(self):
+        return len(self._levels)
+
+    def append(self, time, **values):
+        """Record one sample of every column at `time` (times must not decrease)."""
+        sample = dict(values, time=time)
+        self._levels[0].append(sample)
+        self.total_samples += 1
+        self._fold(1, time, {column: (values[column], values[column], values[column]) for column in self.columns})
+
+    def _fold(self, level, time, triples):
+        """Add one (min, mean, max) entry per column to the pending bucket of `level`."""
+        if level >= len(self._levels):
+            return
+        pending = self._pending[level]
+        if pending is None:
+            self._pending[level] = {"time": time, "count": 1,
+                                    "columns": {column: list(triple) for column, triple in triples.items()}}
+            pending = self._pending[level]
+        else:
+            pending["count"] += 1
+            for column, (low, mean, high) in triples.items():
+                bucket = pending["columns"][column]
+                if low < bucket[0]:
+                    bucket[0] = low
+                bucket[1] += mean
+                if high > bucket[2]:
+                    bucket[2] = high
+        if pending["count"] < self.factor:
+            return
+
+        # Bucket complete: store it and feed it into the next level
+        self._pending[level] = None
+        count = pending["count"]
+        row = {"time": pending["time"]}
+        folded = {}
+        for column, (low, total, high) in pending["columns"].items():
+            mean = total / count
+            row[f"{column}_min"] = low
+            row[column] = mean
+            row[f"{column}_max"] = high
+            folded[column] = (low, mean, high)
+        self._levels[level].append(row)
+        self._fold(level + 1, pending["time"], folded)
+
+    def latest(self, column, default=0):
+        """Most recent full-resolution value of a column."""
+        ring = self._levels[0]
+        return ring.last(column) if ring.size else default
+
+    def level_for(self, start):
+        """Finest level whose retained history reaches back to `start`."""
+        if start is not None:
+            for level, ring in enumerate(self._levels):
+                if ring.size and ring.oldest_time() <= start:
+                    return level
+        # Nothing reaches back that far: the coarsest level with data holds the oldest history
+        for level in range(len(self._levels) - 1, -1, -1):
+            if self._levels[level].size:
+                return level
+        return 0
+
+    def _partial_bucket(self, level):
+        """The still-filling bucket of `level` as a row, merged from the pending buckets at and below it."""
+        row = None
+        samples = 0
+        for pending_level in range(level, 0, -1): # Oldest samples first
+            pending = self._pending[pending_level]
+            if pending is None:
+                continue
+            weight = self.factor ** (pending_level - 1) # Samples behind each entry of this pending bucket
+            if row is None:
+                row = {"time": pending["time"]}
+                totals = {column: [np.inf, 0.0, -np.inf] for column in self.columns}
+            samples += pending["count"] * weight
+            for column, (low, total, high) in pending["columns"].items():
+                bucket = totals[column]
+                bucket[0] = min(bucket[0], low)
+                bucket[1] += total * weight
+                bucket[2] = max(bucket[2], high)
+        if row is None:
+            return None
+        for column, (low, total, high) in totals.items():
+            row[f"{column}_min"] = low
+            row[column] = total / samples
+            row[f"{column}_max"] = high
+        return row
+
+    def window(self, start=None, end=None, level=None):
+        """
+        Samples with start <= time <= end as a dict of arrays, plus "level". Level 0 has
+        "time" and one array per column; coarser levels add "<column>_min"/"<column>_max",
+        with "time" the first tick of each bucket. The last bucket may still be filling;
+        "partial" tells whether it is included. By default the finest level covering
+        `start` is used.
+        """
+        if level is None:
+            level = self.level_for(start)
+        result = self._levels[level].window(start, end)
+        partial = self._partial_bucket(level) if level else None
+        if partial is not None and (start is None or partial["time"] >= start) and \
+                (end is None or partial["time"] <= end):
+            result = {name: np.append(array, partial[name]) for name, array in result.items()}
+        else:
+            partial = None
+        result["level"] = level
+        result["partial"] = partial is not None
+        return result
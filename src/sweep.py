@@ -0,0 +1,165 @@
+"""
+Parallel parameter sweeps over simulation constants.
+
+Each configuration/seed pair runs as its own headless Environment in a worker
+process. Summary metrics are appended to a JSON Lines results file as soon as
+each run finishes, so partial results survive an interrupted sweep.
+
+Usage:
+    python sweep.py --grid CELL_MUTATION_RATE=0.05,0.1,0.2 --grid FOOD_SPAWN_RATE_PER_FRAME=0.05,0.1 \\
+        --seeds 4 --ticks 5000 --output sweep_results.jsonl
+    python sweep.py --sample 20 --range TOXIC_ZONE_DAMAGE_PER_FRAME=0.1:0.6 --seeds 2
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from clan import TRAIT_NAMES
+from config import CONFIG_FIELDS, SimulationConfig
+from headless import create_environment
+
+
+def parse_value(text):
+    """Parse a command-line value as JSON (numbers, lists, ...), falling back to a plain string."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def _split_assignment(text):
+    name, sep, values = text.partition("=")
+    if not sep or name not in CONFIG_FIELDS:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUES with NAME one of the simulation constants, got {text!r}")
+    return name, values
+
+
+def parse_grid_option(text):
+    """Parse NAME=v1,v2,... into (name, [v1, v2, ...])."""
+    name, values = _split_assignment(text)
+    return name, [parse_value(value) for value in values.split(",")]
+
+
+def parse_range_option(text):
+    """Parse NAME=low:high into (name, (low, high))."""
+    name, values = _split_assignment(text)
+    low, sep, high = values.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=LOW:HIGH, got {text!r}")
+    return name, (float(low), float(high))
+
+
+def grid_configurations(grid):
+    """Cartesian product of the grid values, as a list of override dicts."""
+    names = [name for name, _ in grid]
+    return [dict(zip(names, values)) for values in itertools.product(*(values for _, values in grid))]
+
+
+def sample_configurations(ranges, count, rng):
+    """`count` override dicts drawn uniformly from the given ranges. Integer constants stay integers."""
+    defaults = SimulationConfig()
+    configurations = []
+    for _ in range(count):
+        overrides = {}
+        for name, (low, high) in ranges:
+            if isinstance(getattr(defaults, name), int):
+                overrides[name] = rng.randint(int(low), int(high))
+            else:
+                overrides[name] = rng.uniform(low, high)
+        configurations.append(overrides)
+    return configurations
+
+
+def summarize_environment(environment):
+    """Summary metrics of a finished run: population, clan survival and trait means."""
+    # In clan creation order, comparable across runs
+    clan_populations = [count for _, count, _ in environment.clan_summaries()]
+    if environment.cell_count:
+        trait_means = environment.trait_means()
+    else:
+        trait_means = {name: None for name in TRAIT_NAMES}
+    return {
+        "final_population": environment.cell_count,
+        "final_food": environment.food_count,
+        "clans_surviving": sum(1 for count in clan_populations if count > 0),
+        "clan_populations": clan_populations,
+        "trait_means": trait_means,
+    }
+
+
+def run_configuration(overrides, seed, ticks, vectorized=False):
+    """Run one headless simulation and return its summary. Executed in a worker process."""
+    config = SimulationConfig(**overrides)
+    environment = create_environment(seed, vectorized, config)
+    start = time.perf_counter()
+    extinct_at = None
+    for tick in range(1, ticks + 1):
+        environment.update()
+        if not environment.cell_count:
+            extinct_at = tick # Nothing left to evolve, stop early
+            break
+    elapsed = time.perf_counter() - start
+
+    result = {"overrides": overrides, "seed": seed, "ticks": ticks, "extinct_at": extinct_at,
+              "elapsed_seconds": elapsed}
+    result.update(summarize_environment(environment))
+    return result
+
+
+def run_sweep(configurations, seeds, ticks, output_path, workers=None, vectorized=False):
+    """Run every configuration for every seed, streaming one JSON line per finished run."""
+    workers = workers or os.cpu_count()
+    completed = 0
+    with open(output_path, "a") as output, ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_configuration, overrides, seed, ticks, vectorized)
+                   for overrides in configurations for seed in seeds]
+        for future in as_completed(futures):
+            output.write(json.dumps(future.result()) + "\n")
+            output.flush()
+            completed += 1
+            print(f"[{completed}/{len(futures)}] runs finished")
+    return completed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep simulation constants across a process pool.")
+    parser.add_argument("--grid", action="append", type=parse_grid_option, default=[],
+                        metavar="NAME=V1,V2", help="grid values for a constant (repeatable)")
+    parser.add_argument("--range", action="append", type=parse_range_option, default=[],
+                        metavar="NAME=LOW:HIGH", help="sampling range for a constant (repeatable, used with --sample)")
+    parser.add_argument("--sample", type=int, default=0, help="number of random configurations to draw from --range")
+    parser.add_argument("--seeds", type=int, default=1, help="number of seeds (0..N-1) per configuration")
+    parser.add_argument("--ticks", type=int, default=5000, help="ticks per run")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default="sweep_results.jsonl", help="JSON Lines results file (appended to)")
+    parser.add_argument("--vectorized", action="store_true", help="use the NumPy struct-of-arrays engine")
+    parser.add_argument("--sample-seed", type=int, default=None, help="seed for drawing random configurations")
+    args = parser.parse_args(argv)
+    if args.sample < 0:
+        parser.error("--sample must not be negative")
+    if args.range and not args.sample:
+        parser.error("--range requires --sample")
+    if args.sample and not args.range:
+        parser.error("--sample requires at least one --range")
+    if args.sample_seed is not None and not args.sample:
+        parser.error("--sample-seed requires --sample")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configurations = grid_configurations(args.grid) if args.grid else [{}]
+    if args.sample:
+        sampled = sample_configurations(args.range, args.sample, random.Random(args.sample_seed))
+        configurations = [dict(base, **extra) for base in configurations for extra in sampled]
+
+    runs = run_sweep(configurations, range(args.seeds), args.ticks, args.output, args.workers, args.vectorized)
+    print(f"Wrote {runs} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Local telemetry server for runs in progress.
+
+An asyncio event loop on a background thread serves, on 127.0.0.1 only:
+
+    GET /stats      latest sample as JSON (the stats history columns, tick rate and per-clan means)
+    GET /metrics    the same in Prometheus text format
+    GET /ws         WebSocket: one full snapshot, then one delta per tick with only the changed values
+
+The simulation thread calls publish() once per tick. publish() only swaps in
+the latest sample and, while WebSocket clients are connected, appends it to a
+bounded deque and wakes the loop at most once per batch; it never waits on the
+network. Each subscriber has its own bounded queue. A client that falls more
+than TELEMETRY_CLIENT_QUEUE messages behind loses its backlog and is sent a
+fresh snapshot instead, so slow clients only ever slow themselves down.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from collections import deque
+
+from clan import TRAIT_NAMES
+from constants import (
+    TELEMETRY_CLIENT_QUEUE,
+    TELEMETRY_HOST,
+    TELEMETRY_PENDING_MAX,
+    TELEMETRY_PORT,
+    TELEMETRY_RATE_WINDOW,
+)
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+REQUEST_TIMEOUT = 5.0 # Seconds a client gets to send its request headers
+MAX_HEADER_BYTES = 16384 # Longer request headers are rejected
+
+# Prometheus gauges for the top-level sample fields: field -> (metric name, help text)
+GAUGES = {
+    "cell_count": ("microlife_cells", "Living cells"),
+    "food_count": ("microlife_food", "Food items"),
+    "avg_speed": ("microlife_avg_speed", "Mean speed over all living cells"),
+    "avg_sense_radius": ("microlife_avg_sense_radius", "Mean sense radius over all living cells"),
+    "avg_energy_efficiency": ("microlife_avg_energy_efficiency", "Mean energy efficiency over all living cells"),
+    "ticks_per_sec": ("microlife_ticks_per_second", "Simulation ticks per second of wall time"),
+}
+
+
+def telemetry_sample(environment):
+    """One telemetry sample of an Environment or VectorEnvironment (tick rate is added by the server)."""
+    trait_means = environment.trait_means()
+    return {
+        "tick": environment.tick,
+        "cell_count": environment.cell_count,
+        "food_count": environment.food_count,
+        "avg_speed": trait_means["speed"],
+        "avg_sense_radius": trait_means["sense_radius"],
+        "avg_energy_efficiency": trait_means["energy_efficiency"],
+        "clans": {str(clan.id): dict(means, cells=count) for clan, count, means in environment.clan_summaries()},
+    }
+
+
+def sample_delta(previous, sample):
+    """The fields of `sample` that differ from `previous` (per clan for "clans"), always with "tick"."""
+    delta = {"tick": sample["tick"]}
+    for key, value in sample.items():
+        if key == "clans":
+            old_clans = previous.get("clans", {})
+            clans = {}
+            for clan_id, means in value.items():
+                old = old_clans.get(clan_id, {})
+                changed = {name: mean for name, mean in means.items() if old.get(name) != mean}
+                if changed:
+                    clans[clan_id] = changed
+            if clans:
+                delta["clans"] = clans
+        elif key != "tick" and previous.get(key) != value:
+            delta[key] = value
+    return delta
+
+
+def prometheus_text(sample, dropped=0):
+    """Prometheus text exposition (format 0.0.4) of one sample."""
+    lines = ["# HELP microlife_ticks_total Simulation ticks since the run started",
+             "# TYPE microlife_ticks_total counter",
+             f"microlife_ticks_total {sample.get('tick', 0)}"]
+    for field, (metric, help_text) in GAUGES.items():
+        if field in sample:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", f"{metric} {sample[field]}"]
+    clans = sample.get("clans", {})
+    if clans:
+        lines += ["# HELP microlife_clan_cells Living cells per clan", "# TYPE microlife_clan_cells gauge"]
+        lines += [f'microlife_clan_cells{{clan="{clan_id}"}} {means["cells"]}' for clan_id, means in clans.items()]
+        lines += ["# HELP microlife_clan_trait_mean Mean trait value per clan",
+                  "# TYPE microlife_clan_trait_mean gauge"]
+        lines += [f'microlife_clan_trait_mean{{clan="{clan_id}",trait="{name}"}} {means[name]}'
+                  for clan_id, means in clans.items() for name in TRAIT_NAMES]
+    lines += ["# HELP microlife_telemetry_dropped_total WebSocket messages dropped for slow subscribers",
+              "# TYPE microlife_telemetry_dropped_total counter",
+              f"microlife_telemetry_dropped_total {dropped}"]
+    return "\n".join(lines) + "\n"
+
+
+def websocket_frame(payload, opcode=0x1):
+    """A single unmasked server-to-client WebSocket frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_websocket_frame(reader):
+    """(opcode, payload) of the next client frame (clients always mask their frames)."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+    payload = await reader.readexactly(length)
+    return first & 0x0F, bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=TELEMETRY_CLIENT_QUEUE)
+
+
+class TelemetryServer:
+    """HTTP/WebSocket telemetry served from a background thread. Use start() and close()."""
+
+    def __init__(self, host=TELEMETRY_HOST, port=TELEMETRY_PORT):
+        self.host = host
+        self.port = port # Bound port once started (pass 0 to pick a free one)
+        self.dropped = 0 # Messages dropped for subscribers that fell behind
+        self._latest = {} # Swapped in by publish(), read by the server thread
+        self._last_sent = {} # Last sample pushed to subscribers (server thread only)
+        self._pending = deque(maxlen=TELEMETRY_PENDING_MAX) # Samples waiting for the server thread
+        self._wakeup_scheduled = False
+        self._subscribers = set()
+        self._rate_mark = None # (tick, time) the tick rate is measured from
+        self._ticks_per_sec = 0.0
+        self._loop = None
+        self._stop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def close(self):
+        if self._thread is None:
+            return
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def latest(self):
+        return self._latest
+
+    def publish(self, sample):
+        """Make `sample` (see telemetry_sample) the latest one. Called from the simulation thread."""
+        now = time.perf_counter()
+        if self._rate_mark is None:
+            self._rate_mark = (sample["tick"], now)
+        elif now - self._rate_mark[1] >= TELEMETRY_RATE_WINDOW:
+            self._ticks_per_sec = (sample["tick"] - self._rate_mark[0]) / (now - self._rate_mark[1])
+            self._rate_mark = (sample["tick"], now)
+        sample["ticks_per_sec"] = self._ticks_per_sec
+        self._latest = sample
+        if not self._subscribers:
+            return
+        self._pending.append(sample)
+        if not self._wakeup_scheduled:
+            self._wakeup_scheduled = True
+            self._loop.call_soon_threadsafe(self._drain)
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except BaseException as error: # Startup failures (e.g. port in use) are re-raised by start()
+            self._error = error
+            self._ready.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await self._stop.wait()
+            # Close open connections first; the server only finishes closing once they are gone
+            handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+
+    def _drain(self):
+        """Turn the pending samples into per-subscriber deltas. Runs on the server thread."""
+        self._wakeup_scheduled = False
+        while self._pending:
+            sample = self._pending.popleft()
+            message = json.dumps(dict(sample_delta(self._last_sent, sample), type="delta"))
+            self._last_sent = sample
+            for subscriber in self._subscribers:
+                self._offer(subscriber, message)
+
+    def _offer(self, subscriber, message):
+        try:
+            subscriber.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too far behind: drop the backlog and start it over from a full snapshot
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+                self.dropped += 1
+            subscriber.queue.put_nowait(json.dumps(dict(self._last_sent, type="snapshot")))
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        method, path = (parts[0], parts[1].split("?")[0]) if len(parts) >= 2 else ("", "")
+        try:
+            if method != "GET":
+                await self._respond(writer, 405, "text/plain", b"method not allowed\n")
+            elif path in ("/", "/stats"):
+                await self._respond(writer, 200, "application/json", json.dumps(self._latest).encode())
+            elif path == "/metrics":
+                await self._respond(writer, 200, "text/plain; version=0.0.4",
+                                    prometheus_text(self._latest, self.dropped).encode())
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._websocket(reader, writer, headers)
+            else:
+                await self._respond(writer, 404, "text/plain", b"not found\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, body):
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        subscriber = _Subscriber()
+        if not self._subscribers:
+            self._last_sent = self._latest # Nobody was subscribed, so deltas start from the latest sample
+        # Deltas are relative to the last sample sent to every subscriber, so that is where a new one starts
+        subscriber.queue.put_nowait(json.dumps(dict(self._last_sent, type="snapshot")))
+        self._subscribers.add(subscriber)
+        sender = asyncio.create_task(self._send_loop(writer, subscriber))
+        try:
+            while True:
+                opcode, payload = await read_websocket_frame(reader)
+                if opcode == 0x8: # Close
+                    break
+                if opcode == 0x9: # Ping
+                    writer.write(websocket_frame(payload, 0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            sender.cancel()
+        try:
+            writer.write(websocket_frame(b"", 0x8))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _send_loop(self, writer, subscriber):
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                writer.write(websocket_frame(message.encode()))
+                await writer.drain() # Waits only on this client's socket
+        except ConnectionError:
+            pass
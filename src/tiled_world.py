@@ -0,0 +1,586 @@
+"""
+Domain-decomposed large-world mode.
+
+The world has its own size, independent of the window, and is split into a
+grid of tiles. Each tile is owned by a worker process that keeps its cells and
+food in NumPy arrays and applies the per-cell kernels of vector_engine.py, with
+the world's size as the bounds. Every tick, tiles exchange data with their
+eight neighbours through shared-memory buffers:
+
+    halo       own food within TILE_HALO of the tile border, so cells next door can find it
+    claims     cells that reached a neighbour's food; the owner grants each item to one claim
+    migrants   cells that ended the tick outside the tile (moved or were born across a border)
+    mutations  clan mutations rolled by the tile's births; every tile applies all of them in
+               tile order, so the replicated clan traits stay identical everywhere
+
+Four barriers per tick separate the phases. Every tile has its own random
+stream and reads the exchanges in tile order, so a run is reproducible for a
+given seed and tile grid, and running the tiles in one process (processes=False)
+gives the same result as running them in workers.
+
+Compared to a single Environment, food limits, food spawning and zone counts are
+per screen-sized area of the world, the resource-zone spawn boost applies per
+tile, and a tile's own cells come first when food at a border is contested.
+"""
+import math
+import random
+import traceback
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from clan import Clan
+from config import DEFAULT_CONFIG
+from constants import CLAN_COLORS, SCREEN_HEIGHT, SCREEN_WIDTH, TILE_EXCHANGE_CAPACITY
+from environment import create_zones
+from spatial import ZoneRaster, nearest_within
+from vector_engine import (
+    MUTATION_TRAITS,
+    age_food,
+    apply_zone_damage,
+    feed_cells,
+    first_eaters,
+    move_cells,
+    offspring_positions,
+    roll_mutations,
+    select_parents,
+    surviving_cells,
+    target_offsets,
+)
+
+PHASES = ("begin_tick", "seek_and_eat", "grant_claims", "finish_tick", "exchange")
+
+# Row layouts of the exchange buffers
+HALO_COLUMNS = 4 # x, y, food type, index in the owner's food arrays
+CLAIM_COLUMNS = 4 # owner tile, owner food index, claiming cell index, granted (set by the owner)
+MIGRANT_COLUMNS = 7 # destination tile, x, y, energy, age, reproduction timer, clan
+MUTATION_COLUMNS = 3 # clan, trait index, amount
+# Columns of the per-tile row counts
+HALO, CLAIMS, MIGRANTS, MUTATIONS = range(4)
+
+
+class TileGrid:
+    """Split of a width x height world into columns x rows tiles with integer bounds."""
+
+    def __init__(self, width, height, columns, rows):
+        self.width = width
+        self.height = height
+        self.columns = columns
+        self.rows = rows
+        # Inner tile edges; a point on an edge belongs to the tile to its right (or below)
+        self._column_edges = np.array([column * width // columns for column in range(1, columns)], dtype=float)
+        self._row_edges = np.array([row * height // rows for row in range(1, rows)], dtype=float)
+
+    def __len__(self):
+        return self.columns * self.rows
+
+    def bounds(self, tile):
+        """(left, top, right, bottom) of a tile; right and bottom are exclusive."""
+        column, row = tile % self.columns, tile // self.columns
+        return (column * self.width // self.columns, row * self.height // self.rows,
+                (column + 1) * self.width // self.columns, (row + 1) * self.height // self.rows)
+
+    def tile_at(self, xs, ys):
+        """Tile index of every point (points on or past the world edge belong to the edge tiles)."""
+        columns = np.searchsorted(self._column_edges, xs, "right")
+        rows = np.searchsorted(self._row_edges, ys, "right")
+        return rows * self.columns + columns
+
+    def neighbors(self, tile):
+        """Indices of the up to eight tiles around a tile, ascending."""
+        column, row = tile % self.columns, tile // self.columns
+        return [(row + dr) * self.columns + column + dc
+                for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                if (dr or dc) and 0 <= row + dr < self.rows and 0 <= column + dc < self.columns]
+
+
+def _create_shared(shape, dtype=np.float64):
+    size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    array.fill(0)
+    return block, array
+
+
+def _attach_shared(name, shape, dtype=np.float64):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _check_capacity(count, capacity, what):
+    if count > capacity:
+        raise RuntimeError(f"{count} {what} in one tick exceed the exchange capacity of {capacity} "
+                           f"(raise TILE_EXCHANGE_CAPACITY or use smaller tiles)")
+
+
+class Tile:
+    """One tile's cells and food, stepped phase by phase between the barriers."""
+
+    def __init__(self, spec):
+        self.index = spec["index"]
+        self.grid = TileGrid(*spec["grid"])
+        self.config = spec["config"]
+        cfg = self.config
+        self.left, self.top, self.right, self.bottom = self.grid.bounds(self.index)
+        self.neighbors = self.grid.neighbors(self.index)
+        self.halo = spec["halo"]
+        self.capacity = spec["capacity"]
+        self.area_scale = (self.right - self.left) * (self.bottom - self.top) / (SCREEN_WIDTH * SCREEN_HEIGHT)
+        self.food_capacity = spec["food_capacity"]
+        self.rng = np.random.default_rng(spec["seed_sequence"])
+        self.tick = 0
+        self.environment_timer = 0
+
+        # Shared exchange buffers (one row block per tile)
+        self._blocks = []
+        arrays = {}
+        for name, (block_name, shape, dtype) in spec["buffers"].items():
+            block, arrays[name] = _attach_shared(block_name, shape, dtype)
+            self._blocks.append(block)
+        self.halo_rows = arrays["halo"]
+        self.claim_rows = arrays["claims"]
+        self.migrant_rows = arrays["migrants"]
+        self.mutation_rows = arrays["mutations"]
+        self.counts = arrays["counts"]
+        self.stats = arrays["stats"]
+
+        # Clans and zones are replicated: every tile builds them from the same seeds
+        clan_rng = random.Random(spec["clan_seed"])
+        self.clans = [Clan(color=CLAN_COLORS[i % len(CLAN_COLORS)], config=cfg, rng=clan_rng)
+                      for i in range(cfg.INITIAL_CLAN_COUNT)]
+        self.zone_rng = random.Random(spec["zone_seed"])
+        self._create_zones()
+
+        self._food_type_energy = np.array([t["energy_value"] for t in cfg.FOOD_TYPES], dtype=float)
+        self._food_type_lifespan = np.array([t["lifespan"] for t in cfg.FOOD_TYPES], dtype=np.int64)
+        self._food_type_size = np.array([t["size"] for t in cfg.FOOD_TYPES], dtype=float)
+
+        cells = spec["cells"]
+        self.cell_x = self.rng.uniform(self.left, self.right, cells)
+        self.cell_y = self.rng.uniform(self.top, self.bottom, cells)
+        self.cell_energy = np.full(cells, float(cfg.CELL_ENERGY_MAX))
+        self.cell_age = np.zeros(cells, dtype=np.int64)
+        self.cell_reproduction_timer = np.zeros(cells, dtype=np.int64)
+        self.cell_clan = self.rng.integers(0, len(self.clans), cells) if self.clans else np.zeros(0, dtype=np.int64)
+
+        self.food_x = np.empty(0)
+        self.food_y = np.empty(0)
+        self.food_age = np.empty(0, dtype=np.int64)
+        self.food_type = np.empty(0, dtype=np.int64)
+        self._spawn_food(min(round(cfg.INITIAL_FOOD_COUNT * self.area_scale), self.food_capacity))
+        self._publish_stats()
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+
+    def run_tick(self, wait):
+        """Run every phase of one tick, calling wait() (a barrier) between phases."""
+        for number, phase in enumerate(PHASES):
+            if number:
+                wait()
+            getattr(self, phase)()
+
+    def _create_zones(self):
+        toxic_zones, resource_zones = create_zones(self.config, self.zone_rng, self.grid.width, self.grid.height)
+        width, height = self.right - self.left, self.bottom - self.top
+        self.toxic_raster = ZoneRaster(toxic_zones, width=width, height=height, left=self.left, top=self.top)
+        self.resource_raster = ZoneRaster(resource_zones, width=width, height=height, left=self.left, top=self.top)
+        self.has_toxic_zones = bool(toxic_zones)
+        self.has_resource_zones = bool(resource_zones)
+
+    def _clan_trait_arrays(self):
+        clans = self.clans
+        return tuple(np.array([getattr(clan, name) for clan in clans], dtype=float)
+                     for name in ("speed", "sense_radius", "energy_efficiency", "size", "lifespan"))
+
+    def _spawn_food(self, count):
+        food_type = self.rng.integers(0, len(self.config.FOOD_TYPES), count)
+        size = self._food_type_size[food_type]
+        # Integer positions inside the tile, kept size pixels away from the world's far edges
+        x = np.floor(self.rng.uniform(self.left, np.minimum(self.right, self.grid.width - size + 1)))
+        y = np.floor(self.rng.uniform(self.top, np.minimum(self.bottom, self.grid.height - size + 1)))
+        self.food_x = np.concatenate((self.food_x, x))
+        self.food_y = np.concatenate((self.food_y, y))
+        self.food_age = np.concatenate((self.food_age, np.zeros(count, dtype=np.int64)))
+        self.food_type = np.concatenate((self.food_type, food_type))
+
+    # Phase 1: zones, toxic damage, aging; publish the halo
+    def begin_tick(self):
+        cfg = self.config
+        self.tick += 1
+        self.environment_timer += 1
+        if self.environment_timer >= cfg.ENVIRONMENT_CHANGE_INTERVAL:
+            self._create_zones()
+            self.environment_timer = 0
+
+        self._traits = tuple(trait[self.cell_clan] for trait in self._clan_trait_arrays())
+        if self.has_toxic_zones and len(self.cell_x):
+            apply_zone_damage(self.cell_energy, self.toxic_raster.counts(self.cell_x, self.cell_y), cfg)
+        self.cell_age += 1
+
+        halo = self.halo
+        near_border = np.flatnonzero((self.food_x < self.left + halo) | (self.food_x >= self.right - halo)
+                                     | (self.food_y < self.top + halo) | (self.food_y >= self.bottom - halo))
+        rows = self.halo_rows[self.index]
+        rows[:len(near_border), 0] = self.food_x[near_border]
+        rows[:len(near_border), 1] = self.food_y[near_border]
+        rows[:len(near_border), 2] = self.food_type[near_border]
+        rows[:len(near_border), 3] = near_border
+        self.counts[self.index, HALO] = len(near_border)
+
+    # Phase 2: find food across borders, move, eat own food, claim neighbours' food
+    def seek_and_eat(self):
+        cfg = self.config
+        speed, sense_radius, energy_efficiency, size, lifespan = self._traits
+        own_food = len(self.food_x)
+
+        # Candidate food: our own, then the neighbours' halo rows within reach, in tile order
+        halo = self.halo
+        halo_parts = []
+        for neighbor in self.neighbors:
+            rows = self.halo_rows[neighbor, :self.counts[neighbor, HALO]]
+            reachable = ((rows[:, 0] >= self.left - halo) & (rows[:, 0] < self.right + halo)
+                         & (rows[:, 1] >= self.top - halo) & (rows[:, 1] < self.bottom + halo))
+            rows = rows[reachable]
+            halo_parts.append(np.column_stack((rows, np.full(len(rows), neighbor))))
+        halo_food = np.concatenate(halo_parts) if halo_parts else np.empty((0, HALO_COLUMNS + 1))
+        food_x = np.concatenate((self.food_x, halo_food[:, 0]))
+        food_y = np.concatenate((self.food_y, halo_food[:, 1]))
+        food_type = np.concatenate((self.food_type, halo_food[:, 2].astype(np.int64)))
+
+        targets = nearest_within(self.cell_x, self.cell_y, sense_radius, food_x, food_y, self.halo)
+        dx, dy = target_offsets(self.cell_x, self.cell_y, food_x, food_y, targets)
+        angle = self.rng.uniform(0, 2 * math.pi, len(self.cell_x))
+        self.cell_x, self.cell_y = move_cells(self.cell_x, self.cell_y, self.cell_energy, targets, dx, dy, angle,
+                                              speed, energy_efficiency, size, cfg, self.grid.width, self.grid.height)
+
+        # Eat: the first cell (in array order) to reach a food item gets it; neighbours' food is only claimed
+        eaters, eaten_food = first_eaters(self.cell_x, self.cell_y, food_x, food_y, targets, size)
+        own = eaten_food < own_food
+        feed_cells(self.cell_energy, eaters[own], self._food_type_energy[food_type[eaten_food[own]]], cfg)
+        self._food_eaten = np.zeros(own_food, dtype=bool)
+        self._food_eaten[eaten_food[own]] = True
+        claims = eaters[~own]
+        claimed = halo_food[eaten_food[~own] - own_food]
+        _check_capacity(len(claims), self.capacity, "food claims")
+        rows = self.claim_rows[self.index]
+        if len(claims):
+            rows[:len(claims), 0] = claimed[:, 4] # Owner tile
+            rows[:len(claims), 1] = claimed[:, 3] # Index in the owner's food arrays
+            rows[:len(claims), 2] = claims
+            rows[:len(claims), 3] = 0
+            self._claim_energy = self._food_type_energy[claimed[:, 2].astype(np.int64)]
+        self.counts[self.index, CLAIMS] = len(claims)
+
+    # Phase 3: grant neighbours' claims on our food (first claim in tile order wins)
+    def grant_claims(self):
+        claim_food = []
+        claim_refs = []
+        for neighbor in self.neighbors:
+            rows = self.claim_rows[neighbor, :self.counts[neighbor, CLAIMS]]
+            mine = np.flatnonzero(rows[:, 0] == self.index)
+            claim_food.append(rows[mine, 1].astype(np.int64))
+            claim_refs.append(np.column_stack((np.full(len(mine), neighbor), mine)))
+        if not claim_food:
+            return
+        claim_food = np.concatenate(claim_food)
+        claim_refs = np.concatenate(claim_refs)
+        available = ~self._food_eaten[claim_food]
+        claim_food, claim_refs = claim_food[available], claim_refs[available]
+        granted_food, first = np.unique(claim_food, return_index=True)
+        self._food_eaten[granted_food] = True
+        for neighbor, row in claim_refs[first].tolist():
+            self.claim_rows[neighbor, row, 3] = 1
+
+    # Phase 4: claimed energy, death, reproduction, food decay and spawning; publish migrants
+    def finish_tick(self):
+        cfg = self.config
+        lifespan, size = self._traits[4], self._traits[3]
+        claim_count = self.counts[self.index, CLAIMS]
+        if claim_count:
+            rows = self.claim_rows[self.index, :claim_count]
+            granted = rows[:, 3] == 1
+            feed_cells(self.cell_energy, rows[granted, 2].astype(np.int64), self._claim_energy[granted], cfg)
+
+        alive = surviving_cells(self.cell_energy, self.cell_age, lifespan)
+        self._compact_cells(alive)
+        size = size[alive]
+
+        mutation_count = 0
+        parents = select_parents(self.cell_energy, self.cell_age, self.cell_reproduction_timer, cfg)
+        if len(parents):
+            jitter_x = self.rng.uniform(-1, 1, len(parents))
+            jitter_y = self.rng.uniform(-1, 1, len(parents))
+            offspring_x, offspring_y = offspring_positions(self.cell_x, self.cell_y, parents, size, jitter_x, jitter_y,
+                                                           self.grid.width, self.grid.height)
+            mutation_count = self._roll_mutations(self.cell_clan[parents])
+            count = len(parents)
+            self.cell_x = np.concatenate((self.cell_x, offspring_x))
+            self.cell_y = np.concatenate((self.cell_y, offspring_y))
+            self.cell_energy = np.concatenate((self.cell_energy, self.cell_energy[parents]))
+            self.cell_age = np.concatenate((self.cell_age, np.zeros(count, dtype=np.int64)))
+            self.cell_reproduction_timer = np.concatenate((self.cell_reproduction_timer, np.zeros(count, dtype=np.int64)))
+            self.cell_clan = np.concatenate((self.cell_clan, self.cell_clan[parents]))
+        self.counts[self.index, MUTATIONS] = mutation_count
+
+        keep_food = age_food(self.food_age, self.food_type, self._food_eaten, self._food_type_lifespan)
+        self.food_x = self.food_x[keep_food]
+        self.food_y = self.food_y[keep_food]
+        self.food_age = self.food_age[keep_food]
+        self.food_type = self.food_type[keep_food]
+
+        # Food spawning, scaled to the tile's area and boosted while any of its cells is in a resource zone
+        food_spawn_multiplier = 1
+        if self.has_resource_zones and len(self.cell_x) and self.resource_raster.counts(self.cell_x, self.cell_y).any():
+            food_spawn_multiplier = cfg.RESOURCE_ZONE_FOOD_BOOST
+        room = min(round(cfg.FOOD_MAX_COUNT * self.area_scale), self.food_capacity) - len(self.food_x)
+        if room > 0:
+            self._spawn_food(min(room, self.rng.poisson(
+                cfg.FOOD_SPAWN_RATE_PER_FRAME * food_spawn_multiplier * self.area_scale)))
+
+        # Cells now outside the tile move to the neighbour that owns their position
+        owner = self.grid.tile_at(self.cell_x, self.cell_y)
+        leaving = owner != self.index
+        count = int(np.count_nonzero(leaving))
+        _check_capacity(count, self.capacity, "migrating cells")
+        rows = self.migrant_rows[self.index]
+        if count:
+            rows[:count, 0] = owner[leaving]
+            rows[:count, 1] = self.cell_x[leaving]
+            rows[:count, 2] = self.cell_y[leaving]
+            rows[:count, 3] = self.cell_energy[leaving]
+            rows[:count, 4] = self.cell_age[leaving]
+            rows[:count, 5] = self.cell_reproduction_timer[leaving]
+            rows[:count, 6] = self.cell_clan[leaving]
+            self._compact_cells(~leaving)
+        self.counts[self.index, MIGRANTS] = count
+
+    def _roll_mutations(self, parent_clans):
+        """Roll the births' mutations (as VectorEnvironment does) into the mutation buffer; returns the row count."""
+        birth, trait, amount = roll_mutations(self.rng, len(parent_clans), self.config)
+        _check_capacity(len(birth), self.capacity, "mutations")
+        rows = self.mutation_rows[self.index]
+        rows[:len(birth), 0] = parent_clans[birth]
+        rows[:len(birth), 1] = trait
+        rows[:len(birth), 2] = amount
+        return len(birth)
+
+    # Phase 5: apply every tile's mutations, take in migrants, publish stats
+    def exchange(self):
+        for tile in range(len(self.grid)):
+            for clan, trait, amount in self.mutation_rows[tile, :self.counts[tile, MUTATIONS]].tolist():
+                self.clans[int(clan)].apply_mutation(MUTATION_TRAITS[int(trait)][0], amount)
+
+        arrivals = [rows[rows[:, 0] == self.index] for rows in
+                    (self.migrant_rows[neighbor, :self.counts[neighbor, MIGRANTS]] for neighbor in self.neighbors)]
+        if arrivals:
+            rows = np.concatenate(arrivals)
+            self.cell_x = np.concatenate((self.cell_x, rows[:, 1]))
+            self.cell_y = np.concatenate((self.cell_y, rows[:, 2]))
+            self.cell_energy = np.concatenate((self.cell_energy, rows[:, 3]))
+            self.cell_age = np.concatenate((self.cell_age, rows[:, 4].astype(np.int64)))
+            self.cell_reproduction_timer = np.concatenate((self.cell_reproduction_timer, rows[:, 5].astype(np.int64)))
+            self.cell_clan = np.concatenate((self.cell_clan, rows[:, 6].astype(np.int64)))
+        self._publish_stats()
+
+    def _publish_stats(self):
+        row = self.stats[self.index]
+        row[0] = len(self.cell_x)
+        row[1] = len(self.food_x)
+        row[2:] = np.bincount(self.cell_clan, minlength=len(self.clans))
+
+    def _compact_cells(self, keep):
+        self.cell_x = self.cell_x[keep]
+        self.cell_y = self.cell_y[keep]
+        self.cell_energy = self.cell_energy[keep]
+        self.cell_age = self.cell_age[keep]
+        self.cell_reproduction_timer = self.cell_reproduction_timer[keep]
+        self.cell_clan = self.cell_clan[keep]
+
+    def snapshot(self):
+        return {
+            "cell_x": self.cell_x, "cell_y": self.cell_y, "cell_energy": self.cell_energy,
+            "cell_age": self.cell_age, "cell_clan": self.cell_clan,
+            "food_x": self.food_x, "food_y": self.food_y, "food_type": self.food_type,
+        }
+
+    def clan_traits(self):
+        return [clan.get_traits() for clan in self.clans]
+
+
+def _worker_main(spec, barrier, connection):
+    """Worker process: owns one tile and runs commands from the coordinating TiledWorld."""
+    tile = None
+    try:
+        tile = Tile(spec)
+        connection.send(("ok", None))
+        while True:
+            command, argument = connection.recv()
+            if command == "step":
+                for _ in range(argument):
+                    tile.run_tick(barrier.wait)
+                connection.send(("ok", None))
+            elif command == "call":
+                connection.send(("ok", getattr(tile, argument)()))
+            elif command == "stop":
+                break
+    except Exception:
+        barrier.abort() # Release the other workers instead of leaving them waiting forever
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        if tile is not None:
+            tile.close()
+
+
+class TiledWorld:
+    """
+    A width x height world split into columns x rows tiles, each stepped by its own
+    worker process (or, with processes=False, all in this process).
+    """
+
+    def __init__(self, width, height, columns, rows, cells, seed=None, config=None, processes=True,
+                 capacity=TILE_EXCHANGE_CAPACITY):
+        self.config = config if config is not None else DEFAULT_CONFIG
+        cfg = self.config
+        self.grid = TileGrid(width, height, columns, rows)
+        self.halo = cfg.CELL_SENSE_RADIUS_MAX # Farthest a cell can see, so the farthest food it can target
+        if width // columns < self.halo or height // rows < self.halo:
+            raise ValueError(f"Tiles must be at least {self.halo} pixels (the maximum sense radius) on each side")
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+        self.tick = 0
+        root = np.random.SeedSequence(self.seed)
+        tile_seeds = root.spawn(len(self.grid))
+        clan_seed, zone_seed = (int(value) for value in root.generate_state(2))
+
+        tile_count = len(self.grid)
+        food_capacity = max(1, math.ceil(max(cfg.FOOD_MAX_COUNT, cfg.INITIAL_FOOD_COUNT)
+                                         * (width * height / tile_count) / (SCREEN_WIDTH * SCREEN_HEIGHT)) + 1)
+        layouts = {
+            "halo": ((tile_count, food_capacity, HALO_COLUMNS), np.float64),
+            "claims": ((tile_count, capacity, CLAIM_COLUMNS), np.float64),
+            "migrants": ((tile_count, capacity, MIGRANT_COLUMNS), np.float64),
+            "mutations": ((tile_count, capacity, MUTATION_COLUMNS), np.float64),
+            "counts": ((tile_count, 4), np.int64),
+            "stats": ((tile_count, 2 + cfg.INITIAL_CLAN_COUNT), np.int64),
+        }
+        self._blocks = []
+        buffers = {}
+        for name, (shape, dtype) in layouts.items():
+            block, array = _create_shared(shape, dtype)
+            self._blocks.append(block)
+            buffers[name] = (block.name, shape, dtype)
+            if name == "stats":
+                self._stats = array
+
+        specs = [{
+            "index": tile, "grid": (width, height, columns, rows), "config": cfg, "halo": self.halo,
+            "capacity": capacity, "food_capacity": food_capacity, "seed_sequence": tile_seeds[tile],
+            "clan_seed": clan_seed, "zone_seed": zone_seed, "buffers": buffers,
+            "cells": cells // tile_count + (1 if tile < cells % tile_count else 0),
+        } for tile in range(tile_count)]
+
+        self.processes = processes
+        self._tiles = []
+        self._workers = []
+        self._connections = []
+        if processes:
+            context = get_context("spawn")
+            barrier = context.Barrier(tile_count)
+            for spec in specs:
+                parent_end, child_end = context.Pipe()
+                worker = context.Process(target=_worker_main, args=(spec, barrier, child_end),
+                                         name=f"tile-{spec['index']}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+                self._connections.append(parent_end)
+            self._collect()
+        else:
+            self._tiles = [Tile(spec) for spec in specs]
+
+    def _collect(self):
+        """Wait for one reply from every worker; raise if any of them failed."""
+        replies = [connection.recv() for connection in self._connections]
+        errors = [payload for status, payload in replies if status == "error"]
+        if errors:
+            # A failing worker aborts the barrier, so the others fail too; report the original error
+            original = next((error for error in errors if "BrokenBarrierError" not in error), errors[0])
+            self.close()
+            raise RuntimeError(f"Tile worker failed:\n{original}")
+        return [payload for _, payload in replies]
+
+    def _call(self, method):
+        if self.processes:
+            for connection in self._connections:
+                connection.send(("call", method))
+            return self._collect()
+        return [getattr(tile, method)() for tile in self._tiles]
+
+    def step(self, ticks=1):
+        """Advance the whole world by `ticks` ticks."""
+        if self.processes:
+            for connection in self._connections:
+                connection.send(("step", ticks))
+            self._collect()
+        else:
+            for _ in range(ticks):
+                for phase in PHASES:
+                    for tile in self._tiles:
+                        getattr(tile, phase)()
+        self.tick += ticks
+
+    def update(self):
+        self.step(1)
+
+    @property
+    def cell_count(self):
+        return int(self._stats[:, 0].sum())
+
+    @property
+    def food_count(self):
+        return int(self._stats[:, 1].sum())
+
+    def tile_cell_counts(self):
+        return self._stats[:, 0].copy()
+
+    def clan_counts(self):
+        """Living cells per clan over the whole world."""
+        return self._stats[:, 2:].sum(axis=0)
+
+    def clan_traits(self):
+        """Current traits of every clan (identical in all tiles)."""
+        return self._call("clan_traits")[0]
+
+    def snapshot(self):
+        """Arrays of every cell and food item in the world, concatenated in tile order."""
+        parts = self._call("snapshot")
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def close(self):
+        if self.processes:
+            for connection, worker in zip(self._connections, self._workers):
+                if worker.is_alive():
+                    try:
+                        connection.send(("stop", None))
+                    except (BrokenPipeError, OSError):
+                        pass
+            for worker in self._workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
+            self._workers = []
+            self._connections = []
+        for tile in self._tiles:
+            tile.close()
+        self._tiles = []
+        self._stats = self._stats.copy() # Keep the last stats readable after the memory is gone
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
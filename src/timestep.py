@@ -0,0 +1,77 @@
+"""
+Fixed-timestep accumulator that decouples simulation ticks from rendered frames.
+
+Every frame, the real time since the previous frame is converted into due
+ticks at TICK_RATE * speed and added to an accumulator; whole ticks are run
+and the fraction is carried over, so 0.5x runs one tick every other frame at
+60 FPS and 8x runs eight per frame. A speed of None runs ticks until the
+frame's step budget is used up ("as fast as possible").
+
+Ticks never run past the step budget: whatever is still due when it runs out
+is shed (counted, not carried over), so a slow simulation lowers the tick rate
+instead of the display rate and never builds up a backlog.
+"""
+from time import perf_counter
+
+from constants import MAX_FRAME_SECONDS, SIMULATION_SPEEDS, STEP_BUDGET_SECONDS, TICK_RATE
+
+
+def next_speed(speed, direction):
+    """One step up (1) or down (-1) SIMULATION_SPEEDS from `speed`; one step above the top is None (MAX)."""
+    if speed is None:
+        return SIMULATION_SPEEDS[-1] if direction < 0 else None
+    faster = [s for s in SIMULATION_SPEEDS if s > speed]
+    slower = [s for s in SIMULATION_SPEEDS if s < speed]
+    if direction > 0:
+        return faster[0] if faster else None
+    return slower[-1] if slower else speed
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, speed=1.0, budget=STEP_BUDGET_SECONDS, max_frame=MAX_FRAME_SECONDS,
+                 clock=perf_counter):
+        self.tick_rate = tick_rate
+        self.speed = speed # Multiplier of tick_rate, or None for as fast as the budget allows
+        self.budget = budget
+        self.max_frame = max_frame
+        self.clock = clock
+        self.accumulator = 0.0 # Ticks due but not run yet (always < 1 after a frame)
+        self.ticks_run = 0
+        self.ticks_shed = 0
+
+    def advance(self, elapsed, step):
+        """
+        Call step() once per tick due after `elapsed` real seconds, stopping when the
+        step budget is used up. At least one tick runs whenever one is due. Returns
+        the number of ticks run.
+        """
+        deadline = self.clock() + self.budget
+        if self.speed is None:
+            ticks = 0
+            while True:
+                step()
+                ticks += 1
+                if self.clock() >= deadline:
+                    break
+            self.ticks_run += ticks
+            return ticks
+
+        self.accumulator += min(elapsed, self.max_frame) * self.tick_rate * self.speed
+        due = int(self.accumulator)
+        ticks = 0
+        while ticks < due:
+            step()
+            ticks += 1
+            if ticks < due and self.clock() >= deadline:
+                break
+        self.accumulator -= ticks
+        if ticks < due: # Over budget: drop the backlog, keep the fraction
+            shed = int(self.accumulator)
+            self.accumulator -= shed
+            self.ticks_shed += shed
+        self.ticks_run += ticks
+        return ticks
+
+    def reset(self):
+        """Forget any partially accumulated tick (e.g. while paused)."""
+        self.accumulator = 0.0
@@ -0,0 +1,450 @@
+import math
+import random
+from time import perf_counter_ns
+
+import numpy as np
+import pygame
+
+from cell import get_cell_image
+from clan import TRAIT_NAMES, Clan
+from config import DEFAULT_CONFIG
+from constants import CLAN_COLORS, SCREEN_HEIGHT, SCREEN_WIDTH
+from environment import build_static_layer, create_zones
+from spatial import ZoneRaster
+from food import get_food_image
+from render import draw_sprite_layer, erase_rects
+
+# Number of cells whose food distances are evaluated at once, bounding the
+# size of the temporary cells x food distance matrix.
+FIND_FOOD_CHUNK_SIZE = 8192
+
+# Mutated traits and the scale of their mutation range, in the order Cell.reproduce rolls them
+MUTATION_TRAITS = (
+    ("speed", 1),
+    ("sense_radius", 1),
+    ("energy_efficiency", 1),
+    ("size", 5),
+    ("lifespan", 100),
+)
+
+
+# Per-cell rules shared by VectorEnvironment, BatchEnvironment and the tiles of a
+# TiledWorld. The engines differ only in how they index worlds and draw random
+# numbers, so those are passed in; arrays are updated in place where noted.
+
+def apply_zone_damage(cell_energy, zone_counts, config):
+    """Subtract toxic damage (in place) once per zone covering each cell."""
+    if len(zone_counts):
+        for layer in range(zone_counts.max()):
+            cell_energy -= config.TOXIC_ZONE_DAMAGE_PER_FRAME * (zone_counts > layer)
+
+
+def target_offsets(cell_x, cell_y, food_x, food_y, targets):
+    """(dx, dy) from each cell to its target food item; meaningless where the target is -1."""
+    if not len(food_x):
+        return np.zeros(len(cell_x)), np.zeros(len(cell_x))
+    target_index = np.where(targets >= 0, targets, 0)
+    return food_x[target_index] - cell_x, food_y[target_index] - cell_y
+
+
+def move_cells(cell_x, cell_y, cell_energy, targets, dx, dy, angle, speed, energy_efficiency, size, config,
+               width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    """
+    Step towards the target food, or wander at half speed along `angle` without
+    one, as Cell.move does, and charge movement and idle energy (in place).
+    Returns the new (cell_x, cell_y), clipped to a width x height world.
+    """
+    has_target = targets >= 0
+    dist = np.sqrt(dx * dx + dy * dy)
+    seeking = has_target & (dist > 0)
+    safe_dist = np.where(seeking, dist, 1.0)
+    seek_amount = np.minimum(speed, dist)
+    # Only cells without a target wander; one already on its target (distance 0) stays put
+    wander_amount = np.where(has_target, 0.0, speed / 2)
+    move_x = np.where(seeking, dx / safe_dist * seek_amount, np.cos(angle) * wander_amount)
+    move_y = np.where(seeking, dy / safe_dist * seek_amount, np.sin(angle) * wander_amount)
+    move_amount = np.where(seeking, seek_amount, wander_amount)
+
+    size_factor = size / config.CELL_SIZE_MIN
+    cell_energy -= config.CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE * move_amount * energy_efficiency * size_factor
+    cell_energy -= config.CELL_IDLE_ENERGY_DRAIN * size_factor
+    np.clip(cell_energy, 0, config.CELL_ENERGY_MAX, out=cell_energy)
+    return np.clip(cell_x + move_x, 0, width - size), np.clip(cell_y + move_y, 0, height - size)
+
+
+def first_eaters(cell_x, cell_y, food_x, food_y, targets, size):
+    """(eaters, eaten food) for cells that reached their target; the first cell in array order gets each item."""
+    dx, dy = target_offsets(cell_x, cell_y, food_x, food_y, targets)
+    eaters = np.flatnonzero((targets >= 0) & (np.sqrt(dx * dx + dy * dy) < size))
+    eaten_food, first = np.unique(targets[eaters], return_index=True)
+    return eaters[first], eaten_food
+
+
+def feed_cells(cell_energy, eaters, energy, config):
+    """Add food energy to the eaters (in place), capped at CELL_ENERGY_MAX."""
+    cell_energy[eaters] = np.minimum(cell_energy[eaters] + energy, config.CELL_ENERGY_MAX)
+
+
+def surviving_cells(cell_energy, cell_age, lifespan):
+    """Mask of the cells that neither starved nor died of old age."""
+    return (cell_energy > 0) & (cell_age < lifespan)
+
+
+def select_parents(cell_energy, cell_age, cell_reproduction_timer, config):
+    """
+    Advance the initial reproduction timers (in place) and return the indices of
+    the cells that reproduce this tick, with their energy already split in half.
+    """
+    waiting = cell_reproduction_timer < config.INITIAL_REPRODUCTION_TIME
+    cell_reproduction_timer[waiting] += 1
+    parents = np.flatnonzero(~waiting & (cell_energy >= config.CELL_REPRODUCTION_THRESHOLD)
+                             & (cell_age >= config.CELL_MIN_AGE_TO_REPRODUCE))
+    cell_energy[parents] /= 2
+    return parents
+
+
+def offspring_positions(cell_x, cell_y, parents, size, jitter_x, jitter_y, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    """Offspring (x, y) within one parent size of each parent, from uniform(-1, 1) jitter."""
+    parent_size = size[parents]
+    return (np.clip(cell_x[parents] + jitter_x * parent_size, 0, width - parent_size),
+            np.clip(cell_y[parents] + jitter_y * parent_size, 0, height - parent_size))
+
+
+def roll_mutations(rng, births, config):
+    """(birth, trait, amount) arrays of the mutations rolled for `births` births, in the order Cell.reproduce rolls them."""
+    trait_count = len(MUTATION_TRAITS)
+    rolls = rng.random((births, trait_count)) < config.CELL_MUTATION_RATE
+    scales = np.array([scale for _, scale in MUTATION_TRAITS], dtype=float)
+    amounts = rng.uniform(-config.CELL_MUTATION_AMOUNT, config.CELL_MUTATION_AMOUNT, (births, trait_count)) * scales
+    birth, trait = np.nonzero(rolls)
+    return birth, trait, amounts[birth, trait]
+
+
+def age_food(food_age, food_type, food_eaten, type_lifespan):
+    """Age every food item by one tick (in place) and return the mask of items neither eaten nor decayed."""
+    food_age += 1
+    return ~food_eaten & (food_age <= type_lifespan[food_type])
+
+
+class CellView:
+    """Read-only snapshot of one cell in a VectorEnvironment, shaped like a Cell for the UI."""
+    __slots__ = ("x", "y", "energy", "age", "clan", "speed", "sense_radius",
+                 "energy_efficiency", "size", "lifespan")
+
+    def __init__(self, x, y, energy, age, clan):
+        self.x = x
+        self.y = y
+        self.energy = energy
+        self.age = age
+        self.clan = clan
+        self.speed = clan.speed
+        self.sense_radius = clan.sense_radius
+        self.energy_efficiency = clan.energy_efficiency
+        self.size = clan.size
+        self.lifespan = clan.lifespan
+
+
+class FoodView:
+    """Read-only snapshot of one food item in a VectorEnvironment."""
+    __slots__ = ("x", "y", "size", "color", "energy_value", "lifespan", "age")
+
+    def __init__(self, x, y, food_type_data, age):
+        self.x = x
+        self.y = y
+        self.size = food_type_data["size"]
+        self.color = food_type_data["color"]
+        self.energy_value = food_type_data["energy_value"]
+        self.lifespan = food_type_data["lifespan"]
+        self.age = age
+
+
+class VectorEnvironment:
+    """
+    Struct-of-arrays simulation engine following the same rules as Environment.
+
+    Cells and food live in contiguous NumPy arrays and every phase of a tick
+    (zone damage, aging, food seeking, movement, eating, death, reproduction and
+    food decay) runs as one vectorized step over all entities. Cells within a
+    tick act simultaneously instead of one after another, so when several cells
+    reach the same food item the lowest-indexed cell eats it, matching the order
+    Environment.update would have visited them in.
+    """
+
+    def __init__(self, seed=None, config=None):
+        self.config = config if config is not None else DEFAULT_CONFIG
+        cfg = self.config
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+        self.rng = np.random.default_rng(self.seed)
+        # Clans and zones use the stdlib Random API, seeded from the same stream
+        self.py_rng = random.Random(int(self.rng.integers(2**63)))
+        self.clans = []
+        self.toxic_zones = []
+        self.resource_zones = []
+        self.toxic_raster = ZoneRaster([])
+        self.resource_raster = ZoneRaster([])
+        self.environment_timer = 0
+        self.tick = 0
+        self.static_layer = None # Background + zone outlines, built lazily by draw()
+        self.profiler = None # PhaseProfiler timing the update phases, only while profiling is on
+
+        # Cell arrays
+        self.cell_x = np.empty(0)
+        self.cell_y = np.empty(0)
+        self.cell_energy = np.empty(0)
+        self.cell_age = np.empty(0, dtype=np.int64)
+        self.cell_reproduction_timer = np.empty(0, dtype=np.int64)
+        self.cell_clan = np.empty(0, dtype=np.int64) # Index into self.clans
+
+        # Food arrays
+        self.food_x = np.empty(0)
+        self.food_y = np.empty(0)
+        self.food_age = np.empty(0, dtype=np.int64)
+        self.food_type = np.empty(0, dtype=np.int64) # Index into config.FOOD_TYPES
+
+        self._food_type_energy = np.array([t["energy_value"] for t in cfg.FOOD_TYPES], dtype=float)
+        self._food_type_lifespan = np.array([t["lifespan"] for t in cfg.FOOD_TYPES], dtype=np.int64)
+
+        self.initialize_clans()
+        self.initialize_population()
+        self.initialize_zones()
+
+    def initialize_clans(self):
+        for i in range(self.config.INITIAL_CLAN_COUNT):
+            self.clans.append(Clan(color=CLAN_COLORS[i % len(CLAN_COLORS)], config=self.config, rng=self.py_rng))
+
+    def initialize_population(self):
+        cfg = self.config
+        xs, ys, clan_indices = [], [], []
+        for clan_index in range(len(self.clans)):
+            center_x = self.rng.integers(0, SCREEN_WIDTH)
+            center_y = self.rng.integers(0, SCREEN_HEIGHT)
+            xs.append(np.clip(center_x + self.rng.uniform(-20, 20, cfg.CELLS_PER_CLAN), 0, SCREEN_WIDTH - 1))
+            ys.append(np.clip(center_y + self.rng.uniform(-20, 20, cfg.CELLS_PER_CLAN), 0, SCREEN_HEIGHT - 1))
+            clan_indices.append(np.full(cfg.CELLS_PER_CLAN, clan_index))
+        if xs:
+            count = cfg.CELLS_PER_CLAN * len(self.clans)
+            self.add_cells(np.concatenate(xs), np.concatenate(ys), np.concatenate(clan_indices),
+                           np.full(count, float(cfg.CELL_ENERGY_MAX)))
+
+        for _ in range(cfg.INITIAL_FOOD_COUNT):
+            self.spawn_food()
+
+    def initialize_zones(self):
+        self.set_zones(*create_zones(self.config, self.py_rng))
+
+    def set_zones(self, toxic_zones, resource_zones):
+        """Replace the zones and rebuild their coverage rasters, see Environment.set_zones."""
+        self.toxic_zones = toxic_zones
+        self.resource_zones = resource_zones
+        self.toxic_raster = ZoneRaster(toxic_zones)
+        self.resource_raster = ZoneRaster(resource_zones)
+        self.static_layer = None
+
+    def add_cells(self, xs, ys, clan_indices, energies):
+        """Append newborn cells (age 0, fresh reproduction timer) to the cell arrays."""
+        count = len(xs)
+        self.cell_x = np.concatenate((self.cell_x, xs))
+        self.cell_y = np.concatenate((self.cell_y, ys))
+        self.cell_energy = np.concatenate((self.cell_energy, energies))
+        self.cell_age = np.concatenate((self.cell_age, np.zeros(count, dtype=np.int64)))
+        self.cell_reproduction_timer = np.concatenate((self.cell_reproduction_timer, np.zeros(count, dtype=np.int64)))
+        self.cell_clan = np.concatenate((self.cell_clan, np.asarray(clan_indices, dtype=np.int64)))
+
+    def spawn_food(self, x=None, y=None):
+        """Spawn one food item of a random type, mirroring food.spawn_food_item."""
+        cfg = self.config
+        type_index = int(self.rng.integers(len(cfg.FOOD_TYPES)))
+        size = cfg.FOOD_TYPES[type_index]["size"]
+        if x is None:
+            x = self.rng.integers(0, SCREEN_WIDTH - size + 1)
+        if y is None:
+            y = self.rng.integers(0, SCREEN_HEIGHT - size + 1)
+        self.food_x = np.append(self.food_x, float(x))
+        self.food_y = np.append(self.food_y, float(y))
+        self.food_age = np.append(self.food_age, 0)
+        self.food_type = np.append(self.food_type, type_index)
+
+    def add_food(self, food_item):
+        """Add a Food object (e.g. spawned by the user) to the food arrays."""
+        type_index = next((i for i, t in enumerate(self.config.FOOD_TYPES)
+                           if t["size"] == food_item.size and t["color"] == food_item.color), 0)
+        self.food_x = np.append(self.food_x, float(food_item.x))
+        self.food_y = np.append(self.food_y, float(food_item.y))
+        self.food_age = np.append(self.food_age, food_item.age)
+        self.food_type = np.append(self.food_type, type_index)
+
+    @property
+    def cell_count(self):
+        return len(self.cell_x)
+
+    @property
+    def food_count(self):
+        return len(self.food_x)
+
+    @property
+    def cells(self):
+        """Snapshot of all cells as CellView objects (O(cells); meant for UI, not the hot loop)."""
+        clans = self.clans
+        return [CellView(x, y, energy, age, clans[clan_index]) for x, y, energy, age, clan_index in
+                zip(self.cell_x.tolist(), self.cell_y.tolist(), self.cell_energy.tolist(),
+                    self.cell_age.tolist(), self.cell_clan.tolist())]
+
+    @property
+    def food(self):
+        """Snapshot of all food as FoodView objects."""
+        food_types = self.config.FOOD_TYPES
+        return [FoodView(x, y, food_types[type_index], age) for x, y, type_index, age in
+                zip(self.food_x.tolist(), self.food_y.tolist(), self.food_type.tolist(), self.food_age.tolist())]
+
+    def clan_summaries(self):
+        """(clan, living cell count, mean traits) per clan. Every cell uses its clan's traits directly."""
+        counts = np.bincount(self.cell_clan, minlength=len(self.clans)).tolist()
+        return [(clan, count, clan.get_traits() if count else {name: 0 for name in TRAIT_NAMES})
+                for clan, count in zip(self.clans, counts)]
+
+    def trait_means(self):
+        """Mean trait values over all living cells (all 0 when extinct)."""
+        summaries = self.clan_summaries()
+        total = sum(count for _, count, _ in summaries)
+        if total == 0:
+            return {name: 0 for name in TRAIT_NAMES}
+        return {name: sum(count * means[name] for _, count, means in summaries) / total for name in TRAIT_NAMES}
+
+    def _clan_trait_arrays(self):
+        speed = np.array([clan.speed for clan in self.clans], dtype=float)
+        sense_radius = np.array([clan.sense_radius for clan in self.clans], dtype=float)
+        energy_efficiency = np.array([clan.energy_efficiency for clan in self.clans], dtype=float)
+        size = np.array([clan.size for clan in self.clans], dtype=float)
+        lifespan = np.array([clan.lifespan for clan in self.clans], dtype=float)
+        return speed, sense_radius, energy_efficiency, size, lifespan
+
+    def _find_food(self, sense_radius):
+        """Index of the closest food strictly inside each cell's sense radius, or -1."""
+        cell_count = self.cell_count
+        targets = np.full(cell_count, -1, dtype=np.int64)
+        if cell_count == 0 or self.food_count == 0:
+            return targets
+        for start in range(0, cell_count, FIND_FOOD_CHUNK_SIZE):
+            stop = min(start + FIND_FOOD_CHUNK_SIZE, cell_count)
+            dx = self.cell_x[start:stop, None] - self.food_x[None, :]
+            dy = self.cell_y[start:stop, None] - self.food_y[None, :]
+            dist = np.sqrt(dx * dx + dy * dy)
+            dist[dist >= sense_radius[start:stop, None]] = np.inf
+            closest = np.argmin(dist, axis=1)
+            found = np.isfinite(dist[np.arange(stop - start), closest])
+            targets[start:stop] = np.where(found, closest, -1)
+        return targets
+
+    def update(self):
+        cfg = self.config
+        profiler = self.profiler
+        if profiler is not None:
+            phase_start = perf_counter_ns()
+        self.tick += 1
+        self.environment_timer += 1
+        if self.environment_timer >= cfg.ENVIRONMENT_CHANGE_INTERVAL:
+            self.initialize_zones()
+            self.environment_timer = 0
+
+        rng = self.rng
+        cell_count = self.cell_count
+        speed, sense_radius, energy_efficiency, size, lifespan = (
+            trait[self.cell_clan] for trait in self._clan_trait_arrays())
+
+        # Toxic zone damage: one raster lookup per cell, then one subtraction per covering zone
+        if self.toxic_zones and cell_count:
+            apply_zone_damage(self.cell_energy, self.toxic_raster.counts(self.cell_x, self.cell_y), cfg)
+        if profiler is not None:
+            phase_start = profiler.lap("zones", phase_start)
+
+        self.cell_age += 1
+
+        # Seek food, then move towards it (or wander randomly if none is in range)
+        targets = self._find_food(sense_radius)
+        dx, dy = target_offsets(self.cell_x, self.cell_y, self.food_x, self.food_y, targets)
+        angle = rng.uniform(0, 2 * math.pi, cell_count)
+        self.cell_x, self.cell_y = move_cells(self.cell_x, self.cell_y, self.cell_energy, targets, dx, dy, angle,
+                                              speed, energy_efficiency, size, cfg)
+
+        # Eat: the first cell (in array order) to reach a food item gets it
+        eaters, eaten_food = first_eaters(self.cell_x, self.cell_y, self.food_x, self.food_y, targets, size)
+        feed_cells(self.cell_energy, eaters, self._food_type_energy[self.food_type[eaten_food]], cfg)
+        food_eaten = np.zeros(self.food_count, dtype=bool)
+        food_eaten[eaten_food] = True
+
+        # Death by starvation or old age
+        alive = surviving_cells(self.cell_energy, self.cell_age, lifespan)
+        self._compact_cells(alive)
+        size = size[alive]
+
+        # Reproduction
+        parents = select_parents(self.cell_energy, self.cell_age, self.cell_reproduction_timer, cfg)
+        if len(parents):
+            jitter_x = rng.uniform(-1, 1, len(parents))
+            jitter_y = rng.uniform(-1, 1, len(parents))
+            offspring_x, offspring_y = offspring_positions(self.cell_x, self.cell_y, parents, size, jitter_x, jitter_y)
+            self._mutate_clans(self.cell_clan[parents])
+            self.add_cells(offspring_x, offspring_y, self.cell_clan[parents], self.cell_energy[parents])
+        if profiler is not None:
+            phase_start = profiler.lap("cells", phase_start)
+
+        # Food decay (eaten food is removed at the same time)
+        keep_food = age_food(self.food_age, self.food_type, food_eaten, self._food_type_lifespan)
+        self.food_x = self.food_x[keep_food]
+        self.food_y = self.food_y[keep_food]
+        self.food_age = self.food_age[keep_food]
+        self.food_type = self.food_type[keep_food]
+        if profiler is not None:
+            phase_start = profiler.lap("food", phase_start)
+
+        # Dynamic food spawning, boosted while any cell sits in a resource zone
+        food_spawn_multiplier = 1
+        if self.resource_zones and self.cell_count and self.resource_raster.counts(self.cell_x, self.cell_y).any():
+            food_spawn_multiplier = cfg.RESOURCE_ZONE_FOOD_BOOST
+        if self.food_count < cfg.FOOD_MAX_COUNT and rng.random() < cfg.FOOD_SPAWN_RATE_PER_FRAME * food_spawn_multiplier:
+            self.spawn_food()
+        if profiler is not None:
+            profiler.lap("spawn", phase_start)
+
+    def _compact_cells(self, keep):
+        self.cell_x = self.cell_x[keep]
+        self.cell_y = self.cell_y[keep]
+        self.cell_energy = self.cell_energy[keep]
+        self.cell_age = self.cell_age[keep]
+        self.cell_reproduction_timer = self.cell_reproduction_timer[keep]
+        self.cell_clan = self.cell_clan[keep]
+
+    def _mutate_clans(self, parent_clans):
+        """Roll Cell.reproduce's per-trait mutations for every birth and apply them in birth order."""
+        for birth, trait, amount in zip(*roll_mutations(self.rng, len(parent_clans), self.config)):
+            self.clans[parent_clans[birth]].apply_mutation(MUTATION_TRAITS[trait][0], float(amount))
+
+    def draw(self, screen):
+        """Draw the full simulation area. Returns the rects covered by food and cell sprites."""
+        if self.static_layer is None:
+            self.static_layer = build_static_layer(self.toxic_zones, self.resource_zones)
+        screen.blit(self.static_layer, (0, 0))
+        return self._draw_entities(screen)
+
+    def draw_dirty(self, screen, previous_rects):
+        """Dirty-rectangle redraw, see Environment.draw_dirty."""
+        if self.static_layer is None:
+            return self.draw(screen), [pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)]
+        erase_rects(screen, self.static_layer, previous_rects)
+        sprite_rects = self._draw_entities(screen)
+        return sprite_rects, previous_rects + sprite_rects
+
+    def _draw_entities(self, screen):
+        """Draw food, then cells on top, with one batched blit per layer."""
+        # Sprites depend only on the food type or clan, so look them up once per type/clan
+        food_sprites = [(get_food_image(food_type["size"], food_type["color"]), food_type["color"], food_type["size"])
+                        for food_type in self.config.FOOD_TYPES]
+        rects = draw_sprite_layer(screen, ((food_sprites[type_index][0], x, y) + food_sprites[type_index][1:]
+                                           for x, y, type_index in zip(self.food_x.tolist(), self.food_y.tolist(),
+                                                                       self.food_type.tolist())))
+
+        clan_sprites = [(get_cell_image(clan.size, clan), clan.color, clan.size) for clan in self.clans]
+        rects.extend(draw_sprite_layer(screen, ((clan_sprites[clan_index][0], x, y) + clan_sprites[clan_index][1:]
+                                                for x, y, clan_index in zip(self.cell_x.tolist(), self.cell_y.tolist(),
+                                                                            self.cell_clan.tolist()))))
+        return rects
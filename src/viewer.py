@@ -0,0 +1,161 @@
+"""
+Live viewer for a simulation running in another process.
+
+Attaches to the shared-memory frame buffer a run publishes into (see
+live_view.py), draws the latest frame at its own frame rate with the same
+sprites, zone layer and stats panel as the simulation window, and detaches on
+quit. The simulation never waits for the viewer; closing the viewer, or
+starting it in the middle of a run, does not affect the run.
+
+Usage:
+    python headless.py --ticks 10000000 --publish   # in one terminal
+    python viewer.py                                 # in another; close and reopen at will
+    python viewer.py --name my_run --fps 60
+"""
+import argparse
+import time
+
+import pygame
+
+from cell import get_cell_image, load_cell_image
+from clan import TRAIT_NAMES
+from constants import (
+    FONT_SIZE,
+    LIGHT_BLUE,
+    LIVE_VIEW_FPS,
+    LIVE_VIEW_NAME,
+    PURPLE,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    UI_PANEL_HEIGHT,
+)
+from environment import Zone, build_static_layer, load_background_image
+from food import get_food_image, load_food_image
+from live_view import LiveFrameBuffer
+from render import draw_sprite_layer
+from simulation import draw_ui_panel
+
+WAIT_SECONDS = 0.5 # Between attempts to attach while no run is publishing
+
+
+class ClanView:
+    """The clan fields the sprite cache keys on, rebuilt from a published frame."""
+    __slots__ = ("id", "color")
+
+    def __init__(self, clan_id, color):
+        self.id = clan_id
+        self.color = color
+
+
+class LiveViewer:
+    def __init__(self, name=LIVE_VIEW_NAME, fps=LIVE_VIEW_FPS):
+        self.name = name
+        self.fps = fps
+        self.buffer = None
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT + UI_PANEL_HEIGHT))
+        pygame.display.set_caption(f"MicroLife Live Viewer - {name}")
+        load_cell_image()
+        load_food_image()
+        load_background_image()
+        self.font = pygame.font.Font(None, FONT_SIZE)
+        self.clock = pygame.time.Clock()
+        self.static_layer = None
+        self._zones = None # Zone rows the static layer was built from
+        self._previous = None # (tick, time) of the last new frame, for the tick rate
+        self.ticks_per_second = 0.0
+
+    def attach(self):
+        """Attach to the run's buffer if it exists; returns True once attached."""
+        if self.buffer is None:
+            try:
+                self.buffer = LiveFrameBuffer.attach(self.name)
+            except (FileNotFoundError, ValueError): # No run yet, or one still setting up its buffer
+                return False
+        return True
+
+    def detach(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    def run(self):
+        running = True
+        frame = None
+        next_attach = 0.0
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+
+            if self.buffer is None and time.monotonic() >= next_attach:
+                next_attach = time.monotonic() + WAIT_SECONDS
+                self.attach()
+            if self.buffer is not None:
+                self.buffer.heartbeat() # Keeps the run publishing
+                latest = self.buffer.read()
+                if latest is not None:
+                    self._update_rate(latest)
+                    frame = latest
+                if self.buffer.closed:
+                    self.detach() # Keep showing the last frame; attach again if a new run starts
+
+            if frame is None:
+                self.draw_waiting()
+            else:
+                self.draw_frame(frame)
+            pygame.display.flip()
+            self.clock.tick(self.fps)
+        self.detach()
+
+    def _update_rate(self, frame):
+        if self._previous is not None and frame.tick != self._previous[0] and frame.time > self._previous[1]:
+            rate = (frame.tick - self._previous[0]) / (frame.time - self._previous[1])
+            self.ticks_per_second = rate if not self.ticks_per_second else 0.8 * self.ticks_per_second + 0.2 * rate
+        if self._previous is None or frame.tick != self._previous[0]:
+            self._previous = (frame.tick, frame.time)
+
+    def draw_waiting(self):
+        self.screen.fill((0, 0, 0))
+        text = self.font.render(f"Waiting for a run publishing to '{self.name}'...", True, (200, 200, 200))
+        self.screen.blit(text, ((SCREEN_WIDTH - text.get_width()) // 2, SCREEN_HEIGHT // 2))
+
+    def draw_frame(self, frame):
+        if self._zones is None or not (len(self._zones) == len(frame.zones) and (self._zones == frame.zones).all()):
+            toxic = [Zone(x, y, radius, PURPLE, "toxic") for x, y, radius, kind in frame.zones.tolist() if not kind]
+            resource = [Zone(x, y, radius, LIGHT_BLUE, "resource") for x, y, radius, kind in frame.zones.tolist() if kind]
+            self.static_layer = build_static_layer(toxic, resource)
+            self._zones = frame.zones
+        self.screen.blit(self.static_layer, (0, 0))
+
+        draw_sprite_layer(self.screen, ((get_food_image(int(size), (int(r), int(g), int(b))), x, y,
+                                         (int(r), int(g), int(b)), size)
+                                        for x, y, size, r, g, b in frame.food.tolist()))
+        clans = [ClanView(int(row[0]), (int(row[2]), int(row[3]), int(row[4]))) for row in frame.clans.tolist()]
+        draw_sprite_layer(self.screen, ((get_cell_image(size, clans[int(row)]), x, y, clans[int(row)].color, size)
+                                        for x, y, size, row in frame.cells.tolist()))
+
+        clan_rows = [(clan.id, int(row[1]), clan.color, dict(zip(TRAIT_NAMES, row[5:])))
+                     for clan, row in zip(clans, frame.clans.tolist())]
+        draw_ui_panel(self.screen, self.font, frame.cell_count, frame.food_count, self.status_text(frame),
+                      tuple(frame.averages), clan_rows, reset_button=False)
+
+    def status_text(self, frame):
+        state = "ENDED" if self.buffer is None else "LIVE"
+        return f"{state} tick {frame.tick} | {self.ticks_per_second:,.0f} ticks/s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a MicroLife run published with --publish.")
+    parser.add_argument("--name", default=LIVE_VIEW_NAME, help="shared-memory name the run publishes to")
+    parser.add_argument("--fps", type=int, default=LIVE_VIEW_FPS, help="viewer frame rate")
+    args = parser.parse_args(argv)
+    pygame.init()
+    viewer = LiveViewer(args.name, args.fps)
+    try:
+        viewer.run()
+    finally:
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from batch_engine import BatchEnvironment
+from clan import TRAIT_NAMES
+from config import SimulationConfig
+from environment import Environment
+from vector_engine import VectorEnvironment
+
+
+class TestBatchEnvironment(unittest.TestCase):
+    def step_both(self, seeds, ticks, config=None):
+        batch = BatchEnvironment(seeds, config=config)
+        singles = [VectorEnvironment(seed=seed, config=config) for seed in seeds]
+        for _ in range(ticks):
+            batch.update()
+            for environment in singles:
+                environment.update()
+        return batch, singles
+
+    def assert_worlds_match(self, batch, singles):
+        for world, environment in enumerate(singles):
+            for name, values in batch.world_state(world).items():
+                np.testing.assert_array_equal(values, getattr(environment, name),
+                                              err_msg=f"world {world}: {name} differs")
+            self.assertEqual([clan.get_traits() for clan in batch.clans[world]],
+                             [clan.get_traits() for clan in environment.clans])
+
+    def test_worlds_match_individual_environments(self):
+        """Test that every batched world ends in the same state as a VectorEnvironment with its seed."""
+        batch, singles = self.step_both([0, 1, 2, 7, 42], 400)
+        self.assertEqual(batch.tick, 400)
+        self.assert_worlds_match(batch, singles)
+
+    def test_worlds_match_across_zone_changes(self):
+        """Test that worlds still match when zones are re-rolled and the population grows."""
+        config = SimulationConfig(ENVIRONMENT_CHANGE_INTERVAL=40, TOXIC_ZONE_COUNT=4, CELLS_PER_CLAN=10)
+        batch, singles = self.step_both([3, 4, 5], 300, config)
+        self.assert_worlds_match(batch, singles)
+
+    def test_per_world_counts_and_summaries(self):
+        """Test that per-world counts and clan summaries match the individual environments."""
+        batch, singles = self.step_both([10, 11], 100)
+        self.assertEqual(batch.cell_counts().tolist(), [environment.cell_count for environment in singles])
+        self.assertEqual(batch.food_counts().tolist(), [environment.food_count for environment in singles])
+        self.assertEqual(batch.cell_count, sum(environment.cell_count for environment in singles))
+        for world, environment in enumerate(singles):
+            self.assertEqual([count for _, count, _ in batch.clan_summaries(world)],
+                             [count for _, count, _ in environment.clan_summaries()])
+            self.assertEqual(batch.trait_means(world), environment.trait_means())
+
+    def test_worlds_without_cells(self):
+        """Test that worlds without any cells keep drawing food from their own streams like VectorEnvironment."""
+        config = SimulationConfig(CELLS_PER_CLAN=0)
+        batch, singles = self.step_both([1, 2], 50, config)
+        self.assertEqual(batch.cell_count, 0)
+        self.assert_worlds_match(batch, singles)
+
+
+
+class TestBatchEnvironmentStatistics(unittest.TestCase):
+    SEEDS = range(24)
+    TICKS = 600
+
+    def assert_means_agree(self, reference, batched, name):
+        """The ensemble means differ by less than three standard errors."""
+        standard_error = np.sqrt(np.var(reference, ddof=1) / len(reference) + np.var(batched, ddof=1) / len(batched))
+        self.assertLess(abs(np.mean(batched) - np.mean(reference)), 3 * standard_error, name)
+
+    def test_ensemble_matches_reference_environments(self):
+        """Test that mean population and trait means over many worlds agree with individually stepped Environments."""
+        # Environment updates its cells one after another and the array engines update them all at once,
+        # so single worlds diverge; their ensembles should still agree
+        reference_population, reference_traits = [], []
+        for seed in self.SEEDS:
+            environment = Environment(seed=seed)
+            counts = []
+            for _ in range(self.TICKS):
+                environment.update()
+                counts.append(environment.cell_count)
+            reference_population.append(np.mean(counts))
+            reference_traits.append(environment.trait_means())
+
+        batch = BatchEnvironment(self.SEEDS)
+        counts = []
+        for _ in range(self.TICKS):
+            batch.update()
+            counts.append(batch.cell_counts())
+        batch_traits = [batch.trait_means(world) for world in range(batch.world_count)]
+
+        self.assert_means_agree(reference_population, np.mean(counts, axis=0), "population")
+        for name in TRAIT_NAMES:
+            self.assert_means_agree([traits[name] for traits in reference_traits if traits[name]], # Skip extinct worlds
+                                    [traits[name] for traits in batch_traits if traits[name]], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+
+# Add the src and benchmarks directories to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from bench_suite import bench_update, compare_results, steps_for
+
+
+def suite(**cases):
+    return {"results": cases}
+
+
+class TestBenchSuite(unittest.TestCase):
+    def test_slower_run_is_flagged(self):
+        """Test that a drop in throughput or rise in cost beyond the threshold is a regression."""
+        baseline = suite(case={"ticks_per_sec": 100.0, "ns_per_cell_tick": 1000.0, "peak_rss_kb": 50000})
+        current = suite(case={"ticks_per_sec": 80.0, "ns_per_cell_tick": 1250.0, "peak_rss_kb": 51000})
+        rows, regressions = compare_results(baseline, current, threshold=0.10)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row[1] for row in regressions}, {"ticks_per_sec", "ns_per_cell_tick"})
+        change = {row[1]: row[4] for row in rows}
+        self.assertAlmostEqual(change["ticks_per_sec"], 0.2)
+        self.assertAlmostEqual(change["ns_per_cell_tick"], 0.25)
+
+    def test_faster_run_and_missing_cases_pass(self):
+        """Test that improvements are not flagged and cases absent from either run are skipped."""
+        baseline = suite(a={"ticks_per_sec": 100.0}, b={"ticks_per_sec": 100.0})
+        current = suite(a={"ticks_per_sec": 150.0}, c={"ticks_per_sec": 1.0})
+        rows, regressions = compare_results(baseline, current, threshold=0.10)
+        self.assertEqual([row[0] for row in rows], ["a"])
+        self.assertEqual(regressions, [])
+
+    def test_separate_rss_threshold(self):
+        """Test that peak RSS uses its own threshold when given."""
+        baseline = suite(case={"peak_rss_kb": 1000})
+        current = suite(case={"peak_rss_kb": 1150})
+        self.assertEqual(len(compare_results(baseline, current, 0.10)[1]), 1)
+        self.assertEqual(compare_results(baseline, current, 0.10, rss_threshold=0.20)[1], [])
+
+    def test_steps_scale_with_population(self):
+        """Test that small populations get more measured ticks, within the limits."""
+        self.assertGreater(steps_for(10, 200_000), steps_for(10000, 200_000))
+        self.assertEqual(steps_for(50000, 1000), 10)
+
+    def test_update_case_reports_metrics(self):
+        """Test that an update case reports its rate, per-cell cost and counts."""
+        result = bench_update(10, 80, seed=1, vectorized=False, budget=100)
+        self.assertEqual(result["ticks"], 10)
+        self.assertGreater(result["ticks_per_sec"], 0)
+        self.assertGreater(result["ns_per_cell_tick"], 0)
+        self.assertGreater(result["cell_ticks"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from cell import Cell
 from clan import Clan
 from constants import CELL_ENERGY_MAX, CELL_REPRODUCTION_THRESHOLD, CELL_MIN_AGE_TO_REPRODUCE, INITIAL_REPRODUCTION_TIME
+from constants import FOOD_TYPES
+from food import Food
 
 
 class TestCellReproduction(unittest.TestCase):
@@ -107,5 +109,12 @@ class TestCellReproduction(unittest.TestCase):
                         "Offspring should inherit parent's clan")
 
 
+class TestEntityLayout(unittest.TestCase):
+    def test_cell_and_food_use_slots(self):
+        """Test that Cell and Food have no per-instance __dict__."""
+        self.assertFalse(hasattr(Cell(0, 0, Clan()), "__dict__"))
+        self.assertFalse(hasattr(Food(0, 0, FOOD_TYPES[0]), "__dict__"))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import tempfile
+import unittest
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from checkpoint import CheckpointError, dumps, load_checkpoint, loads, save_checkpoint
+from config import SimulationConfig
+from environment import Environment
+from vector_engine import VectorEnvironment
+
+
+def snapshot(env):
+    """Comparable snapshot of the evolving state of an environment."""
+    return (
+        env.tick,
+        env.environment_timer,
+        [(cell.x, cell.y, cell.energy, cell.age, cell.reproduction_timer, cell.clan.id) for cell in env.cells],
+        [(food.x, food.y, food.age, food.energy_value, food.size, food.color) for food in env.food],
+        [(zone.x, zone.y, zone.radius) for zone in env.toxic_zones + env.resource_zones],
+        [(clan.id, clan.color, clan.get_traits()) for clan in env.clans],
+    )
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.env = Environment(seed=11)
+        for _ in range(400):
+            self.env.update()
+
+    def test_round_trip_preserves_state(self):
+        """Test that loading a checkpoint restores the exact environment state."""
+        restored = loads(dumps(self.env))
+        self.assertEqual(snapshot(restored), snapshot(self.env))
+        self.assertEqual(restored.rng.getstate(), self.env.rng.getstate())
+
+    def test_resumed_run_matches_uninterrupted_run(self):
+        """Test that a run resumed from a checkpoint continues bit-identically."""
+        restored = loads(dumps(self.env))
+        for _ in range(600):  # Crosses an environment change interval
+            self.env.update()
+            restored.update()
+        self.assertEqual(snapshot(restored), snapshot(self.env))
+
+    def test_config_overrides_are_preserved(self):
+        """Test that a run's config overrides survive a checkpoint."""
+        env = Environment(config=SimulationConfig(CELL_MUTATION_RATE=0.3), seed=3)
+        self.assertEqual(loads(dumps(env)).config.CELL_MUTATION_RATE, 0.3)
+
+    def test_negative_seed(self):
+        """Test that a run with a negative seed can be checkpointed and keeps its seed."""
+        env = Environment(seed=-5)
+        env.update()
+        restored = loads(dumps(env))
+        self.assertEqual(restored.seed, -5)
+        self.assertEqual(snapshot(restored), snapshot(env))
+
+    def test_seed_out_of_range_is_rejected(self):
+        """Test that a seed too large for the header raises ValueError instead of struct.error."""
+        with self.assertRaises(ValueError):
+            dumps(Environment(seed=2**64))
+
+    def test_save_and_load_file(self):
+        """Test writing a checkpoint to disk and loading it back."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.ckpt")
+            save_checkpoint(self.env, path)
+            self.assertFalse(os.path.exists(path + ".tmp"), "Temporary file should be renamed into place")
+            self.assertEqual(snapshot(load_checkpoint(path)), snapshot(self.env))
+
+    def test_invalid_data_is_rejected(self):
+        """Test that data that is not a checkpoint raises CheckpointError."""
+        with self.assertRaises(CheckpointError):
+            loads(b"NOPE" + bytes(32))
+
+    def test_vectorized_environment_is_rejected(self):
+        """Test that checkpointing the NumPy engine fails loudly."""
+        with self.assertRaises(TypeError):
+            dumps(VectorEnvironment(seed=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
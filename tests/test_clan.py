@@ -10,12 +10,14 @@ import unittest
 # Add the src directory to the path so we can import our modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from cell import Cell
 from clan import Clan
 from constants import (
     CELL_SPEED_MIN, CELL_SPEED_MAX, CELL_SENSE_RADIUS_MIN, CELL_SENSE_RADIUS_MAX,
     CELL_ENERGY_EFFICIENCY_MIN, CELL_ENERGY_EFFICIENCY_MAX, CELL_SIZE_MIN, CELL_SIZE_MAX,
     CELL_MAX_LIFESPAN
 )
+from environment import Environment
 
 
 class TestClanMutation(unittest.TestCase):
@@ -137,5 +139,31 @@ class TestClanMutation(unittest.TestCase):
                         "Valid traits should remain unchanged when invalid trait is mutated")
 
 
+class TestClanAggregates(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.clan = Clan()
+
+    def test_removing_an_uncounted_cell_is_a_no_op(self):
+        """Test that removing a cell twice, or one never added, leaves the aggregates alone."""
+        kept = Cell(10, 10, self.clan)
+        removed = Cell(20, 20, self.clan)
+        self.clan.add_member(kept)
+        self.clan.add_member(removed)
+        self.clan.remove_member(removed)
+        sums = list(self.clan.trait_sums)
+        self.clan.remove_member(removed)
+        self.clan.remove_member(Cell(30, 30, self.clan))
+        self.assertEqual(self.clan.member_count, 1)
+        self.assertEqual(self.clan.trait_sums, sums)
+
+    def test_clear_cells_empties_the_aggregates(self):
+        """Test that Environment.clear_cells takes every cell out of its clan."""
+        env = Environment(seed=2)
+        env.clear_cells()
+        self.assertEqual(len(env.cells), 0)
+        self.assertEqual([clan.member_count for clan in env.clans], [0] * len(env.clans))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import constants
+from cell import Cell
+from clan import Clan
+from config import SimulationConfig
+from environment import Environment
+from vector_engine import VectorEnvironment
+
+
+class TestSimulationConfig(unittest.TestCase):
+    def test_defaults_match_constants(self):
+        """Test that an empty config uses the values from constants.py."""
+        config = SimulationConfig()
+        self.assertEqual(config.CELL_MUTATION_RATE, constants.CELL_MUTATION_RATE)
+        self.assertEqual(config.FOOD_TYPES, constants.FOOD_TYPES)
+        self.assertEqual(config.overrides(), {})
+
+    def test_overrides_are_applied(self):
+        """Test that keyword overrides replace the defaults."""
+        config = SimulationConfig(CELL_MUTATION_RATE=0.5, FOOD_MAX_COUNT=10)
+        self.assertEqual(config.CELL_MUTATION_RATE, 0.5)
+        self.assertEqual(config.overrides(), {"CELL_MUTATION_RATE": 0.5, "FOOD_MAX_COUNT": 10})
+
+    def test_unknown_parameter_is_rejected(self):
+        """Test that misspelled parameters raise instead of being silently ignored."""
+        with self.assertRaises(ValueError):
+            SimulationConfig(CELL_MUTATON_RATE=0.5)
+
+
+class TestConfigInjection(unittest.TestCase):
+    def test_environment_uses_injected_config(self):
+        """Test that an environment builds its population from its own config."""
+        config = SimulationConfig(INITIAL_CLAN_COUNT=2, CELLS_PER_CLAN=5, INITIAL_FOOD_COUNT=7)
+        env = Environment(config=config)
+        self.assertEqual(len(env.clans), 2)
+        self.assertEqual(len(env.cells), 10)
+        self.assertEqual(len(env.food), 7)
+
+        vector_env = VectorEnvironment(seed=0, config=config)
+        self.assertEqual(vector_env.cell_count, 10)
+        self.assertEqual(vector_env.food_count, 7)
+
+    def test_cells_follow_clan_config(self):
+        """Test that cells read reproduction rules from their clan's config."""
+        config = SimulationConfig(INITIAL_REPRODUCTION_TIME=0, CELL_REPRODUCTION_THRESHOLD=10,
+                                  CELL_MIN_AGE_TO_REPRODUCE=0, CELL_ENERGY_MAX=20)
+        cell = Cell(100, 100, Clan(config=config))
+        self.assertEqual(cell.energy, 20, "Cells should start with the configured maximum energy")
+        self.assertIsNotNone(cell.reproduce(), "Cell should reproduce under the configured thresholds")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from entity_store import EntityStore
+
+
+class Item:
+    def __init__(self, name):
+        self.name = name
+        self.handle = None
+
+
+class TestEntityStore(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.items = [Item(name) for name in "abcde"]
+        self.store = EntityStore(self.items)
+
+    def test_handles_stay_stable_across_removals(self):
+        """Test that removing an item does not change the handles of the others."""
+        handles = {item.name: item.handle for item in self.items}
+        self.store.remove(self.items[1])
+        self.store.remove(self.items[0])
+
+        for item in self.items[2:]:
+            self.assertEqual(item.handle, handles[item.name])
+            self.assertIs(self.store.get(item.handle), item)
+        self.assertIsNone(self.store.get(handles["a"]), "Removed handles should no longer resolve")
+        self.assertIsNone(self.items[0].handle)
+
+    def test_remove_swaps_last_item_into_hole(self):
+        """Test that removal moves the last item into the freed slot instead of shifting the list."""
+        self.store.remove(self.items[1])
+        self.assertEqual([item.name for item in self.store], ["a", "e", "c", "d"])
+        self.assertEqual(len(self.store), 4)
+
+    def test_removing_absent_item_raises(self):
+        """Test that removing an item twice raises ValueError like list.remove."""
+        self.store.remove(self.items[2])
+        with self.assertRaises(ValueError):
+            self.store.remove(self.items[2])
+        self.assertNotIn(self.items[2], self.store)
+
+    def test_tombstones_hide_items_until_compacted(self):
+        """Test that tombstoned items vanish from iteration at once but keep positions until compact()."""
+        self.store.tombstone(self.items[0])
+        self.store.tombstone(self.items[3])
+
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual([item.name for item in self.store], ["b", "c", "e"])
+        self.assertNotIn(self.items[0], self.store)
+        self.assertIs(self.store[3], self.items[3], "Positions should not move before compaction")
+
+        self.store.compact()
+        self.assertEqual(sorted(item.name for item in self.store), ["b", "c", "e"])
+        self.assertEqual(len(self.store), 3)
+        for position, item in enumerate(self.store):
+            self.assertIs(self.store[position], item)
+            self.assertIs(self.store.get(item.handle), item)
+
+    def test_new_items_get_fresh_handles(self):
+        """Test that handles of removed items are not reused."""
+        old_handle = self.items[4].handle
+        self.store.remove(self.items[4])
+        handle = self.store.add(Item("f"))
+        self.assertNotEqual(handle, old_handle)
+
+
+if __name__ == '__main__':
+    unittest.main()
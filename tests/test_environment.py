@@ -6,19 +6,27 @@ sys.path.insert(0, os.path.dirname(__file__))
 import test_setup  # This mocks pygame.image.load before other imports
 
 import unittest
+from unittest.mock import patch
+
+import pygame
 
 # Add the src directory to the path so we can import our modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import cell as cell_module
+import food as food_module
+from cell import Cell
+from clan import TRAIT_NAMES
+from config import SimulationConfig
 from environment import Environment
-from food import spawn_food_item
-from constants import SCREEN_WIDTH, SCREEN_HEIGHT, FOOD_MAX_COUNT
+from food import Food, spawn_food_item
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, FOOD_MAX_COUNT, FOOD_TYPES, ENVIRONMENT_CHANGE_INTERVAL
 
 
 class TestEnvironmentUpdate(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures before each test method."""
-        self.env = Environment()
+        self.env = Environment(seed=1)
 
     def test_cell_spawn_localization_clusters_cells_by_clan(self):
         """Test that cells are spawned in localized clusters per clan."""
@@ -120,6 +128,27 @@ class TestEnvironmentUpdate(unittest.TestCase):
             self.assertEqual(final_cell_count, initial_cell_count - 1,
                            "Dead cells should be removed from environment")
 
+    def test_contested_food_is_eaten_once(self):
+        """Test that when several cells reach the same food in one tick only the first one eats it."""
+        self.env.clear_cells()
+        self.env.food.clear()
+        self.env.food_grid.clear()
+        self.env.toxic_zones = []
+        clan = self.env.clans[0]
+        first = Cell(200, 200, clan, 50)
+        second = Cell(200, 200, clan, 50)
+        self.env.add_cell(first)
+        self.env.add_cell(second)
+        self.assertEqual(clan.member_count, 2)
+        self.env.add_food(Food(200, 200, FOOD_TYPES[0]))
+
+        self.env.update()
+
+        self.assertEqual(len(self.env.food), 0, "Eaten food should be removed")
+        self.assertEqual(len(self.env.food_grid), 0, "Eaten food should leave the spatial index")
+        self.assertGreater(first.energy, 50, "First cell should gain the food's energy")
+        self.assertLess(second.energy, 50, "Second cell should not eat the same food")
+
     def test_offspring_are_added_to_environment(self):
         """Test that cell reproduction adds offspring to the environment."""
         # Find a mature cell with enough energy for reproduction
@@ -146,5 +175,152 @@ class TestEnvironmentUpdate(unittest.TestCase):
                                    "Environment should contain offspring after reproduction")
 
 
+class TestEnvironmentDraw(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.env = Environment(seed=1)
+        self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    def test_static_layer_is_built_once(self):
+        """Test that the background and zone layer is reused across frames."""
+        self.env.draw(self.screen)
+        layer = self.env.static_layer
+        self.assertIsNotNone(layer, "Drawing should build the static layer")
+        self.env.draw(self.screen)
+        self.assertIs(self.env.static_layer, layer, "Static layer should not be rebuilt every frame")
+
+    def test_static_layer_is_rebuilt_when_zones_change(self):
+        """Test that re-initializing the zones invalidates the static layer."""
+        self.env.draw(self.screen)
+        layer = self.env.static_layer
+        self.env.initialize_zones()
+        self.env.draw(self.screen)
+        self.assertIsNot(self.env.static_layer, layer, "New zones should produce a new static layer")
+
+    def test_draw_dirty_updates_only_sprite_areas(self):
+        """Test that dirty drawing repaints the full area once, then only old and new sprite rects."""
+        sprite_rects, dirty = self.env.draw_dirty(self.screen, [])
+        self.assertEqual(dirty, [pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)],
+                         "First frame should update the whole simulation area")
+        self.assertEqual(len(sprite_rects), len(self.env.cells) + len(self.env.food))
+
+        self.env.update()
+        new_rects, dirty = self.env.draw_dirty(self.screen, sprite_rects)
+        self.assertEqual(dirty, sprite_rects + new_rects, "Later frames should update old and new sprite areas")
+        self.assertEqual(len(new_rects), len(self.env.cells) + len(self.env.food))
+
+    def test_draw_dirty_matches_full_draw(self):
+        """Test that erasing and redrawing sprites gives the same image as a full redraw."""
+        sprite_rects, _ = self.env.draw_dirty(self.screen, [])
+        for _ in range(5):
+            self.env.update()
+            sprite_rects, _ = self.env.draw_dirty(self.screen, sprite_rects)
+
+        expected = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.env.draw(expected)
+        self.assertEqual(pygame.image.tostring(self.screen, "RGB"), pygame.image.tostring(expected, "RGB"))
+
+    def test_batched_draw_matches_per_entity_draw(self):
+        """Test that batched sprite blitting gives the same image as drawing each entity in turn."""
+        sprite = pygame.Surface((32, 32), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (255, 255, 255, 200), (16, 16), 12)
+        with patch.object(cell_module, "ORIGINAL_CELL_IMAGE", sprite), \
+             patch.object(food_module, "ORIGINAL_FOOD_IMAGE", sprite):
+            try:
+                self.env.draw(self.screen)
+
+                expected = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+                expected.blit(self.env.static_layer, (0, 0))
+                for food_item in self.env.food:
+                    food_item.draw(expected)
+                for cell in self.env.cells:
+                    cell.draw(expected)
+            finally:
+                cell_module.clear_cell_image_cache()
+                food_module.clear_food_image_cache()
+
+        self.assertEqual(pygame.image.tostring(self.screen, "RGB"), pygame.image.tostring(expected, "RGB"))
+
+
+class TestClanAggregates(unittest.TestCase):
+    def assert_matches_brute_force(self, env):
+        cells = list(env.cells)
+        for clan, count, means in env.clan_summaries():
+            clan_cells = [cell for cell in cells if cell.clan is clan]
+            self.assertEqual(count, len(clan_cells), f"Clan {clan.id} member count should match its cells")
+            for name in TRAIT_NAMES:
+                expected = sum(getattr(cell, name) for cell in clan_cells) / len(clan_cells) if clan_cells else 0
+                self.assertAlmostEqual(means[name], expected, places=6, msg=f"Clan {clan.id} mean {name}")
+        overall = env.trait_means()
+        for name in TRAIT_NAMES:
+            expected = sum(getattr(cell, name) for cell in cells) / len(cells) if cells else 0
+            self.assertAlmostEqual(overall[name], expected, places=6, msg=f"Overall mean {name}")
+
+    def test_aggregates_match_brute_force_through_births_deaths_and_mutations(self):
+        """Test that running per-clan aggregates equal a full recomputation over the living cells."""
+        env = Environment(seed=5, config=SimulationConfig(CELL_MUTATION_RATE=0.5))
+        self.assert_matches_brute_force(env)
+        mutations_seen = False
+        for tick in range(1, 1201):
+            env.update()
+            mutations_seen = mutations_seen or any(clan.trait_version for clan in env.clans)
+            if tick % 200 == 0:
+                self.assert_matches_brute_force(env)
+        self.assertTrue(mutations_seen, "The run should exercise clan mutations")
+
+    def test_aggregates_are_zero_for_extinct_clans(self):
+        """Test that a clan whose cells all died reports zero members and zero means."""
+        env = Environment(seed=1)
+        clan = env.clans[0]
+        for cell in list(env.cells):
+            if cell.clan is clan:
+                cell.energy = 0
+        env.update()
+        _, count, means = env.clan_summaries()[0]
+        self.assertEqual(count, 0)
+        self.assertEqual(set(means.values()), {0})
+
+
+def snapshot(env):
+    """Hashable snapshot of every piece of state that evolves during a run."""
+    return (
+        tuple((cell.x, cell.y, cell.energy, cell.age, cell.reproduction_timer) for cell in env.cells),
+        tuple((food.x, food.y, food.age, food.energy_value) for food in env.food),
+        tuple((zone.x, zone.y, zone.radius) for zone in env.toxic_zones + env.resource_zones),
+        tuple(tuple(clan.get_traits().values()) for clan in env.clans),
+    )
+
+
+class TestEnvironmentDeterminism(unittest.TestCase):
+    def test_same_seed_gives_identical_trajectories(self):
+        """Test that two environments with the same seed evolve bit-identically."""
+        env_a = Environment(seed=42)
+        env_b = Environment(seed=42)
+        for _ in range(ENVIRONMENT_CHANGE_INTERVAL + 100):
+            env_a.update()
+            env_b.update()
+            self.assertEqual(snapshot(env_a), snapshot(env_b))
+
+    def test_user_spawned_food_keeps_runs_identical(self):
+        """Test that food spawned at a position draws from the run's RNG, so seeded runs still match."""
+        env_a = Environment(seed=42)
+        env_b = Environment(seed=42)
+        for tick in range(200):
+            if tick % 50 == 0:
+                env_a.spawn_food(100, 200)
+                env_b.spawn_food(100, 200)
+            env_a.update()
+            env_b.update()
+        self.assertEqual(snapshot(env_a), snapshot(env_b))
+        food_count = env_a.food_count
+        env_a.spawn_food(5, 5)
+        self.assertEqual(env_a.food_count, food_count + 1)
+        self.assertEqual((env_a.food[len(env_a.food) - 1].x, env_a.food[len(env_a.food) - 1].y), (5, 5))
+
+    def test_different_seeds_diverge(self):
+        """Test that different seeds give different runs."""
+        self.assertNotEqual(snapshot(Environment(seed=1)), snapshot(Environment(seed=2)))
+
+
 if __name__ == '__main__':
     unittest.main()
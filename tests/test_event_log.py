@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import event_log
+from event_log import EventLogger
+
+
+class TestEventLogger(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "events.txt")
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        self.temp_dir.cleanup()
+
+    def read_lines(self, path=None):
+        with open(path or self.path) as f:
+            return f.read().splitlines()
+
+    def test_records_are_structured_and_flushed_on_close(self):
+        """Test that every queued record is written with its tick, type and payload by close()."""
+        logger = EventLogger(self.path)
+        logger.log("SYSTEM", "started")
+        logger.log("BIRTH", {"clan": 2, "x": 10.5}, tick=42)
+        logger.close()
+
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith("[SYSTEM] started"))
+        self.assertTrue(lines[1].endswith('[tick 42] [BIRTH] {"clan": 2, "x": 10.5}'))
+        self.assertEqual(logger.written, 2)
+
+    def test_flush_waits_for_writer(self):
+        """Test that flush() returns only once queued records are on disk."""
+        with EventLogger(self.path) as logger:
+            for tick in range(500):
+                logger.log("TICK", "step", tick=tick)
+            logger.flush()
+            self.assertEqual(len(self.read_lines()), 500)
+
+    def test_drop_policy_discards_when_queue_is_full(self):
+        """Test that a full queue drops new records instead of blocking the caller."""
+        release = threading.Event()
+        original_format = event_log.format_record
+
+        def slow_format(record):
+            release.wait()
+            return original_format(record)
+
+        with patch.object(event_log, "format_record", slow_format):
+            logger = EventLogger(self.path, max_queue=4, policy="drop", batch_size=1)
+            for tick in range(20):
+                logger.log("TICK", "step", tick=tick) # Never blocks, even with a stalled writer
+            self.assertGreater(logger.dropped, 0, "Records beyond the queue capacity should be dropped")
+            release.set()
+            logger.close()
+
+        self.assertEqual(logger.written + logger.dropped, 20)
+        self.assertEqual(len(self.read_lines()), logger.written)
+
+    def test_block_policy_keeps_every_record(self):
+        """Test that the block policy waits for room instead of dropping records."""
+        with EventLogger(self.path, max_queue=2, policy="block") as logger:
+            for tick in range(200):
+                logger.log("TICK", "step", tick=tick)
+        self.assertEqual(logger.dropped, 0)
+        self.assertEqual(len(self.read_lines()), 200)
+
+    def test_log_file_is_rotated_by_size(self):
+        """Test that the log rotates into numbered backups once it exceeds max_bytes."""
+        with EventLogger(self.path, max_bytes=200, backup_count=2, batch_size=1) as logger:
+            for tick in range(30):
+                logger.log("TICK", "x" * 20, tick=tick)
+
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertTrue(os.path.exists(self.path + ".2"))
+        self.assertFalse(os.path.exists(self.path + ".3"), "Only backup_count backups should be kept")
+        self.assertLessEqual(os.path.getsize(self.path + ".1"), 200 + 100)
+
+    def test_writer_error_is_raised(self):
+        """Test that a record the writer cannot format makes flush(), log() and close() raise instead of hang."""
+        logger = EventLogger(self.path, max_queue=4, policy="block")
+        logger.log("BAD", {"payload": object()}) # Not JSON-serializable
+        with self.assertRaises(RuntimeError) as raised:
+            logger.flush()
+        self.assertIsInstance(raised.exception.__cause__, TypeError)
+        with self.assertRaises(RuntimeError):
+            logger.log("SYSTEM", "after the failure")
+        with self.assertRaises(RuntimeError):
+            logger.close()
+        self.assertFalse(logger._thread.is_alive())
+
+    def test_close_after_writer_error_with_a_full_queue(self):
+        """Test that close() returns even when the queue filled up behind a failed write."""
+        logger = EventLogger(self.path, max_queue=2, policy="drop")
+        with patch.object(event_log, "format_record", side_effect=OSError("disk full")):
+            for _ in range(50):
+                try:
+                    logger.log("TICK", "step")
+                except RuntimeError:
+                    break
+            with self.assertRaises(RuntimeError) as raised:
+                logger.close()
+        self.assertIsInstance(raised.exception.__cause__, OSError)
+
+    def test_unknown_policy_is_rejected(self):
+        """Test that an invalid queue policy raises ValueError."""
+        with self.assertRaises(ValueError):
+            EventLogger(self.path, policy="spill")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import glob
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import exporter
+from exporter import StatsExporter, load_chunks, load_stats, stats_columns
+from headless import create_environment, run_headless
+
+
+class TestStatsExporter(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, "export")
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        self.temp_dir.cleanup()
+
+    def test_rows_are_streamed_to_csv_and_npy_chunks(self):
+        """Test that every recorded tick ends up in the CSV and the memory-mappable chunks."""
+        environment = create_environment(seed=2)
+        with StatsExporter.for_environment(self.directory, environment, batch_size=16, parquet=False) as stats:
+            run_headless(environment, 40, exporter=stats)
+
+        chunks = load_chunks(self.directory)
+        self.assertEqual([len(chunk) for chunk in chunks], [16, 16, 8], "Batches should be written as chunks")
+        self.assertIsInstance(chunks[0], np.memmap, "Chunks should be memory-mapped, not parsed")
+
+        data = load_stats(self.directory)
+        np.testing.assert_array_equal(data["tick"], np.arange(1, 41))
+        self.assertEqual(data["cell_count"][-1], environment.cell_count)
+        self.assertEqual(data["food_count"][-1], environment.food_count)
+        self.assertAlmostEqual(data["avg_speed"][-1], environment.trait_means()["speed"])
+        self.assertEqual(data["clan_0_count"][-1], environment.clan_summaries()[0][1])
+
+        with open(os.path.join(self.directory, exporter.CSV_FILE)) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0].split(","), stats_columns(environment))
+        self.assertEqual(len(lines), 41, "CSV should have a header plus one line per tick")
+
+    def test_export_appends_to_existing_directory(self):
+        """Test that a second exporter on the same directory continues the chunk sequence."""
+        for seed in (1, 2):
+            environment = create_environment(seed=seed)
+            with StatsExporter.for_environment(self.directory, environment, batch_size=8, parquet=False) as stats:
+                run_headless(environment, 8, exporter=stats)
+
+        self.assertEqual(len(glob.glob(os.path.join(self.directory, "stats_*.npy"))), 2)
+        self.assertEqual(len(load_stats(self.directory)["tick"]), 16)
+
+    def test_mismatched_columns_are_rejected(self):
+        """Test that exporting different columns into an existing export raises ValueError."""
+        StatsExporter(self.directory, ["tick", "a"], parquet=False).close()
+        with self.assertRaises(ValueError):
+            StatsExporter(self.directory, ["tick", "b"], parquet=False)
+
+    def test_vectorized_environment_can_be_exported(self):
+        """Test that the NumPy engine produces the same stats columns."""
+        environment = create_environment(seed=1, vectorized=True)
+        with StatsExporter.for_environment(self.directory, environment, batch_size=4, parquet=False) as stats:
+            run_headless(environment, 5, exporter=stats)
+        self.assertEqual(len(load_stats(self.directory)["tick"]), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
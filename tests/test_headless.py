@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import contextlib
+import io
+import unittest
+
+import pygame
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from headless import create_environment, parse_args, run_headless
+from vector_engine import VectorEnvironment
+
+
+class TestHeadlessRun(unittest.TestCase):
+    def test_run_advances_environment_without_display(self):
+        """Test that a headless run steps the environment without initializing a display."""
+        environment = create_environment(seed=1)
+        run_headless(environment, 50)
+
+        self.assertEqual(environment.environment_timer, 50, "Environment should advance once per tick")
+        self.assertFalse(pygame.display.get_init(), "Headless runs must not initialize the display")
+
+    def test_vectorized_flag_selects_numpy_engine(self):
+        """Test that the vectorized option creates the struct-of-arrays engine."""
+        environment = create_environment(seed=1, vectorized=True)
+        self.assertIsInstance(environment, VectorEnvironment)
+
+
+class TestHeadlessArguments(unittest.TestCase):
+    def test_world_options_are_not_silently_ignored(self):
+        """Test that --world with --vectorized and --tiles without --world are rejected."""
+        for argv in (["--world", "4000x4000", "--vectorized"], ["--tiles", "4x4"]):
+            with self.subTest(argv=argv), contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    parse_args(argv)
+        self.assertEqual(parse_args(["--world", "4000x4000", "--tiles", "4x4"]).tiles, (4, 4))
+        self.assertIsNone(parse_args(["--world", "4000x4000"]).tiles, "run_tiled applies the 2x2 default")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import subprocess
+import unittest
+import uuid
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import Environment
+from live_view import M_SEQUENCE, LiveFrameBuffer, entity_arrays
+from vector_engine import VectorEnvironment
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+
+class TestLiveFrameBuffer(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.name = f"microlife_test_{uuid.uuid4().hex[:12]}"
+        self.buffer = LiveFrameBuffer.create(self.name, cell_capacity=1000, food_capacity=500)
+        self.viewer = LiveFrameBuffer.attach(self.name)
+        self.viewer.heartbeat()
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        self.viewer.close()
+        self.buffer.close()
+
+    def test_vector_frame_round_trip(self):
+        """Test that a published VectorEnvironment frame reads back with its cells, food, zones and stats."""
+        environment = VectorEnvironment(seed=4)
+        for _ in range(30):
+            environment.update()
+        self.assertTrue(self.buffer.publish(environment))
+        frame = self.viewer.read()
+        self.assertEqual(frame.tick, environment.tick)
+        self.assertEqual(frame.cell_count, environment.cell_count)
+        self.assertEqual(frame.food_count, environment.food_count)
+        np.testing.assert_allclose(frame.cells[:, 0], environment.cell_x, rtol=1e-6)
+        np.testing.assert_array_equal(frame.cells[:, 3], environment.cell_clan)
+        np.testing.assert_allclose(frame.food[:, 1], environment.food_y, rtol=1e-6)
+        self.assertEqual(len(frame.zones), len(environment.toxic_zones) + len(environment.resource_zones))
+        self.assertEqual([int(row[0]) for row in frame.clans], [clan.id for clan in environment.clans])
+        self.assertAlmostEqual(frame.averages[0], environment.trait_means()["speed"])
+
+    def test_reference_entity_arrays(self):
+        """Test that Cell/Food objects are flattened into position, size and color rows."""
+        environment = Environment(seed=2)
+        cells, food = entity_arrays(environment)
+        self.assertEqual(len(cells), environment.cell_count)
+        self.assertEqual(len(food), environment.food_count)
+        first_cell = next(iter(environment.cells))
+        self.assertEqual(cells[0, :3].tolist(), [first_cell.x, first_cell.y, first_cell.size])
+        self.assertEqual(environment.clans[int(cells[0, 3])], first_cell.clan)
+        first_food = next(iter(environment.food))
+        self.assertEqual(food[0].tolist(), [first_food.x, first_food.y, first_food.size] + list(first_food.color))
+
+    def test_each_publish_becomes_the_latest_frame(self):
+        """Test that consecutive publishes alternate slots and the reader always gets the newest."""
+        environment = VectorEnvironment(seed=1)
+        for tick in range(1, 6):
+            environment.update()
+            self.buffer.publish(environment)
+            self.assertEqual(self.viewer.read().tick, tick)
+
+    def test_no_publishing_without_a_viewer(self):
+        """Test that publish() is skipped while no viewer heartbeat is recent, unless forced."""
+        self.viewer.header[3] = 0 # Heartbeat from 1970
+        environment = VectorEnvironment(seed=1)
+        self.assertFalse(self.buffer.publish(environment))
+        self.assertIsNone(self.viewer.read())
+        self.assertTrue(self.buffer.publish(environment, force=True))
+        self.assertIsNotNone(self.viewer.read())
+
+    def test_slot_being_written_is_not_read(self):
+        """Test that a frame whose slot is mid-write is never returned."""
+        environment = VectorEnvironment(seed=1)
+        self.buffer.publish(environment)
+        slot = self.buffer.slots[int(self.buffer.header[1]) % 2]
+        slot["meta"][M_SEQUENCE] += 1 # Writer "in the middle" of rewriting the latest slot
+        self.assertIsNone(self.viewer.read())
+        slot["meta"][M_SEQUENCE] += 1
+        self.assertIsNotNone(self.viewer.read())
+
+    def test_large_populations_are_truncated(self):
+        """Test that cells beyond the capacity are counted but not copied."""
+        environment = VectorEnvironment(seed=1)
+        environment.add_cells(np.full(1500, 10.0), np.full(1500, 20.0), np.zeros(1500, dtype=np.int64),
+                              np.full(1500, 50.0))
+        self.buffer.publish(environment)
+        frame = self.viewer.read()
+        self.assertEqual(frame.cell_count, environment.cell_count)
+        self.assertEqual(len(frame.cells), 1000)
+
+    def test_close_marks_the_run_finished(self):
+        """Test that the viewer sees the run end and can still read the last frame."""
+        environment = VectorEnvironment(seed=1)
+        self.buffer.publish(environment)
+        self.assertFalse(self.viewer.closed)
+        self.buffer.close()
+        self.assertTrue(self.viewer.closed)
+        self.assertEqual(self.viewer.read().tick, environment.tick)
+
+    def test_viewer_process_exit_keeps_the_buffer(self):
+        """Test that a viewer attaching from another process and exiting leaves the run's buffer alone."""
+        code = ("import sys; sys.path.insert(0, sys.argv[1]); from live_view import LiveFrameBuffer; "
+                "buffer = LiveFrameBuffer.attach(sys.argv[2]); buffer.heartbeat(); buffer.close()")
+        subprocess.run([sys.executable, "-c", code, SRC_DIR, self.name], check=True, capture_output=True)
+        again = LiveFrameBuffer.attach(self.name)
+        again.close()
+
+    def test_attach_without_a_run(self):
+        """Test that attaching to a name nobody publishes to raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            LiveFrameBuffer.attach(f"microlife_missing_{uuid.uuid4().hex[:12]}")
+
+
+if __name__ == '__main__':
+    unittest.main()
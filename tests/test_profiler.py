@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import json
+import tempfile
+import unittest
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import Environment
+from profiler import PhaseProfiler
+from vector_engine import VectorEnvironment
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    def test_percentiles_of_known_durations(self):
+        """Test that the summary reports mean and percentiles of the recorded durations in ms."""
+        profiler = PhaseProfiler()
+        for ms in range(1, 101):
+            profiler.record("update", ms * 1_000_000)
+        stats = profiler.summary()["update"]
+        self.assertEqual(stats["samples"], 100)
+        self.assertAlmostEqual(stats["mean_ms"], 50.5)
+        self.assertAlmostEqual(stats["p50_ms"], 50.5)
+        self.assertAlmostEqual(stats["p95_ms"], 95.05)
+        self.assertAlmostEqual(stats["p99_ms"], 99.01)
+
+    def test_window_keeps_only_recent_samples(self):
+        """Test that only the last `window` durations of a phase contribute to the summary."""
+        profiler = PhaseProfiler(window=10)
+        for _ in range(50):
+            profiler.record("draw", 100_000_000)
+        for _ in range(10):
+            profiler.record("draw", 1_000_000)
+        stats = profiler.summary()["draw"]
+        self.assertEqual(stats["samples"], 10)
+        self.assertAlmostEqual(stats["p99_ms"], 1.0)
+
+    def test_lap_chains_phases(self):
+        """Test that lap() records a non-negative duration and returns a timestamp for the next phase."""
+        profiler = PhaseProfiler()
+        start = 0
+        end = profiler.lap("first", start)
+        self.assertGreaterEqual(end, start)
+        profiler.lap("second", end)
+        self.assertEqual(profiler.phases, ["first", "second"])
+
+    def test_dump_json(self):
+        """Test that dump_json() writes the window and per-phase summary."""
+        profiler = PhaseProfiler(window=5)
+        profiler.record("ui", 2_000_000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "profile.json")
+            profiler.dump_json(path)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data["window"], 5)
+        self.assertAlmostEqual(data["phases"]["ui"]["p50_ms"], 2.0)
+
+    def test_environments_record_update_phases(self):
+        """Test that both engines time their update phases when given a profiler, and not by default."""
+        for engine in (Environment, VectorEnvironment):
+            environment = engine(seed=1)
+            self.assertIsNone(environment.profiler)
+            environment.update()
+
+            environment.profiler = PhaseProfiler()
+            for _ in range(3):
+                environment.update()
+            self.assertEqual(environment.profiler.phases, ["zones", "cells", "food", "spawn"])
+            self.assertEqual(environment.profiler.summary()["cells"]["samples"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import Environment
+from replay_log import INDEX_MAGIC, OLD_AGE, STARVED, ReplayLog, ReplayRecorder
+
+
+def live_state(environment):
+    """What a replay should show for the environment right now."""
+    cells = sorted((cell.handle, cell.clan.id, int(cell.x), int(cell.y)) for cell in environment.cells)
+    food = sorted((food_item.handle, food_item.x, food_item.y) for food_item in environment.food)
+    clans = [(clan.id,) + tuple(clan.get_traits().values()) for clan in environment.clans]
+    zones = [(zone.x, zone.y, zone.radius) for zone in environment.toxic_zones + environment.resource_zones]
+    return cells, food, clans, zones
+
+
+def replayed_state(state):
+    cells = [tuple(int(value) for value in row) for row in state.cells[["id", "clan", "x", "y"]].tolist()]
+    food = [(int(row[0]), float(row[1]), float(row[2])) for row in state.food[["id", "x", "y"]].tolist()]
+    clans = [tuple(row) for row in state.clans[["id", "speed", "sense_radius", "energy_efficiency", "size",
+                                                "lifespan"]].tolist()]
+    zones = [tuple(row) for row in state.zones[["x", "y", "radius"]].tolist()]
+    return cells, food, clans, zones
+
+
+class TestReplayLog(unittest.TestCase):
+    TICKS = 450
+    CHECKED = (1, 99, 100, 101, 250, 333, 450)
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "run.mlr")
+        self.environment = Environment(seed=11)
+        self.recorder = ReplayRecorder(self.path, self.environment, keyframe_interval=100)
+        self.expected = {}
+        for _ in range(self.TICKS):
+            self.environment.update()
+            if self.environment.tick in self.CHECKED:
+                self.expected[self.environment.tick] = live_state(self.environment)
+        self.recorder.close()
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        shutil.rmtree(self.directory)
+
+    def assert_state(self, state, tick):
+        cells, food, clans, zones = replayed_state(state)
+        live_cells, live_food, live_clans, live_zones = self.expected[tick]
+        self.assertEqual(state.tick, tick)
+        self.assertEqual(cells, live_cells)
+        self.assertEqual([row[0] for row in food], [row[0] for row in live_food])
+        np.testing.assert_allclose([row[1:] for row in food], [row[1:] for row in live_food], rtol=1e-6)
+        self.assertEqual(clans, live_clans)
+        np.testing.assert_allclose(zones, live_zones, rtol=1e-6)
+
+    def test_index(self):
+        """Test that the closed log lists a keyframe at the start and every interval after it."""
+        with ReplayLog(self.path) as log:
+            self.assertEqual(log.keyframe_ticks, [0, 100, 200, 300, 400])
+            self.assertEqual((log.first_tick, log.last_tick), (0, self.TICKS))
+            self.assertEqual(log.metadata["seed"], 11)
+
+    def test_seek_matches_the_live_run(self):
+        """Test that seeking, in any order, rebuilds the cells, food, clan traits and zones of that tick."""
+        with ReplayLog(self.path) as log:
+            for tick in sorted(self.CHECKED, reverse=True) + [250, 1]:
+                self.assert_state(log.seek(tick), tick)
+
+    def test_seek_is_clamped(self):
+        """Test that seeking outside the log lands on its first or last tick."""
+        with ReplayLog(self.path) as log:
+            self.assertEqual(log.seek(-5).tick, 0)
+            self.assertEqual(log.seek(10 ** 6).tick, self.TICKS)
+
+    def test_step_plays_every_tick(self):
+        """Test that stepping visits each tick once and births minus deaths track the population."""
+        with ReplayLog(self.path) as log:
+            state = log.seek(0)
+            population = len(state.cells)
+            ticks = []
+            while log.step() is not None:
+                state = log.state
+                ticks.append(state.tick)
+                events = state.events
+                population += len(events["births"]) - len(events["deaths"])
+                self.assertEqual(len(state.cells), population)
+                self.assertTrue(set(events["deaths"]["cause"].tolist()) <= {STARVED, OLD_AGE})
+                if state.tick in self.expected:
+                    self.assert_state(state, state.tick)
+            self.assertEqual(ticks, list(range(1, self.TICKS + 1)))
+
+    def test_meals_remove_the_food_eaten(self):
+        """Test that every meal names food that existed a tick earlier and is gone afterwards."""
+        meals = 0
+        with ReplayLog(self.path) as log:
+            previous = set(log.seek(0).food["id"].tolist())
+            while log.step() is not None:
+                eaten = set(log.state.events["meals"]["food"].tolist())
+                spawned = set(log.state.events["spawns"]["id"].tolist())
+                self.assertTrue(eaten <= previous | spawned)
+                self.assertFalse(eaten & set(log.state.food["id"].tolist()))
+                meals += len(eaten)
+                previous = set(log.state.food["id"].tolist())
+        self.assertGreater(meals, 0)
+
+    def test_recording_does_not_change_the_run(self):
+        """Test that a recorded run draws the same random numbers as an unrecorded one."""
+        plain = Environment(seed=11)
+        for _ in range(self.TICKS):
+            plain.update()
+        # Clan ids come from a process-wide counter, so compare everything but those
+        (plain_cells, plain_food, plain_clans, plain_zones), (cells, food, clans, zones) = \
+            live_state(plain), live_state(self.environment)
+        self.assertEqual([(row[0],) + row[2:] for row in plain_cells], [(row[0],) + row[2:] for row in cells])
+        self.assertEqual([row[1:] for row in plain_clans], [row[1:] for row in clans])
+        self.assertEqual((plain_food, plain_zones), (food, zones))
+        self.assertIsNone(self.environment.recorder)
+
+    def test_log_without_index(self):
+        """Test that a log cut off mid-record (a crashed run) still reads up to its last whole tick."""
+        with open(self.path, "rb") as file:
+            data = file.read()
+        self.assertTrue(data.endswith(INDEX_MAGIC))
+        with ReplayLog(self.path) as log:
+            index_offset = log._end_offset
+        with open(self.path, "wb") as file:
+            file.write(data[:index_offset - 3])
+        with ReplayLog(self.path) as log:
+            self.assertEqual(log.keyframe_ticks, [0, 100, 200, 300, 400])
+            self.assertEqual(log.last_tick, self.TICKS - 1)
+            self.assert_state(log.seek(333), 333)
+
+    def test_not_a_replay_log(self):
+        """Test that opening some other file raises ValueError."""
+        path = os.path.join(self.directory, "other.bin")
+        with open(path, "wb") as file:
+            file.write(b"not a replay log at all")
+        with self.assertRaises(ValueError):
+            ReplayLog(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
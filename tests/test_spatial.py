@@ -0,0 +1,128 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import random
+import unittest
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cell import Cell
+from clan import Clan
+from config import SimulationConfig
+from environment import Environment, Zone
+from food import spawn_food_item
+from spatial import SpatialGrid, ZoneRaster
+from vector_engine import VectorEnvironment
+from constants import LIGHT_BLUE, PURPLE, SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.grid = SpatialGrid()
+        self.food = [spawn_food_item() for _ in range(200)]
+        for food_item in self.food:
+            self.grid.insert(food_item)
+
+    def test_remove_drops_item_from_queries(self):
+        """Test that removed items are no longer returned by radius queries."""
+        target = self.food[0]
+        self.assertTrue(self.grid.remove(target))
+        self.assertNotIn(target, list(self.grid.query_radius(target.x, target.y, 10)))
+        self.assertEqual(len(self.grid), len(self.food) - 1)
+
+    def test_remove_unknown_item_is_ignored(self):
+        """Test that removing an item that was never indexed does not fail."""
+        self.assertFalse(self.grid.remove(spawn_food_item()))
+        self.assertEqual(len(self.grid), len(self.food))
+
+    def test_find_food_matches_brute_force_scan(self):
+        """Test that the grid lookup picks the same target as scanning every food item."""
+        clan = Clan()
+        for _ in range(500):
+            cell = Cell(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), clan)
+            cell.sense_radius = random.uniform(10, 200)
+
+            cell.find_food(self.food)
+            brute_force_target = cell.target_food
+            cell.find_food(self.food, self.grid)
+            self.assertIs(cell.target_food, brute_force_target,
+                          "Grid lookup should choose the same food as the brute-force scan")
+
+
+class TestEnvironmentFoodGrid(unittest.TestCase):
+    def test_food_grid_tracks_food_list(self):
+        """Test that the environment keeps its food index in sync as food spawns, decays and is eaten."""
+        env = Environment()
+        for _ in range(300):
+            env.update()
+            self.assertEqual(len(env.food_grid), len(env.food),
+                             "Food grid should index exactly the food in the environment")
+        indexed = {id(item) for bucket in env.food_grid.buckets.values() for item in bucket}
+        self.assertEqual(indexed, {id(item) for item in env.food})
+
+
+class TestZoneRaster(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = random.Random(3)
+        self.zones = [Zone(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT), rng.randint(5, 150),
+                           PURPLE, "toxic") for _ in range(200)]
+        self.raster = ZoneRaster(self.zones)
+        self.points = [(rng.uniform(-50, SCREEN_WIDTH + 50), rng.uniform(-50, SCREEN_HEIGHT + 50))
+                       for _ in range(2000)]
+        # Points exactly on zone edges and on raster square corners
+        self.points += [(zone.x + zone.radius, zone.y) for zone in self.zones]
+        self.points += [(16.0 * i, 16.0 * i) for i in range(40)]
+
+    def brute_force_count(self, x, y):
+        return sum((x - zone.x) ** 2 + (y - zone.y) ** 2 < zone.radius ** 2 for zone in self.zones)
+
+    def test_count_matches_brute_force(self):
+        """Test that raster counts equal testing the point against every zone, on and off the raster."""
+        for x, y in self.points:
+            self.assertEqual(self.raster.count(x, y), self.brute_force_count(x, y))
+            self.assertEqual(self.raster.contains(x, y), self.brute_force_count(x, y) > 0)
+
+    def test_batched_counts_match_scalar(self):
+        """Test that counts() over arrays gives the same result as count() per point."""
+        xs = np.array([x for x, _ in self.points])
+        ys = np.array([y for _, y in self.points])
+        expected = [self.raster.count(x, y) for x, y in self.points]
+        self.assertEqual(self.raster.counts(xs, ys).tolist(), expected)
+
+    def test_no_zones(self):
+        """Test that an empty raster reports no coverage."""
+        raster = ZoneRaster([])
+        self.assertEqual(raster.count(10, 10), 0)
+        self.assertFalse(raster.contains(10, 10))
+        self.assertEqual(raster.counts(np.array([10.0, -5.0]), np.array([10.0, 900.0])).tolist(), [0, 0])
+
+    def test_overlapping_toxic_zones_stack_damage(self):
+        """Test that a cell inside several toxic zones takes the damage of each of them."""
+        for engine in (Environment, VectorEnvironment):
+            env = engine(seed=2, config=SimulationConfig(ENVIRONMENT_CHANGE_INTERVAL=10**9))
+            env.set_zones([Zone(400, 300, 50, PURPLE, "toxic") for _ in range(3)],
+                          [Zone(0, 0, 1, LIGHT_BLUE, "resource")])
+            self.assertEqual(env.toxic_raster.count(400, 300), 3)
+            self.assertFalse(env.resource_raster.contains(400, 300))
+
+    def test_hundreds_of_zones(self):
+        """Test that both engines run with zone counts in the hundreds."""
+        config = SimulationConfig(TOXIC_ZONE_COUNT=300, RESOURCE_ZONE_COUNT=300)
+        for engine in (Environment, VectorEnvironment):
+            env = engine(seed=1, config=config)
+            for _ in range(20):
+                env.update()
+            self.assertEqual(len(env.toxic_zones), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
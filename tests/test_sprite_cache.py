@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+from unittest.mock import patch
+
+import pygame
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cell as cell_module
+import food as food_module
+from clan import Clan
+from constants import CELL_SIZE_MAX, CELL_SIZE_MIN, FOOD_TYPES
+from sprite_cache import SpriteCache, surface_bytes
+
+
+class TestSpriteCache(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.surface = pygame.Surface((10, 10), pygame.SRCALPHA)
+        self.entry_bytes = surface_bytes(self.surface)
+        self.cache = SpriteCache(max_bytes=self.entry_bytes * 2)
+
+    def test_hits_and_misses_are_counted(self):
+        """Test that lookups update the hit and miss counters."""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", self.surface)
+        self.assertIs(self.cache.get("a"), self.surface)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_least_recently_used_sprite_is_evicted(self):
+        """Test that exceeding the memory cap evicts the least recently used sprite."""
+        self.cache.put("a", self.surface)
+        self.cache.put("b", self.surface.copy())
+        self.cache.get("a") # "b" is now the least recently used
+        self.cache.put("c", self.surface.copy())
+
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+        self.assertIn("c", self.cache)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertLessEqual(self.cache.bytes_used, self.cache.max_bytes)
+
+    def test_oversized_sprite_is_still_cached(self):
+        """Test that a single sprite larger than the cap is kept rather than evicted immediately."""
+        self.cache.put("big", pygame.Surface((100, 100), pygame.SRCALPHA))
+        self.assertIn("big", self.cache)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_clear_releases_memory(self):
+        """Test that clearing the cache drops every sprite and its byte count."""
+        self.cache.put("a", self.surface)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.bytes_used, 0)
+
+
+class TestSpritePrewarming(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.sprite = pygame.Surface((32, 32), pygame.SRCALPHA)
+        cell_module.clear_cell_image_cache()
+        food_module.clear_food_image_cache()
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        cell_module.clear_cell_image_cache()
+        food_module.clear_food_image_cache()
+
+    def test_prewarmed_cell_sprites_are_hits(self):
+        """Test that after pre-warming, drawing any reachable clan size never builds a sprite."""
+        clan = Clan()
+        with patch.object(cell_module, "ORIGINAL_CELL_IMAGE", self.sprite):
+            cell_module.prewarm_cell_images([clan])
+            misses = cell_module.cell_image_cache_stats()["misses"]
+            for size in range(CELL_SIZE_MIN, CELL_SIZE_MAX + 1):
+                self.assertIsNotNone(cell_module.get_cell_image(size + 0.5, clan))
+        self.assertEqual(cell_module.cell_image_cache_stats()["misses"], misses, "Pre-warmed sizes should all hit")
+
+    def test_prewarmed_food_sprites_are_hits(self):
+        """Test that every food type's sprite is built by pre-warming."""
+        with patch.object(food_module, "ORIGINAL_FOOD_IMAGE", self.sprite):
+            food_module.prewarm_food_images(FOOD_TYPES)
+            misses = food_module.food_image_cache_stats()["misses"]
+            for food_type in FOOD_TYPES:
+                self.assertIsNotNone(food_module.get_food_image(food_type["size"], food_type["color"]))
+        self.assertEqual(food_module.food_image_cache_stats()["misses"], misses)
+        self.assertEqual(food_module.food_image_cache_stats()["entries"], len({(t["size"], t["color"]) for t in FOOD_TYPES}))
+
+
+if __name__ == '__main__':
+    unittest.main()
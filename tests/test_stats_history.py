@@ -0,0 +1,107 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stats_history import StatsHistory
+
+
+def fill(history, count):
+    for tick in range(1, count + 1):
+        history.append(tick, value=float(tick), other=float(-tick))
+
+
+class TestStatsHistory(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.history = StatsHistory(("value", "other"), capacity=8, factor=4, levels=3)
+
+    def test_memory_is_bounded(self):
+        """Test that the full-resolution level keeps only the most recent samples."""
+        fill(self.history, 100)
+        self.assertEqual(len(self.history), 8)
+        self.assertEqual(self.history.total_samples, 100)
+        np.testing.assert_array_equal(self.history.window(level=0)["value"], np.arange(93, 101))
+        self.assertEqual(self.history.latest("value"), 100)
+
+    def test_downsampled_buckets_hold_min_mean_max(self):
+        """Test that every `factor` samples fold into one min/mean/max bucket at the next level."""
+        fill(self.history, 16)
+        level_1 = self.history.window(level=1)
+        np.testing.assert_array_equal(level_1["time"], [1, 5, 9, 13])
+        np.testing.assert_array_equal(level_1["value_min"], [1, 5, 9, 13])
+        np.testing.assert_array_equal(level_1["value"], [2.5, 6.5, 10.5, 14.5])
+        np.testing.assert_array_equal(level_1["value_max"], [4, 8, 12, 16])
+        np.testing.assert_array_equal(level_1["other_min"], [-4, -8, -12, -16])
+
+        level_2 = self.history.window(level=2)
+        np.testing.assert_array_equal(level_2["value"], [8.5])
+        np.testing.assert_array_equal(level_2["value_min"], [1])
+        np.testing.assert_array_equal(level_2["value_max"], [16])
+
+    def test_window_picks_finest_level_covering_start(self):
+        """Test that recent windows come at full resolution and older ones from coarser levels."""
+        fill(self.history, 100)
+        recent = self.history.window(95, 100)
+        self.assertEqual(recent["level"], 0)
+        np.testing.assert_array_equal(recent["value"], np.arange(95, 101))
+
+        older = self.history.window(80, 100)
+        self.assertEqual(older["level"], 1)
+        self.assertTrue(np.all((older["time"] >= 80) & (older["time"] <= 100)))
+
+        everything = self.history.window()
+        self.assertEqual(everything["level"], 2, "Unbounded windows should use the coarsest level with data")
+
+    def test_coarse_window_ending_mid_bucket_includes_the_partial_bucket(self):
+        """Test that a coarse window reaches the latest sample through the bucket still being filled."""
+        fill(self.history, 102) # Level 1 is filling 101..102, level 2 is filling 97..102
+        level_1 = self.history.window(80, 102, level=1)
+        self.assertTrue(level_1["partial"])
+        np.testing.assert_array_equal(level_1["time"], [81, 85, 89, 93, 97, 101])
+        self.assertEqual((level_1["value_min"][-1], level_1["value"][-1], level_1["value_max"][-1]),
+                         (101, 101.5, 102))
+
+        level_2 = self.history.window(80, 102, level=2)
+        self.assertTrue(level_2["partial"])
+        np.testing.assert_array_equal(level_2["time"], [81, 97])
+        # The partial bucket weighs the completed 97..100 entry by its four samples
+        self.assertEqual((level_2["value_min"][-1], level_2["value"][-1], level_2["value_max"][-1]),
+                         (97, 99.5, 102))
+        self.assertEqual(level_2["other_min"][-1], -102)
+
+        earlier = self.history.window(80, 99, level=1)
+        self.assertFalse(earlier["partial"])
+        np.testing.assert_array_equal(earlier["time"], [81, 85, 89, 93, 97])
+
+    def test_window_without_wrap_is_a_view(self):
+        """Test that a window inside one contiguous segment does not copy the data."""
+        fill(self.history, 6) # Not wrapped yet
+        window = self.history.window(2, 5, level=0)
+        np.testing.assert_array_equal(window["value"], [2, 3, 4, 5])
+        self.assertIsNotNone(window["value"].base, "Window should be a view into the ring buffer")
+
+    def test_window_across_wrap_is_ordered(self):
+        """Test that a window spanning the end of the ring buffer comes back in time order."""
+        fill(self.history, 13) # Ring holds 6..13, physically wrapped
+        window = self.history.window(7, 12, level=0)
+        np.testing.assert_array_equal(window["time"], np.arange(7, 13))
+        np.testing.assert_array_equal(window["other"], -np.arange(7, 13))
+
+    def test_empty_history(self):
+        """Test that an empty history answers queries with empty arrays and defaults."""
+        self.assertEqual(self.history.latest("value"), 0)
+        self.assertEqual(len(self.history.window()["value"]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
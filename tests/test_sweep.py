@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import argparse
+import contextlib
+import io
+import unittest
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sweep import grid_configurations, parse_args, parse_grid_option, run_configuration
+
+
+class TestSweepConfigurations(unittest.TestCase):
+    def test_grid_is_cartesian_product(self):
+        """Test that grid options expand to every combination of values."""
+        grid = [parse_grid_option("CELL_MUTATION_RATE=0.05,0.1"),
+                parse_grid_option("FOOD_MAX_COUNT=100,150,200")]
+        configurations = grid_configurations(grid)
+        self.assertEqual(len(configurations), 6)
+        self.assertIn({"CELL_MUTATION_RATE": 0.1, "FOOD_MAX_COUNT": 200}, configurations)
+
+    def test_unknown_constant_is_rejected(self):
+        """Test that grid options must name a simulation constant."""
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_grid_option("NOT_A_CONSTANT=1,2")
+
+    def test_unsupported_option_combinations_are_rejected(self):
+        """Test that --range and --sample must be given together instead of one being ignored."""
+        for argv in (["--range", "FOOD_MAX_COUNT=100:200"], ["--sample", "5"], ["--sample", "-1"],
+                     ["--grid", "FOOD_MAX_COUNT=100,200", "--sample-seed", "3"]):
+            with self.subTest(argv=argv), contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    parse_args(argv)
+        args = parse_args(["--sample", "5", "--range", "FOOD_MAX_COUNT=100:200"])
+        self.assertEqual(args.range, [("FOOD_MAX_COUNT", (100, 200))])
+
+
+class TestSweepRun(unittest.TestCase):
+    def test_run_configuration_reports_summary(self):
+        """Test that a single run returns population, clan survival and trait metrics."""
+        result = run_configuration({"CELLS_PER_CLAN": 3}, seed=1, ticks=20)
+        self.assertEqual(result["overrides"], {"CELLS_PER_CLAN": 3})
+        self.assertEqual(result["final_population"], sum(result["clan_populations"]))
+        self.assertEqual(len(result["clan_populations"]), 3)
+        self.assertIn("speed", result["trait_means"])
+
+
+if __name__ == '__main__':
+    unittest.main()
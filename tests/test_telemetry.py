@@ -0,0 +1,170 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import base64
+import json
+import socket
+import struct
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from telemetry import TelemetryServer, prometheus_text, sample_delta, telemetry_sample
+from vector_engine import VectorEnvironment
+
+
+def make_sample(tick, cells=10, clans=None):
+    return {"tick": tick, "cell_count": cells, "food_count": 5, "avg_speed": 1.5, "avg_sense_radius": 50.0,
+            "avg_energy_efficiency": 1.0,
+            "clans": clans if clans is not None else {"0": {"speed": 1.5, "sense_radius": 50.0, "energy_efficiency": 1.0,
+                                                            "size": 8.0, "lifespan": 1000, "cells": cells}}}
+
+
+class WebSocketClient:
+    """Minimal blocking WebSocket client for the tests."""
+
+    def __init__(self, port):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall((f"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                           f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        response = b""
+        while b"\r\n\r\n" not in response:
+            response += self.sock.recv(1)
+        self.status = response.split(b"\r\n")[0]
+
+    def _read(self, count):
+        data = b""
+        while len(data) < count:
+            chunk = self.sock.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError("closed")
+            data += chunk
+        return data
+
+    def receive(self):
+        _, length = self._read(2)
+        if length == 126:
+            (length,) = struct.unpack("!H", self._read(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", self._read(8))
+        return json.loads(self._read(length))
+
+    def close(self):
+        self.sock.sendall(bytes([0x88, 0x80]) + b"\0\0\0\0") # Masked, empty close frame
+        self.sock.close()
+
+
+class TestTelemetryFormats(unittest.TestCase):
+    def test_delta_contains_only_changes(self):
+        """Test that a delta carries the tick plus only the fields and clan means that changed."""
+        before = make_sample(1, cells=10)
+        after = make_sample(2, cells=12)
+        after["clans"]["1"] = {"speed": 2.0, "cells": 3}
+        delta = sample_delta(before, after)
+        self.assertEqual(delta, {"tick": 2, "cell_count": 12, "clans": {"0": {"cells": 12},
+                                                                        "1": {"speed": 2.0, "cells": 3}}})
+
+    def test_prometheus_text(self):
+        """Test that the Prometheus output has typed gauges and labelled per-clan series."""
+        text = prometheus_text(dict(make_sample(7), ticks_per_sec=100.0), dropped=3)
+        self.assertIn("# TYPE microlife_cells gauge\nmicrolife_cells 10\n", text)
+        self.assertIn("microlife_ticks_total 7\n", text)
+        self.assertIn('microlife_clan_trait_mean{clan="0",trait="speed"} 1.5\n', text)
+        self.assertIn("microlife_telemetry_dropped_total 3\n", text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_sample_from_environment(self):
+        """Test that a sample holds the stats history columns and one entry per clan."""
+        environment = VectorEnvironment(seed=1)
+        environment.update()
+        sample = telemetry_sample(environment)
+        self.assertEqual(sample["tick"], 1)
+        self.assertEqual(sample["cell_count"], environment.cell_count)
+        self.assertEqual(len(sample["clans"]), len(environment.clans))
+        json.dumps(sample) # Must be serializable as is
+
+
+class TestTelemetryServer(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.server = TelemetryServer(port=0).start()
+        self.base = f"http://127.0.0.1:{self.server.port}"
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        self.server.close()
+
+    def get(self, path):
+        with urllib.request.urlopen(self.base + path, timeout=5) as response:
+            return response.headers.get("Content-Type"), response.read().decode()
+
+    def test_http_endpoints(self):
+        """Test that /stats and /metrics serve the latest sample and unknown paths are 404."""
+        self.server.publish(make_sample(1))
+        self.server.publish(make_sample(2, cells=11))
+        content_type, body = self.get("/stats")
+        self.assertEqual(content_type, "application/json")
+        self.assertEqual(json.loads(body)["cell_count"], 11)
+        content_type, body = self.get("/metrics")
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertIn("microlife_cells 11\n", body)
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.get("/missing")
+        self.assertEqual(raised.exception.code, 404)
+
+    def test_websocket_snapshot_then_deltas(self):
+        """Test that a subscriber gets a full snapshot and then one delta per published tick."""
+        self.server.publish(make_sample(1))
+        client = WebSocketClient(self.server.port)
+        self.assertIn(b"101", client.status)
+        snapshot = client.receive()
+        self.assertEqual((snapshot["type"], snapshot["tick"], snapshot["cell_count"]), ("snapshot", 1, 10))
+        for tick in range(2, 12):
+            self.server.publish(make_sample(tick, cells=10 + tick % 2))
+        deltas = [client.receive() for _ in range(10)]
+        self.assertEqual([delta["tick"] for delta in deltas], list(range(2, 12)))
+        self.assertTrue(all(delta["type"] == "delta" for delta in deltas))
+        self.assertNotIn("cell_count", deltas[0]) # Tick 2 has the same 10 cells as the snapshot
+        self.assertEqual(deltas[1]["cell_count"], 11)
+        self.assertNotIn("food_count", deltas[1])
+        client.close()
+
+    def test_slow_subscriber_never_blocks_publish(self):
+        """Test that a client that never reads makes the server drop its backlog, not stall publish()."""
+        client = WebSocketClient(self.server.port)
+        clans = {str(i): {"speed": 0.0, "cells": 0, "padding": "x" * 200} for i in range(50)}
+        slowest = 0.0
+        deadline = time.monotonic() + 20
+        tick = 0
+        while self.server.dropped == 0 and time.monotonic() < deadline:
+            tick += 1
+            for clan in clans.values():
+                clan["speed"] = tick # Every clan changes, so every delta is large
+            start = time.perf_counter()
+            self.server.publish(make_sample(tick, clans={key: dict(value) for key, value in clans.items()}))
+            slowest = max(slowest, time.perf_counter() - start)
+        self.assertGreater(self.server.dropped, 0)
+        self.assertLess(slowest, 0.05)
+        client.sock.close()
+
+    def test_close_with_connected_client(self):
+        """Test that closing the server does not hang on an open WebSocket connection."""
+        client = WebSocketClient(self.server.port)
+        client.receive()
+        start = time.monotonic()
+        self.server.close()
+        self.assertLess(time.monotonic() - start, 5)
+        client.sock.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
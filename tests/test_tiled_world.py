@@ -0,0 +1,209 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import random
+import unittest
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import SimulationConfig
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from environment import Zone, create_zones
+from spatial import ZoneRaster, nearest_within
+from tiled_world import TileGrid, TiledWorld
+
+
+class TestNearestWithin(unittest.TestCase):
+    def test_matches_brute_force(self):
+        """Test that the grid search picks the same item as a search over every item, ties included."""
+        rng = np.random.default_rng(5)
+        xs = rng.uniform(-100, 900, 3000)
+        ys = rng.uniform(-100, 700, 3000)
+        radii = rng.uniform(5, 60, 3000)
+        # Integer item positions and duplicates make exact distance ties common
+        item_xs = np.floor(rng.uniform(-100, 900, 400))
+        item_ys = np.floor(rng.uniform(-100, 700, 400))
+        item_xs = np.concatenate((item_xs, item_xs[:50]))
+        item_ys = np.concatenate((item_ys, item_ys[:50]))
+
+        dist = np.sqrt((xs[:, None] - item_xs[None, :]) ** 2 + (ys[:, None] - item_ys[None, :]) ** 2)
+        dist[dist >= radii[:, None]] = np.inf
+        closest = np.argmin(dist, axis=1)
+        expected = np.where(np.isfinite(dist[np.arange(len(xs)), closest]), closest, -1)
+        np.testing.assert_array_equal(nearest_within(xs, ys, radii, item_xs, item_ys, 60), expected)
+
+    def test_empty_inputs(self):
+        """Test that no points or no items give no targets."""
+        self.assertEqual(len(nearest_within(np.empty(0), np.empty(0), np.empty(0), np.ones(3), np.ones(3), 10)), 0)
+        np.testing.assert_array_equal(
+            nearest_within(np.ones(2), np.ones(2), np.full(2, 5.0), np.empty(0), np.empty(0), 10), [-1, -1])
+
+
+class TestTileGrid(unittest.TestCase):
+    def test_bounds_cover_the_world(self):
+        """Test that tile bounds are integer, contiguous and cover the whole world."""
+        grid = TileGrid(1001, 703, 3, 2)
+        area = 0
+        for tile in range(len(grid)):
+            left, top, right, bottom = grid.bounds(tile)
+            area += (right - left) * (bottom - top)
+            xs = np.array([left, right - 0.5])
+            ys = np.array([top, bottom - 0.5])
+            self.assertEqual(grid.tile_at(xs, ys).tolist(), [tile, tile])
+        self.assertEqual(area, 1001 * 703)
+
+    def test_neighbors(self):
+        """Test that corner, edge and inner tiles have 3, 5 and 8 neighbours."""
+        grid = TileGrid(900, 900, 3, 3)
+        self.assertEqual(grid.neighbors(0), [1, 3, 4])
+        self.assertEqual(grid.neighbors(1), [0, 2, 3, 4, 5])
+        self.assertEqual(grid.neighbors(4), [0, 1, 2, 3, 5, 6, 7, 8])
+
+
+class TestZoneScaling(unittest.TestCase):
+    def test_create_zones_scales_with_area(self):
+        """Test that zone counts scale with world area and zones stay inside the world."""
+        config = SimulationConfig()
+        toxic, resource = create_zones(config, random.Random(1))
+        self.assertEqual(len(toxic), config.TOXIC_ZONE_COUNT)
+        self.assertEqual(len(resource), config.RESOURCE_ZONE_COUNT)
+        width, height = SCREEN_WIDTH * 4, SCREEN_HEIGHT * 2
+        toxic, resource = create_zones(config, random.Random(1), width, height)
+        self.assertEqual(len(toxic), config.TOXIC_ZONE_COUNT * 8)
+        self.assertEqual(len(resource), config.RESOURCE_ZONE_COUNT * 8)
+        self.assertTrue(all(0 <= zone.x <= width and 0 <= zone.y <= height for zone in toxic + resource))
+
+    def test_offset_raster(self):
+        """Test that a raster with an origin away from (0, 0) counts the same as testing every zone."""
+        rng = random.Random(4)
+        zones = [Zone(rng.randint(900, 1700), rng.randint(500, 1100), rng.randint(5, 150), None, "toxic")
+                 for _ in range(60)]
+        raster = ZoneRaster(zones, width=800, height=600, left=1000, top=600)
+        for _ in range(1000):
+            x, y = rng.uniform(950, 1850), rng.uniform(550, 1250)
+            expected = sum((x - zone.x) ** 2 + (y - zone.y) ** 2 < zone.radius ** 2 for zone in zones)
+            self.assertEqual(raster.count(x, y), expected)
+
+
+class TestTiledWorld(unittest.TestCase):
+    def test_processes_match_serial(self):
+        """Test that worker processes give exactly the same world as stepping the tiles in one process."""
+        results = []
+        for processes in (False, True):
+            with TiledWorld(1600, 1200, 2, 2, 400, seed=3, processes=processes) as world:
+                world.step(150)
+                results.append((world.snapshot(), world.clan_traits()))
+        (serial, serial_traits), (parallel, parallel_traits) = results
+        for name in serial:
+            np.testing.assert_array_equal(serial[name], parallel[name], err_msg=f"{name} differs")
+        self.assertEqual(serial_traits, parallel_traits)
+
+    def test_same_seed_same_world(self):
+        """Test that two runs with the same seed and grid are identical."""
+        snapshots = []
+        for _ in range(2):
+            with TiledWorld(1200, 900, 3, 3, 300, seed=11, processes=False) as world:
+                world.step(100)
+                snapshots.append(world.snapshot())
+        for name in snapshots[0]:
+            np.testing.assert_array_equal(snapshots[0][name], snapshots[1][name])
+
+    def test_cells_migrate_between_tiles(self):
+        """Test that cells cross tile borders, end up owned by the tile they are in and are not lost."""
+        # Long lives and no reproduction so the population can only change through migration bugs
+        config = SimulationConfig(CELL_MAX_LIFESPAN=100000, CELL_REPRODUCTION_THRESHOLD=10**9,
+                                  CELL_IDLE_ENERGY_DRAIN=0, CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE=0,
+                                  TOXIC_ZONE_COUNT=0)
+        with TiledWorld(600, 600, 3, 3, 900, seed=2, config=config, processes=False) as world:
+            before = world.tile_cell_counts()
+            world.step(300)
+            self.assertEqual(world.cell_count, 900)
+            self.assertFalse(np.array_equal(world.tile_cell_counts(), before))
+            for tile in world._tiles:
+                owners = world.grid.tile_at(tile.cell_x, tile.cell_y)
+                self.assertTrue((owners == tile.index).all())
+
+    def test_food_found_across_borders(self):
+        """Test that a cell seeks and eats food that lies in the neighbouring tile."""
+        config = SimulationConfig(INITIAL_FOOD_COUNT=0, FOOD_SPAWN_RATE_PER_FRAME=0, TOXIC_ZONE_COUNT=0,
+                                  RESOURCE_ZONE_COUNT=0, INITIAL_CLAN_COUNT=1)
+        with TiledWorld(800, 400, 2, 1, 0, seed=1, config=config, processes=False) as world:
+            left, right = world._tiles
+            radius = left.clans[0].sense_radius
+            left.cell_x, left.cell_y = np.array([399.0 - radius / 2]), np.array([200.0])
+            left.cell_energy = np.array([50.0])
+            left.cell_age = np.zeros(1, dtype=np.int64)
+            left.cell_reproduction_timer = np.zeros(1, dtype=np.int64)
+            left.cell_clan = np.zeros(1, dtype=np.int64)
+            right.food_x, right.food_y = np.array([401.0]), np.array([200.0])
+            right.food_age = np.zeros(1, dtype=np.int64)
+            right.food_type = np.zeros(1, dtype=np.int64)
+            for _ in range(int(radius) + 5):
+                world.step()
+                if not len(right.food_x):
+                    break
+            self.assertEqual(len(right.food_x), 0)
+            self.assertEqual(world.cell_count, 1)
+
+    def test_contested_food_goes_to_one_cell(self):
+        """Test that food reached from two tiles in the same tick is eaten once."""
+        config = SimulationConfig(INITIAL_FOOD_COUNT=0, FOOD_SPAWN_RATE_PER_FRAME=0, TOXIC_ZONE_COUNT=0,
+                                  RESOURCE_ZONE_COUNT=0, INITIAL_CLAN_COUNT=1, CELL_IDLE_ENERGY_DRAIN=0,
+                                  CELL_ENERGY_CONSUMPTION_PER_MOVE_BASE=0)
+        with TiledWorld(800, 400, 2, 1, 0, seed=1, config=config, processes=False) as world:
+            for tile, x in zip(world._tiles, (399.5, 400.5)):
+                tile.cell_x, tile.cell_y = np.array([x]), np.array([200.0])
+                tile.cell_energy = np.array([10.0])
+                tile.cell_age = np.zeros(1, dtype=np.int64)
+                tile.cell_reproduction_timer = np.zeros(1, dtype=np.int64)
+                tile.cell_clan = np.zeros(1, dtype=np.int64)
+            right = world._tiles[1]
+            right.food_x, right.food_y = np.array([400.0]), np.array([200.0])
+            right.food_age = np.zeros(1, dtype=np.int64)
+            right.food_type = np.zeros(1, dtype=np.int64)
+            world.step()
+            energy = np.concatenate([tile.cell_energy for tile in world._tiles])
+            food_energy = config.FOOD_TYPES[0]["energy_value"]
+            self.assertEqual(sorted(energy.tolist()), [10.0, min(10.0 + food_energy, config.CELL_ENERGY_MAX)])
+            # The food's own tile has priority
+            self.assertGreater(world._tiles[1].cell_energy[0], 10.0)
+
+    def test_cell_on_its_food_does_not_wander(self):
+        """Test that a cell sitting exactly on its target food eats it without moving."""
+        config = SimulationConfig(INITIAL_FOOD_COUNT=0, FOOD_SPAWN_RATE_PER_FRAME=0, TOXIC_ZONE_COUNT=0,
+                                  RESOURCE_ZONE_COUNT=0, INITIAL_CLAN_COUNT=1)
+        with TiledWorld(800, 400, 2, 1, 0, seed=1, config=config, processes=False) as world:
+            tile = world._tiles[0]
+            tile.cell_x, tile.cell_y = np.array([200.0]), np.array([200.0])
+            tile.cell_energy = np.array([10.0])
+            tile.cell_age = np.zeros(1, dtype=np.int64)
+            tile.cell_reproduction_timer = np.zeros(1, dtype=np.int64)
+            tile.cell_clan = np.zeros(1, dtype=np.int64)
+            tile.food_x, tile.food_y = np.array([200.0]), np.array([200.0])
+            tile.food_age = np.zeros(1, dtype=np.int64)
+            tile.food_type = np.zeros(1, dtype=np.int64)
+            world.step()
+            self.assertEqual((tile.cell_x[0], tile.cell_y[0]), (200.0, 200.0))
+            self.assertEqual(len(tile.food_x), 0)
+
+    def test_tiles_smaller_than_sense_radius_rejected(self):
+        """Test that tiles narrower than the halo raise ValueError."""
+        with self.assertRaises(ValueError):
+            TiledWorld(400, 400, 8, 1, 10, processes=False)
+
+    def test_worker_error_is_reported(self):
+        """Test that a failing worker raises in the coordinator instead of hanging."""
+        with TiledWorld(600, 300, 2, 1, 20, seed=1, capacity=1) as world:
+            with self.assertRaises(RuntimeError):
+                world.step(2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from timestep import FixedTimestep
+
+
+class FakeClock:
+    """Clock that advances by `tick_cost` seconds per simulation step."""
+
+    def __init__(self, tick_cost=0.0):
+        self.now = 0.0
+        self.tick_cost = tick_cost
+        self.steps = 0
+
+    def __call__(self):
+        return self.now
+
+    def step(self):
+        self.steps += 1
+        self.now += self.tick_cost
+
+
+class TestFixedTimestep(unittest.TestCase):
+    def run_frames(self, timestep, clock, frames, frame_seconds=1 / 60):
+        return [timestep.advance(frame_seconds, clock.step) for _ in range(frames)]
+
+    def test_one_tick_per_frame_at_1x(self):
+        """Test that 1x at the tick rate runs exactly one tick per frame."""
+        clock = FakeClock()
+        timestep = FixedTimestep(tick_rate=16, speed=1.0, clock=clock)
+        self.assertEqual(self.run_frames(timestep, clock, 120, frame_seconds=0.0625), [1] * 120)
+        self.assertEqual(timestep.ticks_shed, 0)
+
+    def test_fractional_speed(self):
+        """Test that 0.5x runs one tick every other frame instead of truncating to one per frame."""
+        clock = FakeClock()
+        timestep = FixedTimestep(tick_rate=8, speed=0.5, clock=clock)
+        ticks = self.run_frames(timestep, clock, 8, frame_seconds=0.125)
+        self.assertEqual(ticks, [0, 1] * 4)
+        self.assertEqual(clock.steps, 4)
+
+    def test_speed_above_four(self):
+        """Test that high speeds run several ticks per frame."""
+        clock = FakeClock()
+        timestep = FixedTimestep(tick_rate=8, speed=16.0, clock=clock)
+        self.assertEqual(self.run_frames(timestep, clock, 3, frame_seconds=0.125), [16] * 3)
+
+    def test_budget_sheds_backlog(self):
+        """Test that ticks beyond the step budget are shed rather than carried into later frames."""
+        clock = FakeClock(tick_cost=0.004)
+        timestep = FixedTimestep(tick_rate=8, speed=16.0, budget=0.010, clock=clock)
+        ticks = self.run_frames(timestep, clock, 5, frame_seconds=0.125)
+        self.assertEqual(ticks, [3] * 5) # 0.004 s per tick: the third tick crosses the 10 ms budget
+        self.assertEqual(timestep.ticks_shed, 13 * 5)
+        self.assertLess(timestep.accumulator, 1)
+
+    def test_unbounded_speed_fills_budget(self):
+        """Test that speed None runs ticks until the budget is used, and at least one per frame."""
+        clock = FakeClock(tick_cost=0.001)
+        timestep = FixedTimestep(speed=None, budget=0.010, clock=clock)
+        self.assertEqual(timestep.advance(0.0, clock.step), 10)
+        slow = FakeClock(tick_cost=1.0)
+        self.assertEqual(FixedTimestep(speed=None, budget=0.010, clock=slow).advance(0.0, slow.step), 1)
+
+    def test_long_frames_are_clamped(self):
+        """Test that a stall counts only max_frame seconds toward due ticks."""
+        clock = FakeClock()
+        timestep = FixedTimestep(tick_rate=60, max_frame=0.25, clock=clock)
+        self.assertEqual(timestep.advance(10.0, clock.step), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Import test_setup first to mock pygame before other imports
+import test_setup  # This mocks pygame.image.load before other imports
+
+import unittest
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cell import Cell
+from food import Food
+from vector_engine import VectorEnvironment
+from constants import (
+    CELL_ENERGY_MAX, CELL_MIN_AGE_TO_REPRODUCE, CELL_REPRODUCTION_THRESHOLD, FOOD_TYPES,
+    INITIAL_REPRODUCTION_TIME,
+)
+
+
+def make_empty_environment():
+    """Create a VectorEnvironment with no cells, food or zones."""
+    env = VectorEnvironment(seed=0)
+    env._compact_cells(np.zeros(env.cell_count, dtype=bool))
+    env.food_x = env.food_x[:0]
+    env.food_y = env.food_y[:0]
+    env.food_age = env.food_age[:0]
+    env.food_type = env.food_type[:0]
+    env.toxic_zones = []
+    env.resource_zones = []
+    return env
+
+
+class TestVectorEnvironmentRules(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.env = make_empty_environment()
+        self.clan = self.env.clans[0]
+        self.clan.speed = 2.0
+        self.clan.sense_radius = 100.0
+        self.clan.size = 8.0
+        self.clan.lifespan = 800
+
+    def test_seeking_cell_matches_reference_cell(self):
+        """Test that a cell moving towards food ends up where Cell.update would put it."""
+        food = Food(160, 140, FOOD_TYPES[1])
+        cell = Cell(100, 100, self.clan, 120)
+        self.env.add_cells(np.array([100.0]), np.array([100.0]), np.array([0]), np.array([120.0]))
+        self.env.add_food(food)
+
+        for _ in range(5):
+            cell.update([food])
+            self.env.update()
+
+            self.assertAlmostEqual(self.env.cell_x[0], cell.x, places=9)
+            self.assertAlmostEqual(self.env.cell_y[0], cell.y, places=9)
+            self.assertAlmostEqual(self.env.cell_energy[0], cell.energy, places=9)
+
+    def test_cell_on_its_food_does_not_wander(self):
+        """Test that a cell whose target is at distance 0 stays put and pays no movement cost, like Cell.move."""
+        food = Food(150, 150, FOOD_TYPES[0])
+        cell = Cell(150, 150, self.clan, 40)
+        self.env.add_cells(np.array([150.0]), np.array([150.0]), np.array([0]), np.array([40.0]))
+        self.env.add_food(food)
+
+        cell.update([food])
+        self.env.update()
+
+        self.assertEqual((self.env.cell_x[0], self.env.cell_y[0]), (150.0, 150.0))
+        self.assertEqual((cell.x, cell.y), (150, 150))
+        self.assertAlmostEqual(self.env.cell_energy[0], cell.energy, places=9)
+
+    def test_first_cell_wins_contested_food(self):
+        """Test that only the first cell reaching a contested food item eats it."""
+        self.env.add_food(Food(200, 200, FOOD_TYPES[0]))
+        self.env.add_cells(np.array([200.0, 200.0]), np.array([201.0, 201.0]), np.array([0, 0]),
+                           np.array([50.0, 50.0]))
+
+        self.env.update()
+
+        self.assertEqual(self.env.food_count, 0, "Eaten food should be removed")
+        self.assertGreater(self.env.cell_energy[0], 50, "First cell should gain the food's energy")
+        self.assertLess(self.env.cell_energy[1], 50, "Second cell should not eat the same food")
+
+    def test_cells_die_of_old_age(self):
+        """Test that cells reaching their clan's lifespan are removed."""
+        self.env.add_cells(np.array([300.0]), np.array([300.0]), np.array([0]), np.array([float(CELL_ENERGY_MAX)]))
+        self.env.cell_age[0] = self.clan.lifespan - 1
+
+        self.env.update()
+
+        self.assertEqual(self.env.cell_count, 0, "Cell should die once it reaches its lifespan")
+
+    def test_food_decays_after_lifespan(self):
+        """Test that uneaten food disappears once it outlives its lifespan."""
+        food = Food(10, 10, FOOD_TYPES[0])
+        food.age = FOOD_TYPES[0]["lifespan"]
+        self.env.add_food(food)
+
+        self.env.update()
+
+        self.assertEqual(self.env.food_count, 0, "Food past its lifespan should decay")
+
+    def test_reproduction_splits_energy_after_timer(self):
+        """Test that mature cells reproduce once the initial reproduction timer has expired."""
+        self.env.add_cells(np.array([400.0]), np.array([300.0]), np.array([0]), np.array([float(CELL_ENERGY_MAX)]))
+        self.env.cell_age[0] = CELL_MIN_AGE_TO_REPRODUCE
+        self.env.cell_reproduction_timer[0] = INITIAL_REPRODUCTION_TIME
+
+        self.env.update()
+
+        self.assertEqual(self.env.cell_count, 2, "Parent should produce one offspring")
+        self.assertGreaterEqual(self.env.cell_energy[0] * 2, CELL_REPRODUCTION_THRESHOLD - 1)
+        self.assertEqual(self.env.cell_energy[0], self.env.cell_energy[1],
+                         "Offspring should receive half of the parent's energy")
+        self.assertEqual(self.env.cell_age[1], 0, "Offspring should start at age 0")
+
+    def test_clan_summaries_count_cells_per_clan(self):
+        """Test that per-clan counts and means agree with the cell snapshots."""
+        env = VectorEnvironment(seed=3)
+        for _ in range(200):
+            env.update()
+        cells = env.cells
+        for clan, count, means in env.clan_summaries():
+            clan_cells = [cell for cell in cells if cell.clan is clan]
+            self.assertEqual(count, len(clan_cells))
+            if clan_cells:
+                self.assertAlmostEqual(means["speed"], sum(cell.speed for cell in clan_cells) / count)
+
+
+class TestVectorEnvironmentDeterminism(unittest.TestCase):
+    def test_same_seed_gives_identical_trajectories(self):
+        """Test that two vectorized environments with the same seed evolve bit-identically."""
+        env_a = VectorEnvironment(seed=7)
+        env_b = VectorEnvironment(seed=7)
+        for _ in range(500):
+            env_a.update()
+            env_b.update()
+        np.testing.assert_array_equal(env_a.cell_x, env_b.cell_x)
+        np.testing.assert_array_equal(env_a.cell_energy, env_b.cell_energy)
+        np.testing.assert_array_equal(env_a.food_x, env_b.food_x)
+        self.assertEqual([clan.get_traits() for clan in env_a.clans], [clan.get_traits() for clan in env_b.clans])
+
+
+if __name__ == '__main__':
+    unittest.main()